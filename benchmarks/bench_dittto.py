@@ -0,0 +1,274 @@
+"""
+Benchmarks for dittto: model build time, training throughput, generation throughput and peak memory.
+
+Every case runs in a fresh process, so peak RSS is measured per case and no TensorFlow state leaks between cases.
+
+Usage:
+    python benchmarks/bench_dittto.py                               # quick grid, compared against benchmarks/baseline.json
+    python benchmarks/bench_dittto.py --grid full --output results.json
+    python benchmarks/bench_dittto.py --grid full --large          # also run the cases with tables above 4 GB
+    python benchmarks/bench_dittto.py --save-baseline               # overwrite the stored baseline with the whole grid
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+PRESETS = ('single_encoder', 'balanced', 'heavy_decoder')
+
+# Compilation settings compared against the default ones; the speedup of each mode is printed after the results
+COMPILE_MODES = {
+    'default': {},
+    'steps': {'steps_per_execution': 32},
+    'xla': {'jit_compile': True, 'steps_per_execution': 32},
+}
+
+# Ensemble sizes trained as one wide model, compared against a single autoencoder; throughput counts member-rows
+ENSEMBLE_SIZES = (1, 4, 8)
+
+# Cases whose float32 table is larger than this only run with --large; the full grid's 10M x 1000 table needs 40 GB
+MAX_TABLE_BYTES = 4 * 2 ** 30
+
+GRIDS = {
+    'quick': {'rows': [1000, 10000], 'columns': [10, 100], 'ratios': [10, 100], 'build_columns': [10, 100, 1000]},
+    'full': {'rows': [1000, 10000, 100000, 1000000, 10000000], 'columns': [10, 100, 1000], 'ratios': [10, 100, 500],
+             'build_columns': [10, 100, 1000]},
+}
+
+
+def _table(rows, columns, seed=0):
+    import numpy as np
+    return np.random.default_rng(seed).random((rows, columns), dtype=np.float32)
+
+
+def bench_build(preset, columns):
+    from dittto.autoencoder import generate_model
+    from dittto.presets import resolve_architecture
+
+    start = time.perf_counter()
+    generate_model(columns, **resolve_architecture(preset))
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'throughput': 1 / seconds, 'unit': 'models/s'}
+
+
+def bench_fit(preset, rows, columns, epochs, batch_size, mode=None, n_members=1):
+    from tensorflow import keras
+    from dittto.autoencoder import fit_model, generate_model
+    from dittto.ensemble import generate_ensemble_model
+    from dittto.presets import resolve_architecture
+
+    data = _table(rows, columns)
+    if n_members > 1:
+        autoencoder, _, _ = generate_ensemble_model(columns, n_members, **resolve_architecture(preset))
+    else:
+        autoencoder, _, _ = generate_model(columns, **resolve_architecture(preset))
+    if mode is None:
+        start = time.perf_counter()
+        fit_model(autoencoder, data, epochs=epochs, batch_size=batch_size, validation_split=0, patience=None)
+        seconds = time.perf_counter() - start
+        return {'seconds': seconds, 'throughput': n_members * rows * epochs / seconds, 'unit': 'samples/s'}
+
+    # Compiled modes are measured in the steady state: one extra first epoch traces (and, with XLA, compiles) the
+    # training step and is reported separately
+    times = []
+    timer = keras.callbacks.LambdaCallback(on_epoch_begin=lambda epoch, logs: times.append(time.perf_counter()),
+                                           on_epoch_end=lambda epoch, logs: times.append(time.perf_counter() - times.pop()))
+    fit_model(autoencoder, data, epochs=epochs + 1, batch_size=batch_size, validation_split=0, patience=None,
+              callbacks=[timer], **COMPILE_MODES[mode])
+    seconds = sum(times[1:])
+    return {'seconds': seconds, 'warmup_seconds': times[0], 'throughput': rows * epochs / seconds, 'unit': 'samples/s'}
+
+
+def bench_generate(preset, rows, columns, ratio, engine, sampling, batch_size, mode=None):
+    from dittto.autoencoder import _generate_rows, _synthetic_batches, fit_model, generate_model
+    from dittto.presets import resolve_architecture
+
+    # A table of `rows` rows with a 1:ratio imbalance, balanced by generating as many rows as the majority class has
+    n_minority = max(rows // (ratio + 1), 1)
+    n_generated = rows - n_minority
+    minority_data = _table(n_minority, columns)
+    autoencoder, _, _ = generate_model(columns, **resolve_architecture(preset))
+    fit_model(autoencoder, minority_data, epochs=1, batch_size=batch_size, validation_split=0, patience=None)
+
+    jit_compile = COMPILE_MODES[mode].get('jit_compile', False) if mode is not None else False
+    generate = lambda n_rows: _generate_rows(_synthetic_batches(autoencoder, minority_data, n_rows, sampling=sampling,
+                                                                engine=engine, random_state=0, jit_compile=jit_compile),
+                                             n_rows, columns)
+    result = {}
+    if mode is not None:
+        # Compiled modes are measured in the steady state, after a warm-up run that traces the predict step for the
+        # shapes of the timed run
+        start = time.perf_counter()
+        generate(n_generated)
+        result['warmup_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generate(n_generated)
+    seconds = time.perf_counter() - start
+    result.update({'seconds': seconds, 'throughput': n_generated / seconds, 'unit': 'rows/s'})
+    return result
+
+
+BENCHMARKS = {'build': bench_build, 'fit': bench_fit, 'generate': bench_generate}
+
+
+def _run_case(case):
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    result = BENCHMARKS[case['benchmark']](**case['params'])
+    from dittto.profiling import peak_rss_mb
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def cases(grid, epochs=1, batch_size=256, large=False):
+    """Returns the benchmark cases of a grid, each with a unique name, skipping tables above MAX_TABLE_BYTES unless `large`."""
+    grid = GRIDS[grid]
+    tables = [(rows, columns) for rows in grid['rows'] for columns in grid['columns']
+              if large or rows * columns * 4 <= MAX_TABLE_BYTES]
+    for preset in PRESETS:
+        for columns in grid['build_columns']:
+            yield {'name': 'build/%s/columns=%d' % (preset, columns), 'benchmark': 'build',
+                   'params': {'preset': preset, 'columns': columns}}
+
+    for preset in PRESETS:
+        for rows, columns in tables:
+            yield {'name': 'fit/%s/rows=%d/columns=%d' % (preset, rows, columns), 'benchmark': 'fit',
+                   'params': {'preset': preset, 'rows': rows, 'columns': columns, 'epochs': epochs,
+                              'batch_size': batch_size}}
+
+    # Compiled modes are compared against the default settings measured the same way, for one preset
+    for rows, columns in tables:
+        for mode in COMPILE_MODES:
+            yield {'name': 'fit/balanced/rows=%d/columns=%d/mode=%s' % (rows, columns, mode), 'benchmark': 'fit',
+                   'params': {'preset': 'balanced', 'rows': rows, 'columns': columns, 'epochs': epochs,
+                              'batch_size': batch_size, 'mode': mode}}
+
+    for rows, columns in tables:
+        for n_members in ENSEMBLE_SIZES:
+            yield {'name': 'fit/balanced/rows=%d/columns=%d/members=%d' % (rows, columns, n_members),
+                   'benchmark': 'fit',
+                   'params': {'preset': 'balanced', 'rows': rows, 'columns': columns, 'epochs': epochs,
+                              'batch_size': batch_size, 'n_members': n_members}}
+
+    for rows, columns in tables:
+        for ratio in grid['ratios']:
+            for engine, sampling in (('keras', 'reconstruct'), ('numpy', 'reconstruct'), ('numpy', 'gaussian')):
+                yield {'name': 'generate/%s/%s/rows=%d/columns=%d/ratio=%d' % (engine, sampling, rows, columns, ratio),
+                       'benchmark': 'generate',
+                       'params': {'preset': 'balanced', 'rows': rows, 'columns': columns, 'ratio': ratio,
+                                  'engine': engine, 'sampling': sampling, 'batch_size': batch_size}}
+            for mode in ('default', 'xla'):
+                yield {'name': 'generate/keras/reconstruct/rows=%d/columns=%d/ratio=%d/mode=%s' % (rows, columns, ratio, mode),
+                       'benchmark': 'generate',
+                       'params': {'preset': 'balanced', 'rows': rows, 'columns': columns, 'ratio': ratio,
+                                  'engine': 'keras', 'sampling': 'reconstruct', 'batch_size': batch_size,
+                                  'mode': mode}}
+
+
+def run(grid='quick', epochs=1, batch_size=256, pattern=None, verbose=True, large=False):
+    """Runs every case of a grid, each in a fresh process, and returns the machine-readable results."""
+    from importlib.metadata import version
+
+    notes = []
+    if (os.cpu_count() or 1) < 2:
+        notes.append('Recorded on a single CPU: the speedups of worker pools, tf_threads and other parallel code paths '
+                     'cannot show in these numbers.')
+    results = {'metadata': {'grid': grid, 'python': platform.python_version(), 'numpy': version('numpy'),
+                            'tensorflow': version('tensorflow'), 'platform': platform.platform(),
+                            'cpu_count': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                            'large': large, 'notes': notes},
+               'results': {}}
+
+    context = multiprocessing.get_context('spawn')
+    for case in cases(grid, epochs, batch_size, large):
+        if pattern and pattern not in case['name']:
+            continue
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            result = pool.apply(_run_case, (case,))
+        result['params'] = case['params']
+        results['results'][case['name']] = result
+        if verbose:
+            print('%-70s %14.1f %-10s %8.1f MB' % (case['name'], result['throughput'], result['unit'],
+                                                  result['peak_rss_mb'] or 0), flush=True)
+    return results
+
+
+def speedups(results):
+    """
+    Returns the throughput of every compiled-mode case relative to the matching 'mode=default' case, and of every
+    ensemble case relative to the matching 'members=1' case.
+    """
+    speedup = {}
+    for name, result in results['results'].items():
+        for separator, reference in (('/mode=', 'default'), ('/members=', '1')):
+            prefix, found, value = name.rpartition(separator)
+            default = results['results'].get(prefix + separator + reference)
+            if found and value != reference and default is not None:
+                speedup[name] = result['throughput'] / default['throughput']
+    return speedup
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Returns the cases whose throughput dropped by more than `tolerance` compared to the baseline."""
+    regressions = []
+    for name, result in results['results'].items():
+        if name not in baseline['results']:
+            continue
+        expected = baseline['results'][name]['throughput']
+        if result['throughput'] < expected * (1 - tolerance):
+            regressions.append({'name': name, 'baseline': expected, 'throughput': result['throughput'],
+                                'change': result['throughput'] / expected - 1})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--grid', choices=sorted(GRIDS), default='quick', help='Benchmark grid to run.')
+    parser.add_argument('--filter', default=None, help='Only run cases whose name contains this string.')
+    parser.add_argument('--epochs', type=int, default=1, help='Training epochs per fit case.')
+    parser.add_argument('--batch-size', type=int, default=256, help='Training batch size.')
+    parser.add_argument('--output', default=None, help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file to compare against.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative throughput drop.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline.')
+    parser.add_argument('--large', action='store_true', help='Also run the cases whose table is larger than 4 GB.')
+    args = parser.parse_args(argv)
+    if args.save_baseline and args.filter:
+        # The default and compiled modes must come from the same run, or their speedups compare different machines
+        parser.error('--save-baseline records the whole grid and cannot be combined with --filter')
+
+    results = run(args.grid, args.epochs, args.batch_size, args.filter, large=args.large)
+    results['speedups'] = speedups(results)
+    for name, speedup in results['speedups'].items():
+        print('SPEEDUP %-70s x%.2f' % (name, speedup))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at %s, skipping the comparison.' % args.baseline)
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print('REGRESSION %(name)s: %(throughput).1f vs baseline %(baseline).1f (%(change)+.0f%%)'
+              % dict(regression, change=regression['change'] * 100))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
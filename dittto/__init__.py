@@ -1,2 +1,41 @@
-from .autoencoder import generate_model
-from .autoencoder import generate_synthetic_data
\ No newline at end of file
+import importlib
+
+# Public attributes and the submodules they live in. Submodules are only imported on first access, so
+# `import dittto` stays cheap and TensorFlow is not loaded until a model is actually needed.
+_LAZY_ATTRIBUTES = {
+    'generate_model': 'autoencoder',
+    'fit_model': 'autoencoder',
+    'generate_synthetic_data': 'autoencoder',
+    'iter_synthetic_data': 'autoencoder',
+    'generate_multiclass_synthetic_data': 'multiclass',
+    'generate_ensemble_model': 'ensemble',
+    'ensemble_members': 'ensemble',
+    'rebalance_files': 'outofcore',
+    'select_architecture': 'selection',
+    'ModelCache': 'cache',
+    'Checkpoint': 'incremental',
+    'LatentSampler': 'latent',
+    'NumpyModel': 'inference',
+    'Profiler': 'profiling',
+    'GenerationServer': 'server',
+    'ServedModel': 'server',
+    'export_weights': 'inference',
+    'quality_report': 'evaluation',
+    'TabularTransformer': 'transform',
+    'BalancedView': 'balanced',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    value = getattr(importlib.import_module('.' + _LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,28 @@
+from contextlib import nullcontext
+import json
+import os
+import time
+
 from tensorflow import keras
+import tensorflow as tf
+import numpy as np
 import pandas as pd
 
+from .balanced import BalancedView
+from .cache import ModelCache, row_hashes
+from .ensemble import (MEMBER_SELECTIONS, dispatch, ensemble_loss, ensemble_members, generate_ensemble_model,
+                       member_selector)
+from .incremental import Checkpoint
+from .inference import NumpyModel
+from .latent import SAMPLING_MODES, LatentSampler
+from .parallel import configure_tensorflow
+from .preparation import label_value, noise_scale, prepare_data
+from .presets import resolve_architecture
+from .profiling import Profiler
+from .selection import select_architecture
+from .transform import TabularTransformer
+from .writers import ChunkWriter
+
 def generate_model(input_shape:int, **kwargs):
     """
     Generates an autoencoder model using the given input shape and optional parameters.
@@ -79,28 +101,182 @@ def generate_model(input_shape:int, **kwargs):
     return autoencoder, encoder, decoder
 
 
+def fit_model(autoencoder, data, epochs: int = 100, batch_size: int = 16, validation_split: float = 0.25,
+              patience: int = 10, min_delta: float = 0.0, reduce_lr_patience: int = None,
+              learning_rate: float = 0.001, shuffle_buffer: int = 1000000, verbose: int = 0, callbacks: list = None,
+              initial_epoch: int = 0, optimizer_state: list = None, jit_compile: bool = False,
+              steps_per_execution: int = 1):
+    """
+    Compiles and trains an autoencoder model on a tf.data pipeline built from a single float32 array.
+
+    Args:
+        autoencoder (keras.Model): The autoencoder model to train, e.g. from generate_model.
+        data (np.ndarray or pd.DataFrame): Training rows. They are converted to one contiguous float32 array, which is used as both the input and the target.
+        epochs (int, optional): Maximum number of epochs to train for. Defaults to 100.
+        batch_size (int, optional): Number of rows per training step. Defaults to 16.
+        validation_split (float, optional): Fraction of the rows, taken from the end, held out to compute the validation loss. Defaults to 0.25.
+        patience (int, optional): Stop training once the validation loss has not improved for this many epochs, and restore the best weights. None trains for all epochs. Defaults to 10.
+        min_delta (float, optional): Minimum decrease of the validation loss that counts as an improvement. Defaults to 0.0.
+        reduce_lr_patience (int, optional): Halve the learning rate once the validation loss has not improved for this many epochs. Defaults to None (disabled).
+        learning_rate (float, optional): Learning rate of the Adam optimizer. Defaults to 0.001.
+        shuffle_buffer (int, optional): Maximum number of rows held in the shuffle buffer. Defaults to 1000000.
+        verbose (int, optional): Verbosity of keras.Model.fit. Defaults to 0.
+        callbacks (list, optional): Additional Keras callbacks. Defaults to None.
+        initial_epoch (int, optional): Epoch to resume training at; `epochs` is then the index of the last epoch, as in keras.Model.fit. Defaults to 0.
+        optimizer_state (list, optional): Optimizer variables of an earlier run, from optimizer_state(), restored before training so a resumed run continues with the same Adam moments and step count. Defaults to None.
+        jit_compile (bool, optional): Whether to compile the training and prediction steps with XLA. Defaults to False.
+        steps_per_execution (int, optional): Number of training steps run per call into the compiled function, which cuts the per-step Python overhead of small models. Callbacks then only run every `steps_per_execution` steps. Defaults to 1.
+
+    Returns:
+        keras.callbacks.History: The training history.
+
+    Use Case:
+        Use this function to train models from generate_model with larger batches and early stopping. When there are too few rows to hold out a validation set, the training loss is monitored instead.
+        The dense networks of generate_model are so small that op dispatch dominates CPU time, so `steps_per_execution` is usually the larger win. XLA compilation takes seconds up front, recompiles for every new batch shape and is often slower for these networks on CPU. Compare both on your hardware with benchmarks/bench_dittto.py.
+
+    Example:
+        a. history = fit_model(autoencoder, minority_df, epochs=100, batch_size=1024, patience=5)
+        b. history = fit_model(autoencoder, X, batch_size=256, validation_split=0.1, reduce_lr_patience=3)
+        c. history = fit_model(autoencoder, X, batch_size=256, steps_per_execution=64, jit_compile=True)
+    """
+
+    if epochs < 1 or epochs <= initial_epoch:
+        raise ValueError("Invalid number of epochs.")
+    if batch_size < 1:
+        raise ValueError("Invalid batch size.")
+    if not 0 <= validation_split < 1:
+        raise ValueError("Invalid validation split.")
+    if steps_per_execution < 1:
+        raise ValueError("Invalid steps per execution.")
+
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    n_validation = int(len(data) * validation_split)
+    train_data, validation_data = data[:len(data) - n_validation], data[len(data) - n_validation:]
+
+    return _fit_dataset(autoencoder, _dataset(train_data, batch_size, shuffle_buffer), epochs,
+                        validation_data=_dataset(validation_data, batch_size) if n_validation else None,
+                        patience=patience, min_delta=min_delta, reduce_lr_patience=reduce_lr_patience,
+                        learning_rate=learning_rate, verbose=verbose, callbacks=callbacks, initial_epoch=initial_epoch,
+                        optimizer_state=optimizer_state, jit_compile=jit_compile,
+                        steps_per_execution=steps_per_execution)
+
+
+def _fit_dataset(autoencoder, dataset, epochs: int, validation_data=None, steps_per_epoch: int = None,
+                 patience: int = 10, min_delta: float = 0.0, reduce_lr_patience: int = None,
+                 learning_rate: float = 0.001, verbose: int = 0, callbacks: list = None, initial_epoch: int = 0,
+                 optimizer_state: list = None, jit_compile: bool = False, steps_per_execution: int = 1):
+    """
+    Compiles the model and trains it on a tf.data.Dataset of (rows, rows) batches, as described in fit_model.
+
+    Early stopping and learning rate reduction monitor the loss on `validation_data`, or the training loss without it.
+    `steps_per_epoch` bounds every epoch of a repeated dataset.
+    """
+    _compile(autoencoder, learning_rate, jit_compile, steps_per_execution)
+    if optimizer_state is not None:
+        autoencoder.optimizer.build(autoencoder.trainable_variables)
+        for variable, value in zip(autoencoder.optimizer.variables, optimizer_state):
+            variable.assign(value)
+
+    monitor = 'val_loss' if validation_data is not None else 'loss'
+    callbacks = list(callbacks or [])
+    if patience is not None:
+        callbacks.append(keras.callbacks.EarlyStopping(monitor=monitor, patience=patience, min_delta=min_delta,
+                                                       restore_best_weights=True))
+    if reduce_lr_patience is not None:
+        callbacks.append(keras.callbacks.ReduceLROnPlateau(monitor=monitor, factor=0.5, patience=reduce_lr_patience,
+                                                           min_delta=min_delta))
+
+    return autoencoder.fit(dataset, epochs=epochs, initial_epoch=initial_epoch, steps_per_epoch=steps_per_epoch,
+                           validation_data=validation_data, callbacks=callbacks, shuffle=False, verbose=verbose)
+
+
+def _compile(autoencoder, learning_rate: float, jit_compile: bool, steps_per_execution: int):
+    """
+    Compiles the model with a fresh Adam optimizer.
+
+    A model compiled here before with the same settings keeps its compiled state and only has its optimizer variables
+    reset, so the traced training step is reused instead of being traced again.
+    """
+    optimizer = autoencoder.optimizer if autoencoder.compiled else None
+    if getattr(autoencoder, '_fit_settings', None) == (id(optimizer), jit_compile, steps_per_execution) and optimizer.built:
+        for variable in optimizer.variables:
+            variable.assign(tf.zeros_like(variable))
+        optimizer.learning_rate.assign(learning_rate)
+        return
+
+    # Ensembles from generate_ensemble_model reconstruct every row once per member
+    loss = ensemble_loss if getattr(autoencoder, 'n_members', 1) > 1 else 'mse'
+    autoencoder.compile(optimizer=keras.optimizers.Adam(learning_rate=learning_rate), loss=loss,
+                        jit_compile=jit_compile, steps_per_execution=steps_per_execution)
+    autoencoder._fit_settings = (id(autoencoder.optimizer), jit_compile, steps_per_execution)
+
+
+def optimizer_state(autoencoder) -> list:
+    """Returns the optimizer variables of a trained model as NumPy arrays, to resume training with fit_model."""
+    return [variable.numpy() for variable in autoencoder.optimizer.variables]
+
+
+def _dataset(data: np.ndarray, batch_size: int, shuffle_buffer: int = None):
+    """Returns a cached, batched and prefetched tf.data pipeline yielding (rows, rows) pairs."""
+    dataset = tf.data.Dataset.from_tensor_slices(data).cache()
+    if shuffle_buffer:
+        dataset = dataset.shuffle(min(len(data), shuffle_buffer), reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).map(lambda rows: (rows, rows)).prefetch(tf.data.AUTOTUNE)
+
+
 def generate_synthetic_data(model_name: str, original_df: pd.DataFrame, minority_class_column: str = 'class', 
                             minority_class_label: str = '0', decoder_activation: str = 'sigmoid',
-                            epochs:int = 100):
+                            epochs:int = 100, noise: float = 0.05, resample: bool = False,
+                            generation_batch_size: int = 8192, random_state: int = None,
+                            cache: ModelCache = None, engine: str = 'keras', batch_size: int = 16,
+                            validation_split: float = 0.25, patience: int = 10, sampling: str = 'reconstruct',
+                            profiler: Profiler = None, candidates=None, n_jobs: int = None, jit_compile: bool = False,
+                            steps_per_execution: int = 1, intra_op_threads: int = None, inter_op_threads: int = None,
+                            checkpoint: str = None, fine_tune_epochs: int = 5, n_members: int = 1,
+                            member_selection: str = 'round_robin', transformer=None, lazy: bool = False):
     """
     Generates synthetic data using an autoencoder model.
 
     Args:
-        model_name (str): Name of the autoencoder model to use. Valid options are 'single_encoder', 'balanced', and 'heavy_decoder'.
-        original_df (pd.DataFrame): Original dataset to generate synthetic data from.
+        model_name (str or dict): Name of the autoencoder model to use. Valid options are 'single_encoder', 'balanced', 'heavy_decoder' and 'auto', which trains the presets and `candidates` concurrently and keeps the one with the lowest validation loss (see select_architecture). A layer configuration dict, such as the 'architecture' returned by select_architecture, is also accepted.
+        original_df (pd.DataFrame): Original dataset to generate synthetic data from. It is not modified.
         minority_class_column (str, optional): Name of the column containing the minority class label. Defaults to 'class'.
-        minority_class_label (str, optional): Label of the minority class. Defaults to '0'.
+        minority_class_label (str, optional): Label of the minority class, compared against the labels as strings. Defaults to '0'.
         decoder_activation (str, optional): Activation function for the decoder layers. Defaults to 'sigmoid'.
         epochs (int, optional): Number of epochs to train the autoencoder model. Defaults to 100.
+        noise (float, optional): Standard deviation of the Gaussian noise added to the input rows on every pass after the first, relative to each column's standard deviation. Defaults to 0.05.
+        resample (bool, optional): Whether to draw the input rows at random (with replacement) on every pass after the first instead of cycling through them in order. Defaults to False.
+        generation_batch_size (int, optional): Number of rows passed to the autoencoder per predict call. Defaults to 8192.
+        random_state (int, optional): Seed for the input noise, the row resampling and the final shuffle. Defaults to None.
+        cache (ModelCache or str, optional): Cache of trained models, or the directory of one. When the same minority data has already been trained with the same model and hyperparameters, the cached weights are loaded instead of retraining. Defaults to None (no caching).
+        engine (str, optional): Engine used to generate the synthetic rows after training. Valid options are 'keras' and 'numpy' (a pure-NumPy forward pass with much lower per-call overhead). Defaults to 'keras'.
+        batch_size (int, optional): Number of rows per training step. Defaults to 16.
+        validation_split (float, optional): Fraction of the minority rows held out to compute the validation loss. Defaults to 0.25.
+        patience (int, optional): Stop training once the validation loss has not improved for this many epochs, and keep the best weights. None trains for all epochs. Defaults to 10.
+        sampling (str, optional): How synthetic rows are generated. 'reconstruct' runs minority rows through the full autoencoder. 'gaussian', 'gmm' and 'knn' encode the minority rows once, fit a Gaussian, a Gaussian mixture or a nearest-neighbour interpolation to their bottleneck codes, and only run the decoder on sampled codes. Defaults to 'reconstruct'.
+        profiler (Profiler, optional): Records the wall time, rows processed and peak memory delta of every phase (preparation of the float32 minority array, filtering, training, generation, assembly and shuffling) and the time and throughput of every training epoch. The report is available from `profiler.report()` and is sent to the profiler's hook when the run finishes. Defaults to None.
+        candidates (list or dict, optional): Additional layer configurations searched in 'auto' mode. Defaults to None.
+        n_jobs (int, optional): Number of worker processes training candidates in 'auto' mode. Defaults to the number of CPUs, capped at the number of candidates. In 'auto' mode, candidates are pruned by successive halving instead of early stopping and the search is not cached, so `patience` and `cache` are not used.
+        jit_compile (bool, optional): Whether to compile training and, with the 'keras' engine, generation with XLA. Defaults to False.
+        steps_per_execution (int, optional): Number of training steps run per call into the compiled training function. Defaults to 1.
+        intra_op_threads (int, optional): Number of threads TensorFlow uses inside a single op. Thread pools can only be set before TensorFlow runs its first op in the process. Defaults to None (TensorFlow's default).
+        inter_op_threads (int, optional): Number of threads TensorFlow uses to run independent ops concurrently. Defaults to None (TensorFlow's default).
+        checkpoint (str, optional): Path of a Checkpoint file. When it exists, the saved model is fine-tuned for `fine_tune_epochs` epochs on the minority rows it has not been trained on yet, instead of training a new model, and `cache` is not used; otherwise the model is trained as usual and saved there. Defaults to None.
+        fine_tune_epochs (int, optional): Number of epochs to fine-tune a checkpointed model for. Defaults to 5.
+        n_members (int, optional): Number of independently initialized autoencoders trained together as one wide model (see generate_ensemble_model). Every synthetic row is generated by one member, with the NumPy engine. Not supported in 'auto' mode or with a checkpoint. Defaults to 1.
+        member_selection (str, optional): How the member of every synthetic row is picked, 'round_robin' or 'random'. Defaults to 'round_robin'.
+        transformer (TabularTransformer or str, optional): Scales the numeric feature columns and encodes the categorical ones before training, and maps the generated rows back to the original columns, categories and dtypes. 'minmax' or 'standard' fit a new TabularTransformer with that scaling to the minority rows; an unfitted TabularTransformer is fitted to them in place, and a fitted one is reused as it is. The fitted transformer is part of the cache key and is saved with a checkpoint, whose saved transformer is reused on later runs. Defaults to None (the feature columns must be numeric and are used as they are).
+        lazy (bool, optional): Whether to return synthetic_df as a BalancedView of minority_df, generated_data and majority_df with a shuffled index permutation, instead of concatenating and shuffling them into a new DataFrame. Its rows are only materialized one batch at a time. Defaults to False.
 
     Returns:
-        synthetic_df (pd.DataFrame): Balanced dataset with synthetic data.
+        synthetic_df (pd.DataFrame or BalancedView): Balanced dataset with synthetic data.
         generated_data (pd.DataFrame): Synthetic data generated by the autoencoder model.
         minority_df (pd.DataFrame): Minority class data from the original dataset.
         majority_df (pd.DataFrame): Majority class data from the original dataset.
 
     Use Case:
         Use this function to generate synthetic data using an autoencoder model. Function returns a balanced dataset with synthetic data, synthetic data generated by the autoencoder model, minority class data from the original dataset, and majority class data from the original dataset.
+        The minority features are converted once to a contiguous float32 array that is used for both training and generation, so before training the peak memory of the preparation stage stays below 0.6 times the size of a float64 input (see prepare_data); minority_df and majority_df are the only other copies of the input.
 
     Possible Next Steps:
         synthetic_df.to_csv('synthetic_data.csv', index=False)
@@ -109,6 +285,13 @@ def generate_synthetic_data(model_name: str, original_df: pd.DataFrame, minority
         a. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='single_encoder', original_df, minority_class_column='class', minority_class_label='0', decoder_activation='sigmoid', epochs=100)
         b. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='balanced', original_df, minority_class_column='class', minority_class_label='disease', decoder_activation='sigmoid', epochs=100)
         c. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='heavy_decoder', original_df, minority_class_column='class', minority_class_label='0', decoder_activation='softmax', epochs=100)
+        d. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='balanced', original_df, cache=ModelCache('/tmp/dittto'))
+        e. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='auto', original_df, n_jobs=3)
+        f. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='balanced', original_df, batch_size=256, steps_per_execution=64, intra_op_threads=4, inter_op_threads=1)
+        g. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='balanced', original_df, checkpoint='fraud.ckpt.npz', fine_tune_epochs=5)
+        h. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='balanced', original_df, n_members=8, member_selection='random')
+        i. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='balanced', original_df, transformer=TabularTransformer('standard', 'onehot'), decoder_activation='linear')
+        j. view, generated_data, minority_df, majority_df = generate_synthetic_data(model_name='balanced', original_df, lazy=True)
                     
     """
   
@@ -117,71 +300,466 @@ def generate_synthetic_data(model_name: str, original_df: pd.DataFrame, minority
     
     if epochs < 1:
         raise ValueError("Invalid number of epochs.")
-    
-    original_df[minority_class_column] = original_df[minority_class_column].astype(str)  
-    minority_df = original_df[original_df[minority_class_column] == minority_class_label]
 
-    # Check if minority class label is present in the dataset
-    if minority_df.empty:
-        raise ValueError("Minority class label not found in the dataset.")
+    if noise < 0:
+        raise ValueError("Noise must be greater than or equal to 0.")
+
+    if generation_batch_size < 1:
+        raise ValueError("Invalid generation batch size.")
+
+    if engine not in ('keras', 'numpy'):
+        raise ValueError("Invalid engine.")
+
+    if sampling not in SAMPLING_MODES:
+        raise ValueError("Invalid sampling mode.")
+
+    if steps_per_execution < 1:
+        raise ValueError("Invalid steps per execution.")
+
+    if fine_tune_epochs < 1:
+        raise ValueError("Invalid number of fine-tuning epochs.")
+
+    if n_members < 1:
+        raise ValueError("Invalid number of ensemble members.")
+
+    if member_selection not in MEMBER_SELECTIONS:
+        raise ValueError("Invalid member selection.")
+
+    if n_members > 1 and (model_name == 'auto' or checkpoint is not None):
+        raise ValueError("Ensembles are not supported in 'auto' mode or with a checkpoint.")
+
+    if intra_op_threads or inter_op_threads:
+        configure_tensorflow(intra_op_threads, inter_op_threads)
+
+    transformer = _resolve_transformer(transformer, checkpoint)
     
-    majority_df = original_df[original_df[minority_class_column] != minority_class_label]
-    minority_df = minority_df.drop(columns=[minority_class_column])
-    input_shape = minority_df.shape[1]
-    bottle_neck = 16
+    # The input is not modified: the mask is computed once and the minority features are gathered into the single
+    # float32 array used for both training and generation
+    with _phase(profiler, 'prepare', len(original_df)):
+        prepared = prepare_data(original_df, minority_class_column, minority_class_label, transformer)
+        minority_data = prepared.minority_data
+        label = label_value(original_df[minority_class_column], minority_class_label)
 
-    # Select model parameters based on model name
-    if model_name == 'single_encoder' :
-        encoder_dense_layers = [20]
-        decoder_dense_layers = [18, 20]
+    with _phase(profiler, 'filter', len(original_df)):
+        minority_df = original_df.loc[prepared.mask, prepared.columns]
+        majority_df = original_df.loc[~prepared.mask]
 
-    elif  model_name == 'balanced': 
-        encoder_dense_layers = [22, 20]
-        decoder_dense_layers = [20, 22]
+    # Select model parameters based on model name
+    if model_name != 'auto':
+        resolve_architecture(model_name)
 
-    elif model_name == 'heavy_decoder':
-        encoder_dense_layers = [22,20]
-        decoder_dense_layers = [18, 20, 22, 24]
+    with _phase(profiler, 'fit', len(minority_data)):
+        autoencoder = _fit_autoencoder(model_name, minority_data, prepared.columns, decoder_activation, epochs, cache,
+                                       profiler=profiler, candidates=candidates, n_jobs=n_jobs, jit_compile=jit_compile,
+                                       steps_per_execution=steps_per_execution, checkpoint=checkpoint,
+                                       fine_tune_epochs=fine_tune_epochs, n_members=n_members, transformer=transformer,
+                                       batch_size=batch_size, validation_split=validation_split, patience=patience)
 
-    else:
-        raise ValueError("Invalid model name.") 
-    pass
-   
     try:
-        autoencoder, _, _ = generate_model(input_shape, encoder_dense_layers=encoder_dense_layers,
-                                                            bottle_neck=bottle_neck, 
-                                                            decoder_dense_layers=decoder_dense_layers,
-                                                            decoder_activation=decoder_activation)
-    except ValueError:
-        raise ValueError("Invalid model parameters.")
+        with _phase(profiler, 'generate', len(majority_df)):
+            batches = _synthetic_batches(autoencoder, minority_data, len(majority_df), batch_size=generation_batch_size,
+                                         noise=noise, resample=resample, sampling=sampling, random_state=random_state,
+                                         engine=engine, jit_compile=jit_compile, member_selection=member_selection)
+            generated = _generate_rows(batches, len(majority_df), minority_data.shape[1])
+
+        with _phase(profiler, 'assemble', len(minority_df) + 2 * len(majority_df)):
+            if transformer is not None:
+                generated_data = transformer.inverse_transform(generated)
+                generated_data.columns = minority_df.columns
+            else:
+                generated_data = pd.DataFrame(generated, columns=minority_df.columns, copy=False)
+            generated_data[minority_class_column] = label
+            if not lazy:
+                # The original minority rows are labelled too, as in BalancedView; minority_df itself keeps no class column
+                synthetic_df = pd.concat([minority_df.assign(**{minority_class_column: label}), generated_data,
+                                          majority_df], ignore_index=True)
+
+        n_synthetic = len(minority_df) + len(generated_data) + len(majority_df)
+        with _phase(profiler, 'shuffle', n_synthetic):
+            if lazy:
+                # Only an index permutation is shuffled; rows are gathered from the three tables batch by batch
+                synthetic_df = BalancedView(minority_df, generated_data, majority_df, minority_class_column,
+                                            label, random_state, transformer)
+            else:
+                synthetic_df = synthetic_df.sample(frac=1, random_state=random_state).reset_index(drop=True)
     
-    opt = keras.optimizers.Adam(learning_rate=0.001)
-    autoencoder.compile(optimizer=opt, loss='mse')
+    except Exception as e:
+        raise Exception(e)
 
-    batch_size = 16
-    validation_split = 0.25
-    verbose = 0
+    if profiler is not None:
+        profiler.finish()
+
+    return synthetic_df, generated_data, minority_df, majority_df
 
-    try:
-        autoencoder.fit(minority_df, minority_df, epochs=epochs, batch_size=batch_size, validation_split=validation_split, verbose=verbose)
-        generated_data = pd.DataFrame()
 
-        while len(generated_data) <= len(majority_df):
-            synthetic_minority_df = autoencoder.predict(minority_df, verbose=verbose)
-            reshaped_data = synthetic_minority_df.reshape(len(minority_df), -1)
-            df_generated = pd.DataFrame(reshaped_data, columns = minority_df.columns)
+def iter_synthetic_data(model_name: str, original_df: pd.DataFrame, minority_class_column: str = 'class',
+                        minority_class_label: str = '0', decoder_activation: str = 'sigmoid', epochs: int = 100,
+                        n_rows: int = None, chunk_size: int = 100000, output_path: str = None, noise: float = 0.05,
+                        resample: bool = False, random_state: int = None, cache: ModelCache = None,
+                        engine: str = 'keras', batch_size: int = 16, validation_split: float = 0.25,
+                        patience: int = 10, sampling: str = 'reconstruct', transformer=None):
+    """
+    Trains an autoencoder model once and returns a generator of synthetic minority rows in chunks.
 
-            if minority_class_label.isnumeric():
-                df_generated[minority_class_column] = int(minority_class_label)
+    Args:
+        model_name (str or dict): Name of the autoencoder model to use. Valid options are 'single_encoder', 'balanced', 'heavy_decoder' and 'auto', or a layer configuration dict. See generate_synthetic_data.
+        original_df (pd.DataFrame): Original dataset to generate synthetic data from. It is not modified.
+        minority_class_column (str, optional): Name of the column containing the minority class label. Defaults to 'class'.
+        minority_class_label (str, optional): Label of the minority class. Defaults to '0'.
+        decoder_activation (str, optional): Activation function for the decoder layers. Defaults to 'sigmoid'.
+        epochs (int, optional): Number of epochs to train the autoencoder model. Defaults to 100.
+        n_rows (int, optional): Total number of synthetic rows to generate. Defaults to the number of majority class rows, like generate_synthetic_data.
+        chunk_size (int, optional): Number of rows per yielded chunk. Defaults to 100000.
+        output_path (str, optional): A .csv or .parquet file every chunk is also written to as it is generated. Defaults to None.
+        noise (float, optional): Standard deviation of the Gaussian noise added to the input rows on every pass after the first, relative to each column's standard deviation. Defaults to 0.05.
+        resample (bool, optional): Whether to draw the input rows at random (with replacement) on every pass after the first. Defaults to False.
+        random_state (int, optional): Seed for the input noise and the row resampling. Defaults to None.
+        cache (ModelCache or str, optional): Cache of trained models, or the directory of one. Defaults to None (no caching).
+        engine (str, optional): Engine used to generate the synthetic rows, 'keras' or 'numpy'. Defaults to 'keras'.
+        batch_size (int, optional): Number of rows per training step. Defaults to 16.
+        validation_split (float, optional): Fraction of the minority rows held out to compute the validation loss. Defaults to 0.25.
+        patience (int, optional): Early stopping patience in epochs. None trains for all epochs. Defaults to 10.
+        sampling (str, optional): How synthetic rows are generated: 'reconstruct', 'gaussian', 'gmm' or 'knn'. See generate_synthetic_data. Defaults to 'reconstruct'.
+        transformer (TabularTransformer or str, optional): Transformer the feature columns are scaled and encoded with; every chunk is mapped back with it. See generate_synthetic_data. Defaults to None.
+
+    Returns:
+        generator: Yields pd.DataFrame chunks of at most `chunk_size` synthetic rows, including the class column.
+
+    Use Case:
+        Use this function instead of generate_synthetic_data when the synthetic data does not fit in memory. The model is trained when the function is called; afterwards peak memory depends on the minority data and `chunk_size`, not on the number of rows generated.
+
+    Possible Next Steps:
+        for chunk in iter_synthetic_data('balanced', original_df, n_rows=10_000_000, output_path='synthetic.parquet'):
+            pass
+
+    Example:
+        a. for chunk in iter_synthetic_data('single_encoder', original_df, minority_class_column='class', minority_class_label='0', chunk_size=50000): ...
+        b. chunks = iter_synthetic_data('heavy_decoder', original_df, n_rows=1_000_000, output_path='synthetic.csv', engine='numpy')
+    """
+
+    if original_df.empty:
+        raise ValueError("Empty dataframe.")
+
+    if epochs < 1:
+        raise ValueError("Invalid number of epochs.")
+
+    if noise < 0:
+        raise ValueError("Noise must be greater than or equal to 0.")
+
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+
+    if n_rows is not None and n_rows < 0:
+        raise ValueError("Invalid number of rows.")
+
+    if engine not in ('keras', 'numpy'):
+        raise ValueError("Invalid engine.")
+
+    if sampling not in SAMPLING_MODES:
+        raise ValueError("Invalid sampling mode.")
+
+    if model_name != 'auto':
+        resolve_architecture(model_name)
+
+    transformer = _resolve_transformer(transformer)
+    mask, columns, minority_data = prepare_data(original_df, minority_class_column, minority_class_label, transformer)
+    if n_rows is None:
+        n_rows = len(mask) - len(minority_data)
+
+    autoencoder = _fit_autoencoder(model_name, minority_data, columns, decoder_activation, epochs, cache,
+                                   transformer=transformer, batch_size=batch_size, validation_split=validation_split,
+                                   patience=patience)
+    batches = _synthetic_batches(autoencoder, minority_data, n_rows, batch_size=chunk_size, noise=noise,
+                                 resample=resample, sampling=sampling, random_state=random_state, engine=engine)
+
+    label = label_value(original_df[minority_class_column], minority_class_label)
+    return _iter_chunks(batches, columns, minority_class_column, label, output_path, transformer)
+
+
+def _iter_chunks(batches, columns: list, class_column: str, label, output_path: str = None,
+                 transformer: TabularTransformer = None):
+    """Wraps float32 batches, mapped back with `transformer` if given, in DataFrames with the class column and optionally writes them to `output_path`."""
+    def frame(batch: np.ndarray) -> pd.DataFrame:
+        if transformer is not None:
+            chunk = transformer.inverse_transform(batch)
+            chunk.columns = columns
+        else:
+            chunk = pd.DataFrame(batch, columns=columns, copy=False)
+        chunk[class_column] = label
+        return chunk
+
+    writer = ChunkWriter(output_path) if output_path is not None else None
+    try:
+        for batch in batches:
+            chunk = frame(batch)
+            if writer is not None:
+                writer.write(chunk)
+            yield chunk
+        if writer is not None and writer.rows == 0:
+            # Without any rows, the file still gets the header (CSV) or the schema (Parquet)
+            n_features = transformer.n_features if transformer is not None else len(columns)
+            writer.write(frame(np.empty((0, n_features), dtype=np.float32)))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _fit_autoencoder(model_name, minority_data: np.ndarray, columns: list, decoder_activation: str, epochs: int,
+                     cache: ModelCache = None, profiler: Profiler = None, candidates=None, n_jobs: int = None,
+                     jit_compile: bool = False, steps_per_execution: int = 1, checkpoint: str = None,
+                     fine_tune_epochs: int = 5, n_members: int = 1, transformer: TabularTransformer = None,
+                     **fit_kwargs):
+    """
+    Trains the model `model_name`, or for 'auto' searches the presets and `candidates` and returns the best one.
+
+    With an existing `checkpoint`, its model is fine-tuned on the new rows instead; with a new one, the trained model is
+    saved there together with `transformer`, the fitted transformer `minority_data` was prepared with.
+    """
+    if checkpoint is not None and os.path.exists(checkpoint):
+        return _fine_tune_checkpoint(checkpoint, model_name, minority_data, columns, decoder_activation,
+                                     fine_tune_epochs, transformer, jit_compile=jit_compile,
+                                     steps_per_execution=steps_per_execution,
+                                     batch_size=fit_kwargs.get('batch_size', 16))
+
+    trained_epochs = epochs
+    if model_name != 'auto':
+        architecture = resolve_architecture(model_name)
+        autoencoder, history = _train_autoencoder(minority_data, columns, architecture, decoder_activation, epochs, cache,
+                                                  profiler=profiler, jit_compile=jit_compile,
+                                                  steps_per_execution=steps_per_execution, n_members=n_members,
+                                                  transformer=transformer, **fit_kwargs)
+        # EarlyStopping may end training early; cached weights carry no history, so they count as fully trained
+        if history is not None:
+            trained_epochs = len(history.epoch)
+    else:
+        # The winner of the search has already been trained for all epochs, so its weights are used as they are
+        selection = select_architecture(minority_data, candidates, decoder_activation=decoder_activation,
+                                        epochs=epochs, n_jobs=n_jobs, batch_size=fit_kwargs.get('batch_size', 16),
+                                        validation_split=fit_kwargs.get('validation_split', 0.25))
+        architecture = selection['architecture']
+        trained_epochs = selection['epochs']
+        autoencoder, _, _ = generate_model(minority_data.shape[1], decoder_activation=decoder_activation,
+                                           **architecture)
+        autoencoder.set_weights(selection['weights'])
+
+    if checkpoint is not None:
+        Checkpoint(autoencoder, architecture, decoder_activation, row_hashes(minority_data), trained_epochs, columns,
+                   transformer).save(checkpoint)
+    return autoencoder
+
+
+def _fine_tune_checkpoint(path: str, model_name, minority_data: np.ndarray, columns: list, decoder_activation: str,
+                          epochs: int, transformer: TabularTransformer = None, **fit_kwargs):
+    """Loads the checkpoint at `path`, fine-tunes it on the rows it has not been trained on and saves it again."""
+    checkpoint = Checkpoint.load(path)
+    if ((model_name != 'auto' and resolve_architecture(model_name) != checkpoint.architecture) or
+            decoder_activation != checkpoint.decoder_activation or
+            (checkpoint.columns is not None and checkpoint.columns != [str(column) for column in columns]) or
+            _transformer_key(checkpoint.transformer) != _transformer_key(transformer)):
+        raise ValueError("Checkpoint does not match the model.")
+
+    checkpoint.fine_tune(minority_data, epochs=epochs, **fit_kwargs)
+    checkpoint.save(path)
+    return checkpoint.autoencoder
+
+
+def _train_autoencoder(minority_data: np.ndarray, columns: list, architecture: dict, decoder_activation: str,
+                       epochs: int, cache: ModelCache = None, profiler: Profiler = None, jit_compile: bool = False,
+                       steps_per_execution: int = 1, autoencoder=None, n_members: int = 1,
+                       transformer: TabularTransformer = None, **fit_kwargs):
+    """
+    Builds an autoencoder with the given architecture and trains it on `minority_data`, or loads it from `cache`.
+
+    The compilation settings only change how fast the model trains, not its weights, so they are left out of the cache key.
+    The fitted `transformer` `minority_data` was prepared with is part of it, so a cached model is only reused together
+    with the same scaling and encoding.
+    `autoencoder` is an already built model with this architecture to train instead of building a new one, and
+    `n_members` > 1 builds an ensemble of that many autoencoders with generate_ensemble_model.
+    Returns the model and the history of its training, which is None when the weights came from the cache.
+    """
+    if autoencoder is None:
+        try:
+            if n_members > 1:
+                autoencoder, _, _ = generate_ensemble_model(minority_data.shape[1], n_members,
+                                                            decoder_activation=decoder_activation, **architecture)
             else:
-                df_generated[minority_class_column] = minority_class_label
+                autoencoder, _, _ = generate_model(minority_data.shape[1], decoder_activation=decoder_activation,
+                                                   **architecture)
+        except ValueError:
+            raise ValueError("Invalid model parameters.")
+
+    if isinstance(cache, str):
+        cache = ModelCache(cache)
+
+    cache_key = weights_path = None
+    if cache is not None:
+        extra = {'n_members': n_members} if n_members > 1 else {}
+        if transformer is not None:
+            extra['transformer'] = transformer.to_config()
+        cache_key = cache.key(minority_data, columns=list(columns), decoder_activation=decoder_activation,
+                              epochs=epochs, **architecture, **extra, **fit_kwargs)
+        weights_path = cache.get(cache_key)
+
+    history = None
+    if weights_path is not None:
+        autoencoder.load_weights(weights_path)
+    else:
+        callbacks = []
+        if profiler is not None:
+            n_validation = int(len(minority_data) * fit_kwargs.get('validation_split', 0.25))
+            callbacks.append(_EpochProfiler(profiler, len(minority_data) - n_validation))
+        history = fit_model(autoencoder, minority_data, epochs=epochs, callbacks=callbacks, jit_compile=jit_compile,
+                            steps_per_execution=steps_per_execution, **fit_kwargs)
+        if cache is not None:
+            cache.put(cache_key, autoencoder.save_weights)
 
-            generated_data = pd.concat([generated_data, df_generated], ignore_index=True)
+    return autoencoder, history
 
-        synthetic_df = pd.concat([minority_df, generated_data, majority_df], ignore_index=True)
-        synthetic_df = synthetic_df.sample(frac=1).reset_index(drop=True)
-    
-    except Exception as e:
-        raise Exception(e)
 
-    return synthetic_df, generated_data[:len(majority_df)], minority_df, majority_df
\ No newline at end of file
+def _resolve_transformer(transformer, checkpoint: str = None) -> TabularTransformer:
+    """
+    Returns the TabularTransformer of a run: a new one for a scaling name, or the given one.
+
+    An unfitted transformer takes the fitted state saved with an existing `checkpoint`, so the checkpointed model keeps
+    seeing its rows scaled and encoded the same way.
+    """
+    if transformer is None:
+        return None
+    if isinstance(transformer, str):
+        transformer = TabularTransformer(scaling=transformer)
+    elif not isinstance(transformer, TabularTransformer):
+        raise ValueError("Invalid transformer.")
+
+    if checkpoint is not None and os.path.exists(checkpoint) and not transformer.fitted:
+        saved = Checkpoint.load_transformer(checkpoint)
+        if saved is not None:
+            transformer._load_config(saved.to_config())
+    return transformer
+
+
+def _transformer_key(transformer: TabularTransformer) -> str:
+    """Returns a string identifying the fitted state of a transformer, or None."""
+    return json.dumps(transformer.to_config(), sort_keys=True) if transformer is not None else None
+
+
+class _EpochProfiler(keras.callbacks.Callback):
+    """Reports the wall time and throughput of every training epoch to a Profiler."""
+
+    def __init__(self, profiler: Profiler, samples: int):
+        super().__init__()
+        self.profiler = profiler
+        self.samples = samples
+        self.start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.profiler.record_epoch(epoch, time.perf_counter() - self.start, self.samples, logs)
+
+
+def _phase(profiler: Profiler, name: str, rows: int = None):
+    """Returns the profiler's context manager for a phase, or a no-op one when profiling is off."""
+    if profiler is None:
+        return nullcontext({})
+    return profiler.phase(name, rows)
+
+
+def _predict_function(autoencoder, engine: str = 'keras', jit_compile: bool = False):
+    """Returns a function that runs a batch of rows through the trained autoencoder with the given engine."""
+    if engine == 'numpy':
+        return NumpyModel.from_keras(autoencoder).predict
+    if jit_compile and not (autoencoder.compiled and autoencoder.jit_compile):
+        # Models loaded from the cache, and the encoder and decoder submodels, have not been compiled by fit_model
+        autoencoder.compile(loss='mse', jit_compile=True)
+    return lambda batch: autoencoder.predict(batch, batch_size=len(batch), verbose=0)
+
+
+def _synthetic_batches(autoencoder, minority_data: np.ndarray, n_rows: int, batch_size: int = 8192,
+                       noise: float = 0.05, resample: bool = False, sampling: str = 'reconstruct',
+                       random_state: int = None, engine: str = 'keras', jit_compile: bool = False,
+                       member_selection: str = 'round_robin'):
+    """Returns an iterator of float32 batches of exactly `n_rows` synthetic rows for the given sampling mode."""
+    if getattr(autoencoder, 'n_members', 1) > 1:
+        return _ensemble_batches(autoencoder, minority_data, n_rows, batch_size, noise, resample, sampling,
+                                 random_state, member_selection)
+
+    if sampling == 'reconstruct':
+        return _iter_generated_batches(_predict_function(autoencoder, engine, jit_compile), minority_data, n_rows,
+                                       batch_size=batch_size, noise=noise, resample=resample, random_state=random_state)
+
+    # Encode the minority rows once; afterwards only the decoder runs, on sampled codes
+    encode = _predict_function(autoencoder.get_layer('encoder'), engine, jit_compile)
+    codes = np.concatenate([encode(minority_data[start:start + batch_size])
+                            for start in range(0, len(minority_data), batch_size)])
+    sampler = LatentSampler(sampling, random_state=random_state).fit(codes)
+    decode = _predict_function(autoencoder.get_layer('decoder'), engine, jit_compile)
+    return _iter_latent_batches(decode, sampler, n_rows, batch_size)
+
+
+def _ensemble_batches(autoencoder, minority_data: np.ndarray, n_rows: int, batch_size: int, noise: float,
+                      resample: bool, sampling: str, random_state: int, member_selection: str):
+    """Returns an iterator of float32 batches of synthetic rows, each row generated by one member of an ensemble."""
+    member_seed, sampler_seed = np.random.SeedSequence(random_state).generate_state(2)
+    select = member_selector(autoencoder.n_members, member_selection, int(member_seed))
+    n_columns = minority_data.shape[1]
+
+    if sampling == 'reconstruct':
+        members = ensemble_members(autoencoder)
+        predict = lambda batch: dispatch(select(len(batch)), n_columns, lambda member, rows: members[member](batch[rows]))
+        return _iter_generated_batches(predict, minority_data, n_rows, batch_size=batch_size, noise=noise,
+                                       resample=resample, random_state=random_state)
+
+    # Every member has its own latent space, so a sampler is fitted to each member's codes
+    decoders = ensemble_members(autoencoder.get_layer('decoder'))
+    samplers = [LatentSampler(sampling, random_state=int(sampler_seed) + member).fit(encoder.predict(minority_data))
+                for member, encoder in enumerate(ensemble_members(autoencoder.get_layer('encoder')))]
+    return (dispatch(select(min(batch_size, n_rows - start)), n_columns,
+                     lambda member, rows: decoders[member](samplers[member].sample(len(rows))))
+            for start in range(0, n_rows, batch_size))
+
+
+def _iter_latent_batches(decode, sampler: LatentSampler, n_rows: int, batch_size: int = 8192):
+    """Yields float32 batches of decoded latent samples until exactly `n_rows` rows have been produced."""
+    for start in range(0, n_rows, batch_size):
+        codes = sampler.sample(min(batch_size, n_rows - start))
+        yield np.asarray(decode(codes), dtype=np.float32).reshape(len(codes), -1)
+
+
+def _generate_rows(batches, n_rows: int, n_columns: int) -> np.ndarray:
+    """Collects exactly `n_rows` synthetic rows from an iterator of batches into a single preallocated float32 buffer."""
+    generated = np.empty((n_rows, n_columns), dtype=np.float32)
+    start = 0
+    for batch in batches:
+        generated[start:start + len(batch)] = batch
+        start += len(batch)
+    return generated
+
+
+def _iter_generated_batches(predict, source, n_rows: int, batch_size: int = 8192, noise: float = 0.05,
+                            resample: bool = False, random_state: int = None):
+    """
+    Yields float32 batches of synthetic rows until exactly `n_rows` rows have been produced.
+
+    The first pass over `source` reconstructs every row once, in order. Every later pass perturbs its input rows with
+    Gaussian noise scaled by each column's standard deviation (see noise_scale) and, when `resample` is set, draws them
+    at random with replacement, so a deterministic model produces new rows instead of copies of the first pass.
+    """
+    rng = np.random.default_rng(random_state)
+    n_source = len(source)
+    scale = noise_scale(source.std(axis=0), source.mean(axis=0), noise)
+
+    for start in range(0, n_rows, batch_size):
+        positions = np.arange(start, min(start + batch_size, n_rows))
+        repeated = positions >= n_source
+        indices = positions % n_source
+        n_repeated = int(repeated.sum())
+
+        if resample and n_repeated:
+            indices[repeated] = rng.integers(0, n_source, size=n_repeated)
+
+        batch = source[indices]
+        if scale is not None and n_repeated:
+            batch[repeated] += rng.standard_normal((n_repeated, source.shape[1]), dtype=np.float32) * scale
+
+        yield np.asarray(predict(batch), dtype=np.float32).reshape(len(batch), -1)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from .preparation import to_float32
+
+_SEQUENCE_CLASS = None
+
+
+class BalancedView:
+    """
+    A shuffled balanced dataset of the minority, generated and majority rows, materialized one batch at a time.
+
+    Args:
+        minority_df (pd.DataFrame): The original minority rows, without the class column.
+        generated_data (pd.DataFrame): The synthetic minority rows, with the class column.
+        majority_df (pd.DataFrame): The original majority rows, with the class column.
+        class_column (str): Name of the class column.
+        label: Class label of the minority and generated rows.
+        random_state (int, optional): Seed of the shuffle. With the same seed, the rows come in the same order as in the synthetic_df built by generate_synthetic_data. Defaults to None.
+        transformer (TabularTransformer, optional): The fitted transformer the model was trained with. Batches then hold the transformed features of every row, so the majority rows may only contain categories the transformer was fitted on. Defaults to None.
+        batch_size (int, optional): Number of rows per batch when iterating over the view. Defaults to 256.
+
+    Use Case:
+        generate_synthetic_data(..., lazy=True) returns a view instead of concatenating the three tables and shuffling the result, which copies the largest table twice. The view holds the three tables it was given and a single shuffled int32 permutation of the row positions. Iterating yields (features, labels) pairs of float32 feature rows and class labels; as_sequence and as_dataset wrap it as a Keras PyDataset and a tf.data.Dataset for a downstream classifier, and to_frame materializes any range of rows. As in synthetic_df, every minority row is labelled with `label`.
+
+    Example:
+        a. view, generated_data, minority_df, majority_df = generate_synthetic_data('balanced', original_df, lazy=True)
+           classifier.fit(view.as_sequence(batch_size=1024), epochs=10)
+        b. for features, labels in view.batches(65536): ...
+    """
+
+    def __init__(self, minority_df: pd.DataFrame, generated_data: pd.DataFrame, majority_df: pd.DataFrame,
+                 class_column: str, label, random_state: int = None, transformer=None, batch_size: int = 256):
+        if batch_size < 1:
+            raise ValueError("Invalid batch size.")
+
+        self.sources = (minority_df, generated_data, majority_df)
+        self.columns = list(minority_df.columns)
+        self.class_column = class_column
+        self.label = label
+        self.transformer = transformer
+        self.batch_size = batch_size
+        self.offsets = np.cumsum([0] + [len(source) for source in self.sources])
+
+        # The same permutation as DataFrame.sample(frac=1, random_state=random_state) on the concatenated tables
+        n_rows = int(self.offsets[-1])
+        dtype = np.int32 if n_rows < 2 ** 31 else np.int64
+        self.permutation = np.random.RandomState(random_state).permutation(n_rows).astype(dtype, copy=False)
+
+        majority_labels = majority_df[class_column].to_numpy()
+        self._labels_dtype = np.result_type(np.asarray([label]).dtype, majority_labels.dtype)
+        if self._labels_dtype.kind in 'OUS':
+            self._labels_dtype = np.dtype(object)
+
+    @property
+    def n_features(self) -> int:
+        return self.transformer.n_features if self.transformer is not None else len(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.permutation)
+
+    def __iter__(self):
+        return self.batches(self.batch_size)
+
+    def _locate(self, start: int, stop: int):
+        """Yields every source table with the batch positions of its rows and their positions in the table."""
+        index = self.permutation[start:stop]
+        source = np.searchsorted(self.offsets[1:], index, side='right')
+        for k, table in enumerate(self.sources):
+            selected = np.flatnonzero(source == k)
+            if len(selected):
+                yield k, table, selected, index[selected] - self.offsets[k]
+
+    def batch(self, start: int, stop: int) -> tuple:
+        """Returns the float32 features and the labels of the shuffled rows from `start` to `stop`."""
+        stop = min(stop, len(self))
+        start = min(start, stop)
+        features = np.empty((stop - start, self.n_features), dtype=np.float32)
+        labels = np.empty(stop - start, dtype=self._labels_dtype)
+
+        for k, table, selected, rows in self._locate(start, stop):
+            if self.transformer is not None:
+                features[selected] = self.transformer.transform(table.iloc[rows])
+            else:
+                features[selected] = to_float32(table, self.columns, rows)
+            labels[selected] = self.label if k < 2 else table[self.class_column].to_numpy()[rows]
+
+        return features, labels
+
+    def batches(self, batch_size: int = None):
+        """Yields (features, labels) pairs of `batch_size` shuffled rows, or of the view's batch size."""
+        batch_size = batch_size or self.batch_size
+        for start in range(0, len(self), batch_size):
+            yield self.batch(start, start + batch_size)
+
+    def to_frame(self, start: int = 0, stop: int = None) -> pd.DataFrame:
+        """Materializes the shuffled rows from `start` to `stop` (every row by default) as a DataFrame with the class column."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        frames, positions = [], []
+        for k, table, selected, rows in self._locate(start, stop):
+            frame = table.iloc[rows]
+            if k == 0:
+                frame = frame.assign(**{self.class_column: self.label})
+            frames.append(frame)
+            positions.append(selected)
+
+        if not frames:
+            return pd.DataFrame(columns=self.columns + [self.class_column])
+        frame = pd.concat(frames, ignore_index=True)[self.columns + [self.class_column]]
+        return frame.iloc[np.argsort(np.concatenate(positions), kind='stable')].reset_index(drop=True)
+
+    def as_sequence(self, batch_size: int = None, **kwargs):
+        """Returns a Keras PyDataset of (features, labels) batches. Every other argument is passed to PyDataset."""
+        return _sequence_class()(self, batch_size or self.batch_size, **kwargs)
+
+    def as_dataset(self, batch_size: int = None):
+        """Returns a tf.data.Dataset of (features, labels) batches. Numeric labels are required."""
+        import tensorflow as tf
+
+        if self._labels_dtype == object:
+            raise ValueError("Class labels must be numeric.")
+        batch_size = batch_size or self.batch_size
+        signature = (tf.TensorSpec((None, self.n_features), tf.float32),
+                     tf.TensorSpec((None,), tf.as_dtype(self._labels_dtype)))
+        return tf.data.Dataset.from_generator(lambda: self.batches(batch_size), output_signature=signature)
+
+    def __repr__(self):
+        return 'BalancedView(rows=%d, minority=%d, generated=%d, majority=%d)' % (
+            len(self), len(self.sources[0]), len(self.sources[1]), len(self.sources[2]))
+
+
+def _sequence_class():
+    """Defines the Keras PyDataset wrapper of a BalancedView on first use, so importing this module does not load TensorFlow."""
+    global _SEQUENCE_CLASS
+    if _SEQUENCE_CLASS is None:
+        from tensorflow import keras
+
+        class BalancedSequence(keras.utils.PyDataset):
+            def __init__(self, view: BalancedView, batch_size: int, **kwargs):
+                super().__init__(**kwargs)
+                self.view = view
+                self.batch_size = batch_size
+
+            def __len__(self):
+                return -(-len(self.view) // self.batch_size)
+
+            def __getitem__(self, index):
+                return self.view.batch(index * self.batch_size, (index + 1) * self.batch_size)
+
+        _SEQUENCE_CLASS = BalancedSequence
+    return _SEQUENCE_CLASS
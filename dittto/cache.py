@@ -0,0 +1,226 @@
+import contextlib
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dittto')
+
+
+def fingerprint_data(data: np.ndarray, sample_rows: int = None) -> str:
+    """
+    Computes a fingerprint of a 2D array of training data.
+
+    Args:
+        data (np.ndarray): The data to fingerprint.
+        sample_rows (int, optional): When set, only this many evenly spaced rows (always including the first and the last) are hashed together with the shape of the data. This is much cheaper on large tables but will not notice changes to the rows that are skipped. Defaults to None, which hashes the full content.
+
+    Returns:
+        str: A hex digest identifying the data.
+
+    Example:
+        a. fingerprint = fingerprint_data(minority_data)
+        b. fingerprint = fingerprint_data(minority_data, sample_rows=1024)
+    """
+
+    data = np.ascontiguousarray(data)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((data.shape, data.dtype.str)).encode())
+
+    if sample_rows is not None and len(data) > sample_rows:
+        data = np.ascontiguousarray(data[np.linspace(0, len(data) - 1, sample_rows).astype(np.int64)])
+
+    digest.update(memoryview(data).cast('B'))
+    return digest.hexdigest()
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """Applies the SplitMix64 finalizer to an array of uint64 values in place."""
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xbf58476d1ce4e5b9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94d049bb133111eb)
+    x ^= x >> np.uint64(31)
+    return x
+
+
+def row_hashes(data: np.ndarray) -> np.ndarray:
+    """
+    Computes a 64-bit hash of every row of a 2D array of training data.
+
+    The rows are converted to float32 and hashed column by column with vectorized SplitMix64 steps, so the cost is a
+    few passes over the data. Equal rows get equal hashes regardless of where they are in the array.
+
+    Args:
+        data (np.ndarray): The data to hash.
+
+    Returns:
+        np.ndarray: A uint64 array with one hash per row.
+
+    Example:
+        new_rows = ~np.isin(row_hashes(minority_data), previous_hashes)
+    """
+
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    data = data.reshape(len(data), -1)
+    bits = data.view(np.uint32)
+    hashes = np.full(len(data), data.shape[1], dtype=np.uint64)
+    for column in range(bits.shape[1]):
+        hashes = _mix64(hashes ^ (bits[:, column] + np.uint64(0x9e3779b97f4a7c15 * (column + 1) % 2 ** 64)))
+    return hashes
+
+
+class ModelCache:
+    """
+    A size-bounded on-disk cache of trained autoencoder weights.
+
+    Entries are keyed by a fingerprint of the training data together with the model architecture and the training
+    hyperparameters. When the cache grows beyond `max_entries` entries or `max_bytes` bytes, the least recently used
+    entries are evicted.
+
+    Args:
+        cache_dir (str, optional): Directory the weights are stored in. Defaults to the `DITTTO_CACHE_DIR` environment variable, or ~/.cache/dittto.
+        max_entries (int, optional): Maximum number of cached models. Defaults to 32.
+        max_bytes (int, optional): Maximum total size of the cached weights in bytes. Defaults to None (unbounded).
+        sample_rows (int, optional): Number of rows used to fingerprint the training data. Defaults to None, which hashes the full content.
+
+    Example:
+        cache = ModelCache('/tmp/dittto', max_entries=8)
+        synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data('balanced', original_df, cache=cache)
+        print(cache.stats)
+    """
+
+    INDEX_FILE = 'index.json'
+    LOCK_FILE = 'index.lock'
+
+    def __init__(self, cache_dir: str = None, max_entries: int = 32, max_bytes: int = None, sample_rows: int = None):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("Invalid maximum number of cache entries.")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("Invalid maximum cache size.")
+
+        self.cache_dir = cache_dir or os.environ.get('DITTTO_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sample_rows = sample_rows
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, data: np.ndarray, **params) -> str:
+        """Returns the cache key for training `data` with the given architecture and hyperparameters."""
+        description = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(fingerprint_data(data, self.sample_rows).encode())
+        digest.update(description.encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """Returns the path the weights for `key` are stored at."""
+        return os.path.join(self.cache_dir, key + '.weights.h5')
+
+    def get(self, key: str):
+        """Returns the path to the cached weights for `key`, or None on a miss."""
+        with self._lock():
+            index = self._read_index()
+            if key not in index or not os.path.exists(self.path(key)):
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+            index[key]['last_access'] = time.time()
+            self._write_index(index)
+        return self.path(key)
+
+    def put(self, key: str, save) -> str:
+        """
+        Stores a new entry by calling `save(path)` and evicts the least recently used entries if needed. The new entry
+        itself is never evicted, so an entry larger than `max_bytes` is kept until the next one is stored.
+
+        `save` is typically a model's `save_weights` method. The weights are written to a temporary file first, so a
+        crashed writer never leaves a partial entry behind. Updates of the index are serialized across processes with a
+        lock file, so concurrent writers never drop each other's entries.
+        """
+        path = self.path(key)
+        tmp_path = os.path.join(self.cache_dir, '%s.%d.tmp.weights.h5' % (key, os.getpid()))
+        save(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock():
+            index = self._read_index()
+            index[key] = {'last_access': time.time(), 'size': os.path.getsize(path)}
+            self._evict(index, keep=key)
+            self._write_index(index)
+        return path
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        with self._lock():
+            for key in self._read_index():
+                self._remove(key)
+            self._write_index({})
+
+    def __len__(self):
+        return len(self._read_index())
+
+    def _evict(self, index: dict, keep: str = None):
+        by_age = sorted((key for key in index if key != keep), key=lambda key: index[key]['last_access'])
+        total = sum(entry['size'] for entry in index.values())
+
+        while by_age and ((self.max_entries is not None and len(index) > self.max_entries) or
+                          (self.max_bytes is not None and total > self.max_bytes)):
+            key = by_age.pop(0)
+            total -= index.pop(key)['size']
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def _remove(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    @contextlib.contextmanager
+    def _lock(self):
+        """Holds an exclusive lock on the index for the duration of a read-modify-write, across processes."""
+        with open(os.path.join(self.cache_dir, self.LOCK_FILE), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                # msvcrt.locking locks from the current position and gives up after about ten seconds
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_index(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, self.INDEX_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_index(self, index: dict):
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,208 @@
+"""
+Rebalances CSV and Parquet files with dittto autoencoders.
+
+Every input file is rebalanced independently by a pool of worker processes. Each worker imports TensorFlow once and
+keeps its models between files, so only the first file per worker pays the startup and tracing cost.
+
+Usage:
+    dittto data/*.csv --class-column class --label 0 --model balanced --ratio 1.0
+    dittto a.parquet b.parquet --output-dir balanced/ --jobs 2 --tf-threads 4 --summary summary.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from .latent import SAMPLING_MODES
+from .parallel import configure_tensorflow, process_pool
+from .presets import MODEL_PRESETS, resolve_architecture
+from .readers import expand_paths
+
+# Models built by the current worker process, by input width and architecture. They are reset to their initial weights
+# and retrained for every file, which skips building the model and tracing its training step again.
+_WARM_MODELS = {}
+
+
+def _warm_model(n_columns: int, architecture: dict, decoder_activation: str):
+    """Returns this process' model for the given shape and architecture, reset to its initial weights."""
+    from .autoencoder import generate_model
+
+    key = (n_columns, decoder_activation, json.dumps(architecture, sort_keys=True))
+    if key not in _WARM_MODELS:
+        autoencoder, _, _ = generate_model(n_columns, decoder_activation=decoder_activation, **architecture)
+        _WARM_MODELS[key] = (autoencoder, autoencoder.get_weights())
+
+    autoencoder, initial_weights = _WARM_MODELS[key]
+    autoencoder.set_weights(initial_weights)
+    return autoencoder
+
+
+def output_path_for(input_path: str, output_dir: str = None, output_format: str = None) -> str:
+    """Returns the output file of an input file: `<name>_synthetic.<ext>` in `output_dir`, or next to the input."""
+    directory, filename = os.path.split(input_path)
+    stem, extension = os.path.splitext(filename)
+    if output_format is not None:
+        extension = '.' + output_format
+    return os.path.join(output_dir if output_dir is not None else directory, stem + '_synthetic' + extension)
+
+
+def rebalance_file(input_path: str, output_path: str, model_name: str = 'single_encoder',
+                   minority_class_column: str = 'class', minority_class_label: str = '0', ratio: float = 1.0,
+                   decoder_activation: str = 'sigmoid', epochs: int = 100, batch_size: int = 16,
+                   validation_split: float = 0.25, patience: int = 10, chunk_size: int = 100000,
+                   noise: float = 0.05, resample: bool = False, sampling: str = 'reconstruct', engine: str = 'keras',
+                   random_state: int = None, cache=None, synthetic_only: bool = False) -> dict:
+    """
+    Rebalances one CSV or Parquet file and writes the result in chunks.
+
+    Args:
+        input_path (str): A .csv or .parquet file.
+        output_path (str): A .csv or .parquet file the original rows, followed by the synthetic rows, are written to.
+        ratio (float, optional): Target number of minority rows per majority row. Enough synthetic rows are generated to reach it; none when the file is already at or above it. Defaults to 1.0 (balanced).
+        synthetic_only (bool, optional): Only write the synthetic rows. Defaults to False.
+        Every other argument is the one of generate_synthetic_data.
+
+    Returns:
+        dict: Summary with the input and output paths, the number of minority, majority and generated rows, and the seconds spent reading, training, generating and in total.
+    """
+
+    from .autoencoder import _iter_chunks, _synthetic_batches, _train_autoencoder
+    from .preparation import label_value, prepare_data
+    from .readers import read_file
+    from .writers import ChunkWriter
+
+    if ratio <= 0:
+        raise ValueError("Invalid ratio.")
+
+    start = time.perf_counter()
+    original_df = read_file(input_path)
+    mask, columns, minority_data = prepare_data(original_df, minority_class_column, minority_class_label)
+    n_majority = len(mask) - len(minority_data)
+    n_rows = max(0, math.ceil(ratio * n_majority) - len(minority_data))
+    summary = {'input': input_path, 'output': output_path, 'minority_rows': len(minority_data),
+               'majority_rows': n_majority, 'generated_rows': 0, 'read_seconds': time.perf_counter() - start}
+
+    architecture = resolve_architecture(model_name)
+    fit_start = time.perf_counter()
+    autoencoder = None
+    if n_rows:
+        autoencoder, _ = _train_autoencoder(minority_data, columns, architecture, decoder_activation, epochs, cache,
+                                            autoencoder=_warm_model(len(columns), architecture, decoder_activation),
+                                            batch_size=batch_size, validation_split=validation_split,
+                                            patience=patience)
+    summary['fit_seconds'] = time.perf_counter() - fit_start
+
+    generate_start = time.perf_counter()
+    with ChunkWriter(output_path) as writer:
+        if not synthetic_only:
+            # Widen the feature columns like pd.concat with the float32 synthetic rows would, e.g. int64 to float64
+            dtypes = {column: np.result_type(original_df[column].dtype, np.float32) for column in columns}
+            for chunk_start in range(0, len(original_df), chunk_size):
+                writer.write(original_df.iloc[chunk_start:chunk_start + chunk_size].astype(dtypes))
+
+        if n_rows:
+            batches = _synthetic_batches(autoencoder, minority_data, n_rows, batch_size=chunk_size, noise=noise,
+                                         resample=resample, sampling=sampling, random_state=random_state,
+                                         engine=engine)
+            label = label_value(original_df[minority_class_column], minority_class_label)
+            for chunk in _iter_chunks(batches, columns, minority_class_column, label):
+                writer.write(chunk)
+                summary['generated_rows'] += len(chunk)
+    summary['generate_seconds'] = time.perf_counter() - generate_start
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def _format_summary(summary: dict) -> str:
+    return ('%(input)s -> %(output)s: %(generated_rows)d rows generated (%(minority_rows)d minority, '
+            '%(majority_rows)d majority) in %(seconds).1fs (fit %(fit_seconds).1fs, generate %(generate_seconds).1fs)'
+            % summary)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='dittto', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help='CSV or Parquet files, or glob patterns.')
+    parser.add_argument('--class-column', default='class', help='Column containing the class labels.')
+    parser.add_argument('--label', default='0', help='Label of the minority class.')
+    parser.add_argument('--model', default='single_encoder', choices=sorted(MODEL_PRESETS), help='Autoencoder preset.')
+    parser.add_argument('--ratio', type=float, default=1.0, help='Target number of minority rows per majority row.')
+    parser.add_argument('--output-dir', default=None, help='Directory of the output files. Defaults to next to each input.')
+    parser.add_argument('--output-format', default=None, choices=('csv', 'parquet'), help='Defaults to the input format.')
+    parser.add_argument('--synthetic-only', action='store_true', help='Only write the synthetic rows.')
+    parser.add_argument('--epochs', type=int, default=100, help='Maximum number of training epochs.')
+    parser.add_argument('--batch-size', type=int, default=16, help='Number of rows per training step.')
+    parser.add_argument('--patience', type=int, default=10, help='Early stopping patience in epochs.')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='Number of rows written at a time.')
+    parser.add_argument('--noise', type=float, default=0.05, help='Input noise on every generation pass after the first.')
+    parser.add_argument('--sampling', default='reconstruct', choices=SAMPLING_MODES, help='Generation mode.')
+    parser.add_argument('--engine', default='keras', choices=('keras', 'numpy'), help='Generation engine.')
+    parser.add_argument('--cache-dir', default=None, help='Directory of a model cache shared by the workers.')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for the input noise.')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of worker processes. 1 runs in this process.')
+    parser.add_argument('--tf-threads', type=int, default=None, help='Number of TensorFlow threads per worker, or of this process with --jobs 1.')
+    parser.add_argument('--summary', default=None, help='Write the per-file summaries to this JSON file.')
+    return parser
+
+
+def main(argv=None) -> int:
+    """Entry point of the `dittto` console script. Returns 1 when any file failed."""
+    args = _parser().parse_args(argv)
+
+    if args.ratio <= 0:
+        raise SystemExit("dittto: error: --ratio must be greater than 0")
+
+    paths = expand_paths(args.inputs)
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    options = {'model_name': args.model, 'minority_class_column': args.class_column,
+               'minority_class_label': args.label, 'ratio': args.ratio, 'epochs': args.epochs,
+               'batch_size': args.batch_size, 'patience': args.patience, 'chunk_size': args.chunk_size,
+               'noise': args.noise, 'sampling': args.sampling, 'engine': args.engine, 'random_state': args.seed,
+               'cache': args.cache_dir, 'synthetic_only': args.synthetic_only}
+    tasks = {path: output_path_for(path, args.output_dir, args.output_format) for path in paths}
+
+    n_jobs = args.jobs or min(os.cpu_count() or 1, len(tasks))
+    summaries, failures = [], 0
+    start = time.perf_counter()
+
+    def report(path, run):
+        nonlocal failures
+        try:
+            summary = run()
+        except Exception as e:
+            failures += 1
+            print('%s: failed: %s' % (path, e), file=sys.stderr, flush=True)
+            return
+        summaries.append(summary)
+        print(_format_summary(summary), flush=True)
+
+    if n_jobs == 1:
+        if args.tf_threads:
+            configure_tensorflow(args.tf_threads, args.tf_threads)
+        for path, output_path in tasks.items():
+            report(path, lambda: rebalance_file(path, output_path, **options))
+    else:
+        with process_pool(n_jobs, args.tf_threads) as pool:
+            futures = {pool.submit(rebalance_file, path, output_path, **options): path
+                       for path, output_path in tasks.items()}
+            for future in as_completed(futures):
+                report(futures[future], future.result)
+
+    print('%d files, %d rows generated in %.1fs' % (len(summaries), sum(s['generated_rows'] for s in summaries),
+                                                   time.perf_counter() - start), flush=True)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
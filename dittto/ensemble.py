@@ -0,0 +1,166 @@
+import math
+
+from tensorflow import keras
+import numpy as np
+
+from .inference import NumpyModel
+
+# How generation picks the ensemble member of every synthetic row
+MEMBER_SELECTIONS = ('round_robin', 'random')
+
+
+class GroupedDense(keras.layers.Layer):
+    """
+    `n_members` independent dense layers applied to the `n_members` slices of a (batch, n_members, features) input.
+
+    All members are computed in a single einsum with a (n_members, features, units) kernel, so the forward and backward
+    passes of every member share one kernel launch. Every member's kernel is initialized like a Dense layer's.
+    """
+
+    def __init__(self, n_members: int, units: int, activation=None, **kwargs):
+        super().__init__(**kwargs)
+        self.n_members = n_members
+        self.units = units
+        self.activation = keras.activations.get(activation)
+
+    def build(self, input_shape):
+        fan_in = input_shape[-1]
+        limit = math.sqrt(6 / (fan_in + self.units))
+        self.kernel = self.add_weight(shape=(self.n_members, fan_in, self.units), name='kernel',
+                                      initializer=keras.initializers.RandomUniform(-limit, limit))
+        self.bias = self.add_weight(shape=(self.n_members, self.units), name='bias', initializer='zeros')
+
+    def call(self, inputs):
+        return self.activation(keras.ops.einsum('bki,kio->bko', inputs, self.kernel) + self.bias)
+
+    def compute_output_shape(self, input_shape):
+        return input_shape[:-1] + (self.units,)
+
+    def get_config(self):
+        config = super().get_config()
+        config.update(n_members=self.n_members, units=self.units,
+                      activation=keras.activations.serialize(self.activation))
+        return config
+
+
+def ensemble_loss(y_true, y_pred):
+    """Mean squared error of every member's (batch, n_members, features) reconstruction of the (batch, features) rows."""
+    return keras.ops.mean(keras.ops.square(y_pred - keras.ops.expand_dims(y_true, 1)), axis=-1)
+
+
+def generate_ensemble_model(input_shape: int, n_members: int = 4, encoder_dense_layers: list = (18, 20),
+                            bottle_neck: int = None, decoder_dense_layers: list = (20, 18),
+                            decoder_activation: str = 'sigmoid'):
+    """
+    Generates `n_members` independently initialized autoencoders packed side by side into one wide model.
+
+    Args:
+        input_shape (int): The shape of the input data.
+        n_members (int, optional): Number of autoencoders in the ensemble. Defaults to 4.
+        encoder_dense_layers (list, optional): Number of units of every encoder layer of each member. Defaults to [18, 20].
+        bottle_neck (int, optional): Number of units of each member's bottleneck layer. Defaults to half of the input shape.
+        decoder_dense_layers (list, optional): Number of units of every decoder layer of each member. Defaults to [20, 18].
+        decoder_activation (str, optional): Activation function of the decoder output layers. Defaults to 'sigmoid'.
+
+    Returns:
+        tuple: The autoencoder, encoder and decoder models. The encoder maps (batch, input_shape) rows to (batch, n_members, bottle_neck) codes, one per member, and the decoder maps those codes to (batch, n_members, input_shape) reconstructions.
+
+    Use Case:
+        Every layer is a GroupedDense layer, so one training step runs the forward and backward pass of all members on the same batch with a handful of large kernels instead of `n_members` times as many small ones. fit_model trains the members with the mean of their losses; as Adam normalizes every weight's gradient, each member follows the same path it would when trained on its own. Split the trained model into one NumpyModel per member with ensemble_members, or pass `n_members` to generate_synthetic_data.
+
+    Example:
+        autoencoder, encoder, decoder = generate_ensemble_model(10, n_members=8, encoder_dense_layers=[20], bottle_neck=16, decoder_dense_layers=[18, 20])
+        fit_model(autoencoder, minority_df, epochs=100)
+        members = ensemble_members(autoencoder)
+    """
+
+    input_shape = int(input_shape)
+    if input_shape < 1:
+        raise ValueError("Input shape must be greater than 0.")
+    if n_members < 1:
+        raise ValueError("Invalid number of ensemble members.")
+    if bottle_neck is None:
+        bottle_neck = input_shape // 2
+
+    encoder_input = keras.Input(shape=(input_shape,), name="encoder")
+    x = keras.layers.RepeatVector(n_members)(encoder_input)
+    for units in encoder_dense_layers:
+        x = GroupedDense(n_members, units, activation="relu")(x)
+    encoder_output = GroupedDense(n_members, bottle_neck, activation="relu")(x)
+    encoder = keras.Model(encoder_input, encoder_output, name="encoder")
+
+    decoder_input = keras.Input(shape=(n_members, bottle_neck), name="decoder")
+    x = decoder_input
+    for units in decoder_dense_layers:
+        x = GroupedDense(n_members, units, activation="relu")(x)
+    decoder_output = GroupedDense(n_members, input_shape, activation=decoder_activation)(x)
+    decoder = keras.Model(decoder_input, decoder_output, name="decoder")
+
+    autoencoder_input = keras.Input(shape=(input_shape,), name="input")
+    autoencoder = keras.Model(autoencoder_input, decoder(encoder(autoencoder_input)), name="autoencoder")
+
+    for model in (autoencoder, encoder, decoder):
+        model.n_members = n_members
+    return autoencoder, encoder, decoder
+
+
+def _grouped_layers(model) -> list:
+    """Returns the GroupedDense layers of a (possibly nested) ensemble model in the order they are applied."""
+    layers = []
+    for layer in model.layers:
+        if hasattr(layer, 'layers'):
+            layers.extend(_grouped_layers(layer))
+        elif isinstance(layer, GroupedDense):
+            layers.append(layer)
+    return layers
+
+
+def ensemble_members(model) -> list:
+    """
+    Splits a trained ensemble autoencoder, encoder or decoder from generate_ensemble_model into one NumpyModel per member.
+
+    Example:
+        members = ensemble_members(autoencoder)
+        synthetic_rows = members[2].predict(minority_rows)
+    """
+    layers = _grouped_layers(model)
+    if not layers:
+        raise ValueError("Model is not an ensemble.")
+
+    weights = [layer.get_weights() for layer in layers]
+    activations = [layer.activation.__name__ for layer in layers]
+    return [NumpyModel([kernel[member] for kernel, _ in weights], [bias[member] for _, bias in weights], activations)
+            for member in range(layers[0].n_members)]
+
+
+def member_selector(n_members: int, member_selection: str = 'round_robin', random_state: int = None):
+    """
+    Returns a function mapping the number of rows of the next batch to the ensemble member of every row.
+
+    'round_robin' cycles through the members across batches, so every member generates the same number of rows;
+    'random' draws every row's member uniformly at random.
+    """
+    if member_selection not in MEMBER_SELECTIONS:
+        raise ValueError("Invalid member selection.")
+
+    rng = np.random.default_rng(random_state)
+    offset = 0
+
+    def select(n_rows: int) -> np.ndarray:
+        nonlocal offset
+        if member_selection == 'random':
+            return rng.integers(0, n_members, size=n_rows)
+        members = (offset + np.arange(n_rows)) % n_members
+        offset += n_rows
+        return members
+
+    return select
+
+
+def dispatch(members: np.ndarray, n_columns: int, run) -> np.ndarray:
+    """Fills a float32 (len(members), n_columns) array with `run(member, rows)` for the rows assigned to every member."""
+    out = np.empty((len(members), n_columns), dtype=np.float32)
+    for member in np.unique(members):
+        rows = np.flatnonzero(members == member)
+        out[rows] = run(int(member), rows)
+    return out
@@ -0,0 +1,268 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from .cache import row_hashes
+from .preparation import to_float32
+
+
+def _as_arrays(real, synthetic):
+    """Returns the shared feature columns and both tables as float32 arrays."""
+    if isinstance(real, pd.DataFrame):
+        columns = [str(column) for column in real.columns]
+        if isinstance(synthetic, pd.DataFrame):
+            missing = [column for column in real.columns if column not in synthetic.columns]
+            if missing:
+                raise ValueError("Columns not found in the synthetic data: %s." % ', '.join(map(str, missing)))
+            synthetic = to_float32(synthetic, list(real.columns))
+        real = to_float32(real, list(real.columns))
+    else:
+        real = np.asarray(real, dtype=np.float32).reshape(len(real), -1)
+        columns = [str(j) for j in range(real.shape[1])]
+        if isinstance(synthetic, pd.DataFrame):
+            synthetic = synthetic.iloc[:, :real.shape[1]]
+
+    synthetic = np.asarray(synthetic, dtype=np.float32).reshape(len(synthetic), -1)
+    if synthetic.shape[1] != real.shape[1]:
+        raise ValueError("Real and synthetic data have a different number of columns.")
+    if len(real) < 2 or len(synthetic) < 2:
+        raise ValueError("Real and synthetic data need at least 2 rows each.")
+    return columns, real, synthetic
+
+
+def _subsample(data: np.ndarray, n_rows: int, rng: np.random.Generator) -> np.ndarray:
+    """Returns `n_rows` rows of `data` drawn without replacement, or `data` itself when it is not larger."""
+    if n_rows is None or len(data) <= n_rows:
+        return data
+    return data[np.sort(rng.choice(len(data), n_rows, replace=False))]
+
+
+def _moments(data: np.ndarray, chunk_size: int = 65536) -> tuple:
+    """Returns the float64 mean and standard deviation of every column, accumulated over row chunks."""
+    mean = data.sum(axis=0, dtype=np.float64) / len(data)
+    squares = np.zeros(data.shape[1])
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start:start + chunk_size] - mean
+        squares += np.einsum('ij,ij->j', chunk, chunk)
+    return mean, np.sqrt(squares / len(data))
+
+
+def column_distances(real: np.ndarray, synthetic: np.ndarray) -> tuple:
+    """
+    Computes the two-sample Kolmogorov-Smirnov statistic and the Wasserstein-1 distance of every column.
+
+    Both are read off the difference of the two empirical CDFs at the merged values of a column. Every column is sorted
+    once per table; the two sorted runs are then merged by a stable sort in linear time, and the CDFs are running counts.
+
+    Returns:
+        tuple: Arrays with the KS statistic and the Wasserstein distance of every column.
+    """
+    n, m = len(real), len(synthetic)
+    real = np.sort(np.ascontiguousarray(real.T), axis=1)
+    synthetic = np.sort(np.ascontiguousarray(synthetic.T), axis=1)
+    ks = np.empty(len(real))
+    wasserstein = np.empty(len(real))
+    # F_real - F_synthetic = c / n - (i - c) / m after i merged values, c of them real
+    scaled_positions = np.arange(1, n + m + 1) / m
+
+    for j in range(len(real)):
+        merged = np.concatenate([real[j], synthetic[j]])
+        order = np.argsort(merged, kind='stable')
+        values = merged[order]
+        cdf_difference = np.cumsum(order < n) * (1 / n + 1 / m)
+        cdf_difference -= scaled_positions
+
+        # With ties, the CDFs are only complete at the last of equal values; the gaps between equal values are 0
+        last = np.append(values[1:] != values[:-1], True)
+        ks[j] = np.abs(cdf_difference[last]).max()
+        wasserstein[j] = np.dot(np.abs(cdf_difference[:-1]), np.diff(values).astype(np.float64))
+
+    return ks, wasserstein
+
+
+def correlation_matrix(data: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """Returns the Pearson correlation matrix of the columns of `data`, accumulated in float64 over row chunks. Constant columns have zero correlation with every other column."""
+    mean = data.sum(axis=0, dtype=np.float64) / len(data)
+    covariance = np.zeros((data.shape[1], data.shape[1]))
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start:start + chunk_size] - mean
+        covariance += chunk.T @ chunk
+
+    std = np.sqrt(np.diag(covariance))
+    scale = np.outer(std, std)
+    correlation = np.divide(covariance, scale, out=np.zeros_like(covariance), where=scale > 0)
+    np.fill_diagonal(correlation, 1)
+    return correlation
+
+
+def correlation_drift(real: np.ndarray, synthetic: np.ndarray, chunk_size: int = 65536) -> dict:
+    """Returns the largest and the mean absolute difference between the correlations of every pair of columns, and the Frobenius norm of the difference of the correlation matrices."""
+    difference = correlation_matrix(real, chunk_size) - correlation_matrix(synthetic, chunk_size)
+    pairs = np.abs(difference[np.triu_indices(real.shape[1], k=1)])
+    return {'max_abs_diff': float(pairs.max()) if len(pairs) else 0.0,
+            'mean_abs_diff': float(pairs.mean()) if len(pairs) else 0.0,
+            'frobenius': float(np.linalg.norm(difference))}
+
+
+def _squared_distances(a: np.ndarray, b: np.ndarray, a_norms: np.ndarray, b_norms: np.ndarray) -> np.ndarray:
+    """Returns the squared Euclidean distances between every row of `a` and every row of `b`, given their squared norms."""
+    distances = a_norms[:, None] - 2 * (a @ b.T) + b_norms[None, :]
+    return np.maximum(distances, 0, out=distances)
+
+
+def _kernel_sum(a: np.ndarray, b: np.ndarray, gamma: float, chunk_size: int) -> float:
+    """Returns the sum of the Gaussian kernel exp(-gamma * |x - y|^2) over every pair of rows of `a` and `b`."""
+    a_norms, b_norms = np.einsum('ij,ij->i', a, a), np.einsum('ij,ij->i', b, b)
+    total = 0.0
+    for start in range(0, len(a), chunk_size):
+        distances = _squared_distances(a[start:start + chunk_size], b, a_norms[start:start + chunk_size], b_norms)
+        distances *= -gamma
+        total += float(np.exp(distances, out=distances).sum(dtype=np.float64))
+    return total
+
+
+def mmd(real: np.ndarray, synthetic: np.ndarray, bandwidth: float = None, chunk_size: int = 2048) -> dict:
+    """
+    Computes the unbiased squared maximum mean discrepancy between two samples with a Gaussian kernel.
+
+    Args:
+        real (np.ndarray): Real rows, typically standardized.
+        synthetic (np.ndarray): Synthetic rows with the same columns.
+        bandwidth (float, optional): Kernel bandwidth. Defaults to the median distance between pooled rows.
+        chunk_size (int, optional): Number of rows per block of the kernel matrices. Defaults to 2048.
+
+    Returns:
+        dict: The squared MMD 'mmd2', which is close to 0 when both samples come from the same distribution, and the 'bandwidth' used.
+    """
+    if bandwidth is None:
+        pooled = np.concatenate([real[:500], synthetic[:500]])
+        norms = np.einsum('ij,ij->i', pooled, pooled)
+        distances = np.sqrt(_squared_distances(pooled, pooled, norms, norms)[np.triu_indices(len(pooled), k=1)])
+        bandwidth = float(np.median(distances)) or 1.0
+
+    gamma = 1 / (2 * bandwidth ** 2)
+    n, m = len(real), len(synthetic)
+    # The diagonals of the within-sample kernel matrices are all ones and are left out of the unbiased estimate
+    mmd2 = ((_kernel_sum(real, real, gamma, chunk_size) - n) / (n * (n - 1)) +
+            (_kernel_sum(synthetic, synthetic, gamma, chunk_size) - m) / (m * (m - 1)) -
+            2 * _kernel_sum(real, synthetic, gamma, chunk_size) / (n * m))
+    return {'mmd2': mmd2, 'bandwidth': bandwidth}
+
+
+def nearest_distances(queries: np.ndarray, references: np.ndarray, chunk_size: int = 2048) -> np.ndarray:
+    """
+    Returns the Euclidean distance from every query row to its closest reference row.
+
+    Distances are computed in blocks of `chunk_size` queries by `chunk_size` references, so memory use is bounded by
+    chunk_size * chunk_size regardless of the number of rows.
+    """
+    # |q - r|^2 = |q|^2 + (|r|^2 - 2 q.r): only the part in brackets depends on the reference, so the query norms are
+    # added after the minimum and every block costs one matrix product, one addition and one reduction
+    scaled_references = -2 * references
+    reference_norms = np.einsum('ij,ij->i', references, references)
+    nearest = np.full(len(queries), np.inf, dtype=np.float32)
+
+    for start in range(0, len(queries), chunk_size):
+        stop = start + chunk_size
+        for reference_start in range(0, len(references), chunk_size):
+            reference_stop = reference_start + chunk_size
+            distances = queries[start:stop] @ scaled_references[reference_start:reference_stop].T
+            distances += reference_norms[reference_start:reference_stop]
+            np.minimum(nearest[start:stop], distances.min(axis=1), out=nearest[start:stop])
+
+    nearest += np.einsum('ij,ij->i', queries, queries)
+    return np.sqrt(np.maximum(nearest, 0, out=nearest))
+
+
+def distance_to_closest_record(real: np.ndarray, synthetic: np.ndarray, n_rows: int = 10000,
+                               reference_rows: int = 100000, chunk_size: int = 2048,
+                               rng: np.random.Generator = None) -> dict:
+    """
+    Measures how close synthetic rows are to real rows, compared with how close real rows are to each other.
+
+    The real rows are split into a holdout set of up to `n_rows` rows and a disjoint reference set of up to
+    `reference_rows` of the others. The distance from up to `n_rows` synthetic rows, and from every holdout row, to its
+    closest reference row is computed with nearest_distances. A synthetic sample that copies the training rows is much
+    closer to the references than the holdout is.
+
+    Returns:
+        dict: The median and 5th percentile of the 'synthetic' and the 'real' (holdout) distances, and the 'ratio' of their medians, which is close to 1 without memorization and close to 0 for copies.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    order = rng.permutation(len(real))
+    n_holdout = min(n_rows, len(real) // 2)
+    holdout = real[np.sort(order[:n_holdout])]
+    references = real[np.sort(order[n_holdout:n_holdout + reference_rows])]
+    synthetic = _subsample(synthetic, n_rows, rng)
+
+    distances = {'synthetic': nearest_distances(synthetic, references, chunk_size),
+                 'real': nearest_distances(holdout, references, chunk_size)}
+    report = {}
+    for name, values in distances.items():
+        report[name + '_median'] = float(np.median(values))
+        report[name + '_p5'] = float(np.percentile(values, 5))
+    report['ratio'] = report['synthetic_median'] / report['real_median'] if report['real_median'] > 0 else None
+    return report
+
+
+def quality_report(real, synthetic, sample_rows: int = 250000, mmd_rows: int = 2000, dcr_rows: int = 10000,
+                   reference_rows: int = 100000, chunk_size: int = 2048, random_state: int = None) -> dict:
+    """
+    Compares synthetic rows with the real rows they were generated from.
+
+    Args:
+        real (pd.DataFrame or np.ndarray): Real rows, e.g. the minority_df returned by generate_synthetic_data.
+        synthetic (pd.DataFrame or np.ndarray): Synthetic rows, e.g. generated_data. With DataFrames, only the columns of `real` are compared, so the class column of generated_data is ignored.
+        sample_rows (int, optional): Number of rows of each table, drawn at random, used for the column distances and correlations. With 250000 rows, the sampling error of a KS statistic is about 0.003. None uses every row. Defaults to 250000.
+        mmd_rows (int, optional): Number of rows of each table used for the MMD. Defaults to 2000.
+        dcr_rows (int, optional): Number of synthetic and real holdout rows used for the distances to the closest record. Defaults to 10000.
+        reference_rows (int, optional): Number of real rows the synthetic and holdout rows are compared with for the distances to the closest record. Only copies of these rows are detected, so use at least the number of real rows when it is affordable. Defaults to 100000.
+        chunk_size (int, optional): Number of rows per block of the distance and kernel computations. Defaults to 2048.
+        random_state (int, optional): Seed for the subsampling. Defaults to None.
+
+    Returns:
+        dict: The number of 'rows' compared; per-column KS statistics and Wasserstein distances under 'columns', with their means and maximums; the Wasserstein distances are also given relative to each real column's standard deviation ('wasserstein_scaled'). The 'correlation' drift (see correlation_drift), the 'mmd' (see mmd) and the distance to closest record 'dcr' (see distance_to_closest_record), both computed on columns standardized with the real rows' mean and standard deviation. The fraction of synthetic rows that are 'exact_copies' of a real row, found by comparing the row_hashes of every row, and the 'seconds' spent.
+
+    Use Case:
+        Use this function to check whether generated_data resembles minority_df without memorizing it. Every step is vectorized NumPy: the column distances sort each column once, correlations are accumulated over row chunks, and the MMD and nearest-neighbour distances are computed in blocks of `chunk_size` rows on subsamples, so memory stays bounded and a report on millions of rows takes seconds.
+
+    Example:
+        a. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data('balanced', original_df)
+           report = quality_report(minority_df, generated_data)
+           report['ks_mean'], report['dcr']['ratio']
+        b. report = quality_report(real_rows, synthetic_rows, sample_rows=1000000, dcr_rows=20000, random_state=0)
+    """
+
+    start = time.perf_counter()
+    columns, real, synthetic = _as_arrays(real, synthetic)
+    rng = np.random.default_rng(random_state)
+
+    real_sample, synthetic_sample = _subsample(real, sample_rows, rng), _subsample(synthetic, sample_rows, rng)
+    ks, wasserstein = column_distances(real_sample, synthetic_sample)
+    _, std = _moments(real_sample)
+    scaled = np.divide(wasserstein, std, out=np.zeros_like(wasserstein), where=std > 0)
+
+    report = {'rows': {'real': len(real), 'synthetic': len(synthetic)},
+              'columns': {column: {'ks': float(ks[j]), 'wasserstein': float(wasserstein[j]),
+                                   'wasserstein_scaled': float(scaled[j])} for j, column in enumerate(columns)},
+              'ks_mean': float(ks.mean()), 'ks_max': float(ks.max()),
+              'wasserstein_scaled_mean': float(scaled.mean()), 'wasserstein_scaled_max': float(scaled.max()),
+              'correlation': correlation_drift(real_sample, synthetic_sample)}
+
+    # Distances are computed on standardized columns, so every column weighs the same
+    mean, std = _moments(real)
+    std[std == 0] = 1
+    standardize = lambda data: ((data - mean) / std).astype(np.float32)
+
+    report['mmd'] = mmd(standardize(_subsample(real, mmd_rows, rng)), standardize(_subsample(synthetic, mmd_rows, rng)),
+                        chunk_size=chunk_size)
+    report['dcr'] = distance_to_closest_record(standardize(_subsample(real, dcr_rows + reference_rows, rng)),
+                                               standardize(_subsample(synthetic, dcr_rows, rng)), dcr_rows,
+                                               reference_rows, chunk_size=chunk_size, rng=rng)
+    # A sorted search is much cheaper than np.isin on millions of hashes
+    real_hashes, synthetic_hashes = np.sort(row_hashes(real)), row_hashes(synthetic)
+    positions = np.minimum(np.searchsorted(real_hashes, synthetic_hashes), len(real_hashes) - 1)
+    report['exact_copies'] = float(np.mean(real_hashes[positions] == synthetic_hashes))
+    report['seconds'] = time.perf_counter() - start
+    return report
@@ -0,0 +1,210 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from .cache import row_hashes
+from .presets import resolve_architecture
+from .transform import TabularTransformer
+
+
+class Checkpoint:
+    """
+    A trained autoencoder saved together with its optimizer state and the hashes of the rows it was trained on, so it can be fine-tuned on new rows instead of being retrained.
+
+    Args:
+        autoencoder (keras.Model): A trained autoencoder from generate_model.
+        architecture (dict): Its layer configuration, with the keys 'encoder_dense_layers', 'bottle_neck' and 'decoder_dense_layers'.
+        decoder_activation (str): Activation function of its decoder layers.
+        hashes (np.ndarray): Hashes of the rows it was trained on, from row_hashes.
+        epochs (int, optional): Number of epochs it has been trained for. Defaults to 0.
+        columns (list, optional): Names of the feature columns. Defaults to None.
+        transformer (TabularTransformer, optional): The fitted transformer the training rows were scaled and encoded with. It is saved with the checkpoint, and DataFrames passed to fine_tune, changed_rows and compare_with_retrain are transformed with it. Defaults to None.
+
+    Use Case:
+        Train once with Checkpoint.train and save it. When new minority rows arrive, load it and call fine_tune: only the rows whose hashes are new, together with a sample of previously seen rows, are trained on for a few epochs, resuming the saved Adam moments, so the cost of a refresh grows with the number of changed rows rather than with the size of the dataset. compare_with_retrain checks the result against a model trained from scratch. generate_synthetic_data does all of this when given a `checkpoint` path.
+
+    Example:
+        a. Checkpoint.train(minority_df, 'balanced', epochs=100).save('fraud.ckpt.npz')
+        b. checkpoint = Checkpoint.load('fraud.ckpt.npz')
+           summary = checkpoint.fine_tune(minority_df, epochs=5)
+           checkpoint.save('fraud.ckpt.npz')
+    """
+
+    def __init__(self, autoencoder, architecture: dict, decoder_activation: str, hashes: np.ndarray, epochs: int = 0,
+                 columns: list = None, transformer: TabularTransformer = None):
+        self.autoencoder = autoencoder
+        self.architecture = resolve_architecture(architecture)
+        self.decoder_activation = decoder_activation
+        self.hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        self.epochs = epochs
+        self.columns = [str(column) for column in columns] if columns is not None else None
+        self.transformer = transformer
+        self.optimizer_state = None
+        if autoencoder.compiled and autoencoder.optimizer.built:
+            self.optimizer_state = [variable.numpy() for variable in autoencoder.optimizer.variables]
+
+    @classmethod
+    def train(cls, minority_data, model_name='single_encoder', decoder_activation: str = 'sigmoid',
+              epochs: int = 100, transformer: TabularTransformer = None, **fit_kwargs) -> 'Checkpoint':
+        """
+        Trains a new autoencoder on every row of `minority_data` with fit_model and returns its checkpoint.
+
+        With a `transformer`, which is fitted on `minority_data` first unless it is already fitted, the model is trained
+        on the transformed rows and the transformer is saved with the checkpoint.
+        """
+        from .autoencoder import fit_model, generate_model
+
+        columns = list(minority_data.columns) if hasattr(minority_data, 'columns') else None
+        if transformer is not None and not transformer.fitted:
+            transformer.fit(minority_data)
+        minority_data = cls._as_array(minority_data, transformer)
+        architecture = resolve_architecture(model_name)
+        autoencoder, _, _ = generate_model(minority_data.shape[1], decoder_activation=decoder_activation, **architecture)
+        history = fit_model(autoencoder, minority_data, epochs=epochs, **fit_kwargs)
+        return cls(autoencoder, architecture, decoder_activation, row_hashes(minority_data), len(history.epoch), columns,
+                   transformer)
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        """Loads a checkpoint written by Checkpoint.save."""
+        from .autoencoder import generate_model
+
+        with np.load(path, allow_pickle=False) as arrays:
+            settings = json.loads(str(arrays['settings']))
+            autoencoder, _, _ = generate_model(settings['n_columns'], decoder_activation=settings['decoder_activation'],
+                                               **settings['architecture'])
+            autoencoder.set_weights([arrays['weight_%d' % i] for i in range(settings['n_weights'])])
+            checkpoint = cls(autoencoder, settings['architecture'], settings['decoder_activation'], arrays['hashes'],
+                             settings['epochs'], settings['columns'], cls._transformer(settings))
+            if settings['n_optimizer'] is not None:
+                checkpoint.optimizer_state = [arrays['optimizer_%d' % i] for i in range(settings['n_optimizer'])]
+        return checkpoint
+
+    @classmethod
+    def load_transformer(cls, path: str) -> TabularTransformer:
+        """Loads only the transformer saved with a checkpoint, or returns None if it was saved without one."""
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls._transformer(json.loads(str(arrays['settings'])))
+
+    @staticmethod
+    def _transformer(settings: dict) -> TabularTransformer:
+        config = settings.get('transformer')
+        return TabularTransformer.from_config(config) if config is not None else None
+
+    @staticmethod
+    def _as_array(minority_data, transformer: TabularTransformer = None) -> np.ndarray:
+        """Transforms DataFrames with `transformer`, if any; arrays are used as they are."""
+        if transformer is not None and hasattr(minority_data, 'columns'):
+            return transformer.transform(minority_data)
+        return np.ascontiguousarray(minority_data, dtype=np.float32)
+
+    def save(self, path: str):
+        """Writes the weights, the optimizer state, the row hashes, the transformer and the settings to a single .npz file."""
+        weights = self.autoencoder.get_weights()
+        settings = {'n_columns': int(self.autoencoder.input_shape[-1]), 'architecture': self.architecture,
+                    'decoder_activation': self.decoder_activation, 'epochs': self.epochs, 'columns': self.columns,
+                    'n_weights': len(weights),
+                    'n_optimizer': len(self.optimizer_state) if self.optimizer_state is not None else None,
+                    'transformer': self.transformer.to_config() if self.transformer is not None else None}
+        arrays = {'weight_%d' % i: weight for i, weight in enumerate(weights)}
+        arrays.update({'optimizer_%d' % i: value for i, value in enumerate(self.optimizer_state or [])})
+
+        # Write to a temporary file first, so a crashed writer never leaves a partial checkpoint behind
+        tmp_path = '%s.%d.tmp.npz' % (path, os.getpid())
+        np.savez(tmp_path, settings=np.array(json.dumps(settings)), hashes=self.hashes, **arrays)
+        os.replace(tmp_path, path)
+
+    def changed_rows(self, minority_data) -> np.ndarray:
+        """Returns a boolean mask of the rows of `minority_data` the model has not been trained on."""
+        return ~np.isin(row_hashes(self._as_array(minority_data, self.transformer)), self.hashes)
+
+    def fine_tune(self, minority_data, epochs: int = 5, replay: float = 1.0, batch_size: int = 16,
+                  validation_split: float = 0.0, patience: int = None, random_state: int = None,
+                  **fit_kwargs) -> dict:
+        """
+        Fine-tunes the model on the rows of `minority_data` it has not been trained on yet.
+
+        Args:
+            minority_data (np.ndarray or pd.DataFrame): The current minority rows, including the ones already trained on. Rows that are no longer present are forgotten by the checkpoint, and changed rows count as new ones.
+            epochs (int, optional): Number of epochs to fine-tune for. Defaults to 5.
+            replay (float, optional): Number of previously trained rows, drawn at random from `minority_data`, mixed in per new row, so the model does not drift towards the new rows. Defaults to 1.0.
+            batch_size (int, optional): Number of rows per training step. Defaults to 16.
+            validation_split (float, optional): Fraction of the fine-tuning rows held out to compute the validation loss. Defaults to 0.0.
+            patience (int, optional): Early stopping patience in epochs. Defaults to None (train for all epochs).
+            random_state (int, optional): Seed for drawing the replayed rows. Defaults to None.
+            Every other argument is passed to fit_model.
+
+        Returns:
+            dict: The number of 'new_rows', 'removed_rows' and 'trained_rows', the number of 'epochs' trained, and the 'seconds' spent. Nothing is trained when no row is new.
+        """
+        from .autoencoder import fit_model, optimizer_state
+
+        if epochs < 1:
+            raise ValueError("Invalid number of epochs.")
+        if replay < 0:
+            raise ValueError("Invalid replay ratio.")
+
+        start = time.perf_counter()
+        minority_data = self._as_array(minority_data, self.transformer)
+        if minority_data.shape[1] != self.autoencoder.input_shape[-1]:
+            raise ValueError("Checkpoint does not match the dataset.")
+
+        hashes = row_hashes(minority_data)
+        new = ~np.isin(hashes, self.hashes)
+        n_new = int(np.count_nonzero(new))
+        summary = {'new_rows': n_new, 'removed_rows': int(np.count_nonzero(~np.isin(self.hashes, hashes))),
+                   'trained_rows': 0, 'epochs': 0}
+
+        if n_new:
+            rng = np.random.default_rng(random_state)
+            seen = np.flatnonzero(~new)
+            n_replay = min(len(seen), int(round(replay * n_new)))
+            rows = np.concatenate([np.flatnonzero(new), rng.choice(seen, n_replay, replace=False)])
+            train_data = minority_data[rng.permutation(rows)]
+
+            history = fit_model(self.autoencoder, train_data, epochs=self.epochs + epochs, initial_epoch=self.epochs,
+                                batch_size=batch_size, validation_split=validation_split, patience=patience,
+                                optimizer_state=self.optimizer_state, **fit_kwargs)
+            self.optimizer_state = optimizer_state(self.autoencoder)
+            self.epochs += len(history.epoch)
+            summary.update(trained_rows=len(train_data), epochs=len(history.epoch))
+
+        self.hashes = np.unique(hashes)
+        summary['seconds'] = time.perf_counter() - start
+        return summary
+
+    def compare_with_retrain(self, minority_data, epochs: int = None, tolerance: float = 0.05, **fit_kwargs) -> dict:
+        """
+        Trains a new model with the same architecture on every row of `minority_data` and compares reconstruction losses.
+
+        Args:
+            minority_data (np.ndarray or pd.DataFrame): The current minority rows.
+            epochs (int, optional): Number of epochs to train the new model for. Defaults to the epochs of the checkpoint.
+            tolerance (float, optional): Largest accepted excess of the fine-tuned model's loss over the retrained one, as a fraction of the mean column variance of `minority_data`. Defaults to 0.05.
+            Every other argument is passed to fit_model.
+
+        Returns:
+            dict: The mean squared reconstruction error of the 'fine_tuned' and the 'retrained' model on `minority_data`, their 'ratio', the 'excess' of the fine-tuned loss as a fraction of the variance, and whether it is 'within_tolerance'.
+
+        Use Case:
+            Two models retrained from different random weights can differ by a large factor once their losses are close to zero, so the excess is measured against the variance of the data rather than against the retrained loss.
+        """
+        from .autoencoder import fit_model, generate_model
+        from .inference import NumpyModel
+
+        minority_data = self._as_array(minority_data, self.transformer)
+        retrained, _, _ = generate_model(minority_data.shape[1], decoder_activation=self.decoder_activation,
+                                         **self.architecture)
+        fit_model(retrained, minority_data, epochs=epochs or max(self.epochs, 1), **fit_kwargs)
+
+        losses = {name: float(np.mean(np.square(NumpyModel.from_keras(model).predict(minority_data) - minority_data)))
+                  for name, model in (('fine_tuned', self.autoencoder), ('retrained', retrained))}
+        if losses['retrained'] > 0:
+            ratio = losses['fine_tuned'] / losses['retrained']
+        else:
+            ratio = 1.0 if losses['fine_tuned'] == 0 else float('inf')
+        variance = float(minority_data.var(axis=0, dtype=np.float64).mean())
+        excess = (losses['fine_tuned'] - losses['retrained']) / variance if variance > 0 else 0.0
+        return dict(losses, ratio=ratio, excess=excess, within_tolerance=excess <= tolerance)
@@ -0,0 +1,173 @@
+import numpy as np
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x):
+    with np.errstate(over='ignore'):
+        np.negative(x, out=x)
+        np.exp(x, out=x)
+    x += 1
+    return np.reciprocal(x, out=x)
+
+
+def _tanh(x):
+    return np.tanh(x, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def _linear(x):
+    return x
+
+
+# In-place float32 implementations of the activations generate_model can produce
+ACTIVATIONS = {'relu': _relu, 'sigmoid': _sigmoid, 'tanh': _tanh, 'softmax': _softmax, 'linear': _linear}
+
+# Layers that do not change a batch of flat rows
+_PASSTHROUGH_LAYERS = ('InputLayer', 'Flatten')
+
+
+def _dense_layers(model) -> list:
+    """Returns the Dense layers of a (possibly nested) Keras model in the order they are applied."""
+    layers = []
+    for layer in model.layers:
+        if hasattr(layer, 'layers'):
+            layers.extend(_dense_layers(layer))
+        elif type(layer).__name__ == 'Dense':
+            layers.append(layer)
+        elif type(layer).__name__ not in _PASSTHROUGH_LAYERS:
+            raise ValueError("Unsupported layer: %s." % type(layer).__name__)
+    return layers
+
+
+class NumpyModel:
+    """
+    A pure-NumPy forward pass for the dense models built by generate_model.
+
+    Args:
+        kernels (list): Weight matrices of the dense layers, in the order they are applied.
+        biases (list): Bias vectors of the dense layers.
+        activations (list): Names of the activation functions of the dense layers. Valid options are 'relu', 'sigmoid', 'tanh', 'softmax' and 'linear'.
+
+    Use Case:
+        Use this class to generate rows from a trained autoencoder, encoder or decoder without TensorFlow, e.g. on generation workers. Models are exported once with export_weights and loaded with NumpyModel.load.
+
+    Example:
+        a. model = NumpyModel.from_keras(autoencoder)
+        b. export_weights(decoder, 'decoder.npz')
+           model = NumpyModel.load('decoder.npz')
+           synthetic_rows = model.predict(latent_rows)
+    """
+
+    def __init__(self, kernels: list, biases: list, activations: list):
+        if not kernels or not (len(kernels) == len(biases) == len(activations)):
+            raise ValueError("Invalid model weights.")
+
+        for name in activations:
+            if name not in ACTIVATIONS:
+                raise ValueError("Unsupported activation: %s." % name)
+
+        self.kernels = [np.ascontiguousarray(kernel, dtype=np.float32) for kernel in kernels]
+        self.biases = [np.ascontiguousarray(bias, dtype=np.float32) for bias in biases]
+        self.activations = list(activations)
+
+    @classmethod
+    def from_keras(cls, model) -> 'NumpyModel':
+        """Copies the weights of a Keras model built by generate_model."""
+        layers = _dense_layers(model)
+        if not layers:
+            raise ValueError("Model has no dense layers.")
+
+        kernels, biases = zip(*(layer.get_weights() for layer in layers))
+        return cls(kernels, biases, [layer.activation.__name__ for layer in layers])
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyModel':
+        """Loads a model written by export_weights or NumpyModel.save."""
+        with np.load(path, allow_pickle=False) as weights:
+            return cls._from_arrays(weights)
+
+    @classmethod
+    def _from_arrays(cls, weights) -> 'NumpyModel':
+        n_layers = int(weights['n_layers'])
+        return cls([weights['kernel_%d' % i] for i in range(n_layers)], [weights['bias_%d' % i] for i in range(n_layers)],
+                   [str(name) for name in weights['activations']])
+
+    def save(self, path: str):
+        """Writes the weights to a .npz file."""
+        np.savez(path, **self._arrays())
+
+    def _arrays(self) -> dict:
+        arrays = {'n_layers': np.array(len(self.kernels)), 'activations': np.array(self.activations)}
+        for i, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            arrays['kernel_%d' % i] = kernel
+            arrays['bias_%d' % i] = bias
+        return arrays
+
+    @property
+    def input_shape(self) -> int:
+        return self.kernels[0].shape[0]
+
+    @property
+    def output_shape(self) -> int:
+        return self.kernels[-1].shape[1]
+
+    def predict(self, data, batch_size: int = 65536, out: np.ndarray = None) -> np.ndarray:
+        """
+        Runs the forward pass over `data` in batches of `batch_size` rows.
+
+        Args:
+            data (np.ndarray or pd.DataFrame): Input rows, of shape (n_rows, input_shape).
+            batch_size (int, optional): Number of rows per matrix multiplication. Defaults to 65536.
+            out (np.ndarray, optional): Preallocated float32 array of shape (n_rows, output_shape) to write the result to.
+
+        Returns:
+            np.ndarray: The float32 model output.
+        """
+        data = np.asarray(data, dtype=np.float32).reshape(len(data), -1)
+        if data.shape[1] != self.input_shape:
+            raise ValueError("Invalid input shape.")
+        if batch_size < 1:
+            raise ValueError("Invalid batch size.")
+        if out is None:
+            out = np.empty((len(data), self.output_shape), dtype=np.float32)
+
+        for start in range(0, len(data), batch_size):
+            x = data[start:start + batch_size]
+            for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+                x = np.matmul(x, kernel)
+                x += bias
+                x = ACTIVATIONS[activation](x)
+            out[start:start + len(x)] = x
+
+        return out
+
+    __call__ = predict
+
+
+def export_weights(model, path: str) -> NumpyModel:
+    """
+    Exports a trained Keras autoencoder, encoder or decoder to a compact .npz weight file.
+
+    Args:
+        model (keras.Model): A model built by generate_model.
+        path (str): Path of the .npz file to write.
+
+    Returns:
+        NumpyModel: The exported model.
+
+    Example:
+        export_weights(decoder, 'decoder.npz')
+    """
+
+    numpy_model = NumpyModel.from_keras(model)
+    numpy_model.save(path)
+    return numpy_model
@@ -0,0 +1,128 @@
+import numpy as np
+
+# Generation modes of generate_synthetic_data. 'reconstruct' runs minority rows through the full autoencoder, the
+# other modes sample bottleneck codes from a distribution fitted to the encoded minority rows and decode them.
+SAMPLING_MODES = ('reconstruct', 'gaussian', 'gmm', 'knn')
+
+_EPSILON = 1e-6
+
+
+def _logsumexp(x: np.ndarray) -> np.ndarray:
+    x_max = x.max(axis=1, keepdims=True)
+    return (x_max + np.log(np.exp(x - x_max).sum(axis=1, keepdims=True)))[:, 0]
+
+
+def nearest_neighbors(data: np.ndarray, n_neighbors: int, chunk_size: int = 2048) -> np.ndarray:
+    """
+    Returns the indices of the `n_neighbors` nearest other rows of every row of `data`.
+
+    Distances are computed in chunks of `chunk_size` rows, so memory use is bounded by chunk_size * len(data).
+    """
+    data = np.asarray(data, dtype=np.float32)
+    n_neighbors = min(n_neighbors, len(data) - 1)
+    squared_norms = np.einsum('ij,ij->i', data, data)
+    neighbors = np.empty((len(data), n_neighbors), dtype=np.int64)
+
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start:start + chunk_size]
+        distances = squared_norms[start:start + len(chunk), None] - 2 * (chunk @ data.T) + squared_norms[None, :]
+        distances[np.arange(len(chunk)), np.arange(start, start + len(chunk))] = np.inf
+        nearest = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        neighbors[start:start + len(chunk)] = nearest
+
+    return neighbors
+
+
+class LatentSampler:
+    """
+    Samples new bottleneck codes from a cheap distribution fitted to the codes of the encoded minority rows.
+
+    Args:
+        method (str, optional): Valid options are 'gaussian' (a single multivariate Gaussian), 'gmm' (a mixture of Gaussians with diagonal covariances, fitted with EM) and 'knn' (random interpolation between a code and one of its nearest neighbours). Defaults to 'gaussian'.
+        n_components (int, optional): Number of mixture components for 'gmm'. Defaults to 5.
+        n_neighbors (int, optional): Number of neighbours to interpolate with for 'knn'. Defaults to 5.
+        random_state (int, optional): Seed for fitting and sampling. Defaults to None.
+
+    Use Case:
+        Sampled codes are clipped to the smallest code seen during fitting, since the bottleneck of generate_model has a relu activation and the decoder never saw negative codes.
+
+    Example:
+        sampler = LatentSampler('gmm', n_components=8).fit(encoder.predict(minority_df))
+        synthetic_rows = decoder.predict(sampler.sample(100000))
+    """
+
+    def __init__(self, method: str = 'gaussian', n_components: int = 5, n_neighbors: int = 5, random_state: int = None):
+        if method not in SAMPLING_MODES[1:]:
+            raise ValueError("Invalid sampling method.")
+        if n_components < 1:
+            raise ValueError("Invalid number of components.")
+        if n_neighbors < 1:
+            raise ValueError("Invalid number of neighbors.")
+
+        self.method = method
+        self.n_components = n_components
+        self.n_neighbors = n_neighbors
+        self.rng = np.random.default_rng(random_state)
+
+    def fit(self, codes: np.ndarray) -> 'LatentSampler':
+        """Fits the distribution to the bottleneck codes, of shape (n_rows, bottle_neck)."""
+        codes = np.asarray(codes, dtype=np.float32).reshape(len(codes), -1)
+        if len(codes) == 0:
+            raise ValueError("No codes to fit.")
+
+        self.minimum = codes.min(axis=0)
+        if self.method == 'gaussian':
+            self.mean = codes.mean(axis=0, dtype=np.float64)
+            covariance = np.atleast_2d(np.cov(codes, rowvar=False)) if len(codes) > 1 else np.zeros((codes.shape[1],) * 2)
+            self.cholesky = np.linalg.cholesky(covariance + _EPSILON * np.eye(codes.shape[1]))
+        elif self.method == 'gmm':
+            self._fit_gmm(codes.astype(np.float64))
+        else:
+            self.codes = codes
+            self.neighbors = nearest_neighbors(codes, self.n_neighbors) if len(codes) > 1 else None
+        return self
+
+    def _fit_gmm(self, codes: np.ndarray, max_iter: int = 100, tol: float = 1e-4):
+        n_components = min(self.n_components, len(codes))
+        self.means = codes[self.rng.choice(len(codes), n_components, replace=False)]
+        self.variances = np.tile(codes.var(axis=0) + _EPSILON, (n_components, 1))
+        self.weights = np.full(n_components, 1 / n_components)
+        squared_codes = np.square(codes)
+        previous = -np.inf
+
+        for _ in range(max_iter):
+            # E step, expanding the squared Mahalanobis distance so no (rows, components, dims) array is built
+            precisions = 1 / self.variances
+            log_prob = -0.5 * (squared_codes @ precisions.T - 2 * codes @ (self.means * precisions).T
+                               + (np.square(self.means) * precisions).sum(axis=1)
+                               + np.log(2 * np.pi * self.variances).sum(axis=1)) + np.log(self.weights)
+            log_norm = _logsumexp(log_prob)
+            responsibilities = np.exp(log_prob - log_norm[:, None])
+
+            # M step
+            totals = responsibilities.sum(axis=0) + 1e-10
+            self.weights = totals / totals.sum()
+            self.means = responsibilities.T @ codes / totals[:, None]
+            self.variances = np.maximum(responsibilities.T @ squared_codes / totals[:, None] - np.square(self.means), 0) + _EPSILON
+
+            likelihood = log_norm.mean()
+            if likelihood - previous < tol:
+                break
+            previous = likelihood
+
+    def sample(self, n_rows: int) -> np.ndarray:
+        """Returns `n_rows` new float32 codes."""
+        if self.method == 'gaussian':
+            samples = self.mean + self.rng.standard_normal((n_rows, len(self.mean))) @ self.cholesky.T
+        elif self.method == 'gmm':
+            components = self.rng.choice(len(self.weights), size=n_rows, p=self.weights)
+            samples = self.means[components] + np.sqrt(self.variances[components]) * self.rng.standard_normal((n_rows, self.means.shape[1]))
+        else:
+            rows = self.rng.integers(0, len(self.codes), size=n_rows)
+            if self.neighbors is None:
+                return self.codes[rows].copy()
+            partners = self.neighbors[rows, self.rng.integers(0, self.neighbors.shape[1], size=n_rows)]
+            steps = self.rng.random((n_rows, 1), dtype=np.float32)
+            return self.codes[rows] + steps * (self.codes[partners] - self.codes[rows])
+
+        return np.maximum(samples, self.minimum).astype(np.float32)
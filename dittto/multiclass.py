@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from .latent import SAMPLING_MODES
+from .parallel import configure_tensorflow, process_pool
+from .preparation import label_codes, to_float32
+from .presets import resolve_architecture
+
+
+def _class_targets(counts: pd.Series, targets) -> dict:
+    """Returns the number of rows to generate for each class label, given the target row counts."""
+    if isinstance(targets, str):
+        if targets != 'max':
+            raise ValueError("Invalid targets.")
+        targets = dict.fromkeys(counts.index, int(counts.max()))
+    elif isinstance(targets, (int, np.integer)):
+        targets = dict.fromkeys(counts.index, int(targets))
+    elif isinstance(targets, dict):
+        targets = {str(label): int(target) for label, target in targets.items()}
+        missing = [label for label in targets if label not in counts.index]
+        if missing:
+            raise ValueError("Class labels not found in the dataset: %s." % ', '.join(missing))
+    else:
+        raise ValueError("Invalid targets.")
+
+    return {label: target - int(counts[label]) for label, target in targets.items() if target > counts[label]}
+
+
+def _generate_class(minority_data: np.ndarray, columns: list, n_rows: int, model_name: str, decoder_activation: str,
+                    epochs: int, fit_kwargs: dict, noise: float, resample: bool, generation_batch_size: int,
+                    random_state: int, cache, engine: str, sampling: str) -> np.ndarray:
+    """Trains an autoencoder on the rows of one class and generates `n_rows` synthetic rows for it."""
+    from .autoencoder import _generate_rows, _synthetic_batches, _train_autoencoder
+
+    autoencoder, _ = _train_autoencoder(minority_data, columns, resolve_architecture(model_name), decoder_activation,
+                                        epochs, cache, **fit_kwargs)
+    batches = _synthetic_batches(autoencoder, minority_data, n_rows, batch_size=generation_batch_size, noise=noise,
+                                 resample=resample, sampling=sampling, random_state=random_state, engine=engine)
+    return _generate_rows(batches, n_rows, minority_data.shape[1])
+
+
+def generate_multiclass_synthetic_data(model_name: str, original_df: pd.DataFrame, class_column: str = 'class',
+                                       targets='max', decoder_activation: str = 'sigmoid', epochs: int = 100,
+                                       n_jobs: int = None, tf_threads: int = None, noise: float = 0.05,
+                                       resample: bool = False, generation_batch_size: int = 8192,
+                                       random_state: int = None, cache=None, engine: str = 'keras',
+                                       batch_size: int = 16, validation_split: float = 0.25, patience: int = 10,
+                                       sampling: str = 'reconstruct'):
+    """
+    Rebalances every underrepresented class of a dataset, training one autoencoder per class in parallel.
+
+    Args:
+        model_name (str): Name of the autoencoder model to use. Valid options are 'single_encoder', 'balanced', and 'heavy_decoder'.
+        original_df (pd.DataFrame): Original dataset to generate synthetic data from. It is not modified.
+        class_column (str, optional): Name of the column containing the class labels. Defaults to 'class'.
+        targets (str, int or dict, optional): Target number of rows per class. 'max' matches the largest class, an int applies to every class, and a dict maps class labels to their targets. Classes already at or above their target are left alone. Defaults to 'max'.
+        decoder_activation (str, optional): Activation function for the decoder layers. Defaults to 'sigmoid'.
+        epochs (int, optional): Number of epochs to train each autoencoder model. Defaults to 100.
+        n_jobs (int, optional): Number of worker processes. 1 trains every class in the current process. Defaults to the number of CPUs, capped at the number of classes to rebalance.
+        tf_threads (int, optional): Number of TensorFlow threads per worker. When the classes are trained in the current process (n_jobs=1 or a single class), its thread pools are limited instead, which must happen before TensorFlow is initialized. Defaults to the number of CPUs divided by `n_jobs`.
+        noise (float, optional): Standard deviation of the Gaussian noise added to the input rows on every pass after the first, relative to each column's standard deviation. Defaults to 0.05.
+        resample (bool, optional): Whether to draw the input rows at random (with replacement) on every pass after the first. Defaults to False.
+        generation_batch_size (int, optional): Number of rows passed to the autoencoder per predict call. Defaults to 8192.
+        random_state (int, optional): Seed for the input noise, the row resampling and the final shuffle. Defaults to None.
+        cache (ModelCache or str, optional): Cache of trained models, or the directory of one. Defaults to None (no caching).
+        engine (str, optional): Engine used to generate the synthetic rows, 'keras' or 'numpy'. Defaults to 'keras'.
+        batch_size (int, optional): Number of rows per training step. Defaults to 16.
+        validation_split (float, optional): Fraction of each class's rows held out to compute the validation loss. Defaults to 0.25.
+        patience (int, optional): Early stopping patience in epochs. None trains for all epochs. Defaults to 10.
+        sampling (str, optional): How synthetic rows are generated: 'reconstruct', 'gaussian', 'gmm' or 'knn'. See generate_synthetic_data. Defaults to 'reconstruct'.
+
+    Returns:
+        synthetic_df (pd.DataFrame): Balanced dataset with the original and the synthetic rows, shuffled.
+        generated_data (pd.DataFrame): Synthetic rows generated for every rebalanced class.
+
+    Use Case:
+        Use this function instead of calling generate_synthetic_data once per class. Worker processes are started with the 'spawn' method, so scripts must guard their entry point with `if __name__ == '__main__':`.
+
+    Example:
+        a. synthetic_df, generated_data = generate_multiclass_synthetic_data('balanced', original_df, class_column='class', n_jobs=8, tf_threads=1)
+        b. synthetic_df, generated_data = generate_multiclass_synthetic_data('single_encoder', original_df, targets={'rare': 5000, 'uncommon': 5000})
+    """
+
+    if original_df.empty:
+        raise ValueError("Empty dataframe.")
+
+    if epochs < 1:
+        raise ValueError("Invalid number of epochs.")
+
+    resolve_architecture(model_name)
+
+    if sampling not in SAMPLING_MODES:
+        raise ValueError("Invalid sampling mode.")
+
+    # Encode the labels once; every class's rows are then selected by comparing integer codes
+    codes, labels, values = label_codes(original_df[class_column])
+    needed = _class_targets(pd.Series(np.bincount(codes, minlength=len(labels)), index=labels), targets)
+    columns = [column for column in original_df.columns if column != class_column]
+    seeds = np.random.SeedSequence(random_state).generate_state(len(needed) + 1)
+
+    fit_kwargs = {'batch_size': batch_size, 'validation_split': validation_split, 'patience': patience}
+    tasks = {}
+    for seed, (label, n_rows) in zip(seeds, needed.items()):
+        minority_data = to_float32(original_df, columns, codes == labels.index(label))
+        tasks[label] = (minority_data, columns, n_rows, model_name, decoder_activation, epochs, fit_kwargs, noise,
+                        resample, generation_batch_size, int(seed), cache, engine, sampling)
+
+    n_jobs = n_jobs or min(os.cpu_count() or 1, max(len(tasks), 1))
+    if n_jobs == 1 or len(tasks) <= 1:
+        if tf_threads:
+            configure_tensorflow(tf_threads, tf_threads)
+        results = {label: _generate_class(*task) for label, task in tasks.items()}
+    else:
+        with process_pool(n_jobs, tf_threads) as pool:
+            futures = {label: pool.submit(_generate_class, *task) for label, task in tasks.items()}
+            results = {label: future.result() for label, future in futures.items()}
+
+    frames = []
+    for label, generated in results.items():
+        frame = pd.DataFrame(generated, columns=columns, copy=False)
+        frame[class_column] = values[labels.index(label)]
+        frames.append(frame)
+    generated_data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(original_df.columns))
+
+    synthetic_df = pd.concat([original_df, generated_data], ignore_index=True)
+    synthetic_df = synthetic_df.sample(frac=1, random_state=int(seeds[-1])).reset_index(drop=True)
+
+    return synthetic_df, generated_data
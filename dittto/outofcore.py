@@ -0,0 +1,176 @@
+import tensorflow as tf
+import numpy as np
+
+from .autoencoder import _fit_dataset, _iter_chunks, _predict_function, generate_model
+from .preparation import label_value, minority_mask, noise_scale, to_float32
+from .presets import resolve_architecture
+from .readers import expand_paths, iter_file_chunks
+from .writers import ChunkWriter
+
+
+def _scan_files(paths: list, minority_class_column: str, minority_class_label: str, chunk_size: int) -> dict:
+    """Counts the minority and majority rows and computes the column statistics of the minority rows in one pass."""
+    stats = {'columns': None, 'label': None, 'minority_rows': 0, 'majority_rows': 0}
+    total = total_squares = None
+
+    for chunk in iter_file_chunks(paths, chunk_size):
+        if minority_class_column not in chunk.columns:
+            raise ValueError("Minority class column not found in the dataset.")
+        columns = [column for column in chunk.columns if column != minority_class_column]
+        if stats['columns'] is None:
+            stats['columns'] = columns
+            total = np.zeros(len(columns))
+            total_squares = np.zeros(len(columns))
+        elif columns != stats['columns']:
+            raise ValueError("All input files must have the same columns.")
+
+        mask = minority_mask(chunk[minority_class_column], minority_class_label)
+        minority_data = to_float32(chunk, columns, mask)
+        if stats['label'] is None and len(minority_data):
+            stats['label'] = label_value(chunk[minority_class_column], minority_class_label)
+        stats['minority_rows'] += len(minority_data)
+        stats['majority_rows'] += len(mask) - len(minority_data)
+        total += minority_data.sum(axis=0, dtype=np.float64)
+        total_squares += np.einsum('ij,ij->j', minority_data, minority_data, dtype=np.float64)
+
+    if not stats['minority_rows']:
+        raise ValueError("Minority class label not found in the dataset.")
+
+    mean = total / stats['minority_rows']
+    stats['mean'] = mean.astype(np.float32)
+    stats['std'] = np.sqrt(np.maximum(total_squares / stats['minority_rows'] - np.square(mean), 0)).astype(np.float32)
+    return stats
+
+
+def _iter_minority_chunks(paths: list, columns: list, minority_class_column: str, minority_class_label: str,
+                          chunk_size: int):
+    """Streams the minority rows of the files as float32 arrays, filtering every chunk as it is read."""
+    for chunk in iter_file_chunks(paths, chunk_size):
+        mask = minority_mask(chunk[minority_class_column], minority_class_label)
+        if mask.any():
+            yield to_float32(chunk, columns, mask)
+
+
+def _iter_streamed_batches(predict, make_chunks, n_rows: int, scale: np.ndarray = None, random_state: int = None):
+    """
+    Yields float32 batches of synthetic rows from a stream of minority chunks until exactly `n_rows` rows are produced.
+
+    Like _iter_generated_batches, the first pass reconstructs the minority rows in order and every later pass adds
+    Gaussian noise with the per-column standard deviations `scale` to its input.
+    """
+    rng = np.random.default_rng(random_state)
+    remaining = n_rows
+    first_pass = True
+
+    while remaining > 0:
+        for chunk in make_chunks():
+            batch = chunk[:remaining]
+            if not first_pass and scale is not None:
+                batch = batch + rng.standard_normal(batch.shape, dtype=np.float32) * scale
+            yield np.asarray(predict(batch), dtype=np.float32).reshape(len(batch), -1)
+
+            remaining -= len(batch)
+            if remaining == 0:
+                return
+        first_pass = False
+
+
+def rebalance_files(input_path, output_path: str, model_name: str = 'single_encoder', minority_class_column: str = 'class',
+                    minority_class_label: str = '0', decoder_activation: str = 'sigmoid', epochs: int = 100,
+                    n_rows: int = None, chunk_size: int = 100000, batch_size: int = 16, patience: int = 10,
+                    shuffle_buffer: int = 10000, noise: float = 0.05, random_state: int = None,
+                    engine: str = 'keras', learning_rate: float = 0.001, reduce_lr_patience: int = None,
+                    jit_compile: bool = False, steps_per_execution: int = 1, synthetic_only: bool = False) -> dict:
+    """
+    Trains an autoencoder model on CSV or Parquet files larger than memory and writes the rebalanced rows to a file.
+
+    Args:
+        input_path (str or list): A .csv or .parquet file, a glob pattern or a list of them.
+        output_path (str): A .csv or .parquet file the original rows, followed by the synthetic minority rows, are written to.
+        model_name (str, optional): Name of the autoencoder model to use. Valid options are 'single_encoder', 'balanced', and 'heavy_decoder'. Defaults to 'single_encoder'.
+        minority_class_column (str, optional): Name of the column containing the minority class label. Defaults to 'class'.
+        minority_class_label (str, optional): Label of the minority class. Defaults to '0'.
+        decoder_activation (str, optional): Activation function for the decoder layers. Defaults to 'sigmoid'.
+        epochs (int, optional): Maximum number of epochs to train the autoencoder model. Defaults to 100.
+        n_rows (int, optional): Total number of synthetic rows to generate. Defaults to the number of majority class rows, like generate_synthetic_data.
+        chunk_size (int, optional): Number of rows read from the input files and written to the output file at a time. Defaults to 100000.
+        batch_size (int, optional): Number of rows per training step. Defaults to 16.
+        patience (int, optional): Stop training once the training loss has not improved for this many epochs, and keep the best weights. None trains for all epochs. Defaults to 10.
+        shuffle_buffer (int, optional): Number of minority rows held in the training shuffle buffer. Defaults to 10000.
+        noise (float, optional): Standard deviation of the Gaussian noise added to the input rows on every pass after the first, relative to each column's standard deviation. Defaults to 0.05.
+        random_state (int, optional): Seed for the input noise. Defaults to None.
+        engine (str, optional): Engine used to generate the synthetic rows, 'keras' or 'numpy'. Defaults to 'keras'.
+        learning_rate, reduce_lr_patience, jit_compile, steps_per_execution: As in fit_model; `reduce_lr_patience` monitors the training loss.
+        synthetic_only (bool, optional): Only write the synthetic rows. Defaults to False.
+
+    Returns:
+        dict: Summary with the number of input files, minority rows, majority rows, generated rows, rows written to the output file and training epochs.
+
+    Use Case:
+        Use this function when the original dataset does not fit in memory. The files are read in chunks and only the minority rows of each chunk are kept, so memory use depends on `chunk_size` and `shuffle_buffer`, not on the size of the input. The files are read once to count the rows, once per training epoch, once per generation pass and once more to copy the original rows to the output. No rows are held out for validation, so early stopping monitors the training loss.
+
+    Example:
+        a. summary = rebalance_files('data/*.parquet', 'synthetic.parquet', model_name='balanced', minority_class_column='class', minority_class_label='fraud')
+        b. summary = rebalance_files(['a.csv', 'b.csv'], 'synthetic.csv', epochs=20, batch_size=1024, chunk_size=500000)
+    """
+
+    if epochs < 1:
+        raise ValueError("Invalid number of epochs.")
+
+    if batch_size < 1:
+        raise ValueError("Invalid batch size.")
+
+    if noise < 0:
+        raise ValueError("Noise must be greater than or equal to 0.")
+
+    if n_rows is not None and n_rows < 0:
+        raise ValueError("Invalid number of rows.")
+
+    if engine not in ('keras', 'numpy'):
+        raise ValueError("Invalid engine.")
+
+    if steps_per_execution < 1:
+        raise ValueError("Invalid steps per execution.")
+
+    architecture = resolve_architecture(model_name)
+    paths = expand_paths(input_path)
+    stats = _scan_files(paths, minority_class_column, minority_class_label, chunk_size)
+    columns = stats['columns']
+    make_chunks = lambda: _iter_minority_chunks(paths, columns, minority_class_column, minority_class_label, chunk_size)
+
+    try:
+        autoencoder, _, _ = generate_model(len(columns), decoder_activation=decoder_activation, **architecture)
+    except ValueError:
+        raise ValueError("Invalid model parameters.")
+
+    dataset = tf.data.Dataset.from_generator(make_chunks, output_signature=tf.TensorSpec((None, len(columns)), tf.float32))
+    dataset = dataset.unbatch().shuffle(shuffle_buffer).batch(batch_size).map(lambda rows: (rows, rows))
+    history = _fit_dataset(autoencoder, dataset.repeat().prefetch(tf.data.AUTOTUNE), epochs,
+                           steps_per_epoch=-(-stats['minority_rows'] // batch_size), patience=patience,
+                           reduce_lr_patience=reduce_lr_patience, learning_rate=learning_rate,
+                           jit_compile=jit_compile, steps_per_execution=steps_per_execution)
+
+    if n_rows is None:
+        n_rows = stats['majority_rows']
+    scale = noise_scale(stats['std'], stats['mean'], noise)
+    batches = _iter_streamed_batches(_predict_function(autoencoder, engine), make_chunks, n_rows, scale=scale,
+                                     random_state=random_state)
+
+    generated_rows = original_rows = 0
+    if synthetic_only:
+        for chunk in _iter_chunks(batches, columns, minority_class_column, stats['label'], output_path):
+            generated_rows += len(chunk)
+    else:
+        with ChunkWriter(output_path) as writer:
+            for chunk in iter_file_chunks(paths, chunk_size):
+                # Widen the feature columns like pd.concat with the float32 synthetic rows would, e.g. int64 to float64
+                writer.write(chunk.astype({column: np.result_type(chunk[column].dtype, np.float32)
+                                           for column in columns}))
+                original_rows += len(chunk)
+            for chunk in _iter_chunks(batches, columns, minority_class_column, stats['label']):
+                writer.write(chunk)
+                generated_rows += len(chunk)
+
+    return {'files': len(paths), 'minority_rows': stats['minority_rows'], 'majority_rows': stats['majority_rows'],
+            'generated_rows': generated_rows, 'output_rows': original_rows + generated_rows,
+            'epochs': len(history.history['loss'])}
@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def configure_tensorflow(intra_op_threads: int = None, inter_op_threads: int = None):
+    """
+    Limits the thread pools TensorFlow uses in the current process.
+
+    Args:
+        intra_op_threads (int, optional): Number of threads used inside a single op, e.g. a matrix multiplication. Defaults to None (TensorFlow's default).
+        inter_op_threads (int, optional): Number of threads used to run independent ops concurrently. Defaults to None (TensorFlow's default).
+
+    Use Case:
+        Thread pools can only be configured before TensorFlow runs its first op, so call this function at the start of a process.
+
+    Example:
+        configure_tensorflow(intra_op_threads=4, inter_op_threads=1)
+    """
+
+    import tensorflow as tf
+
+    try:
+        if intra_op_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        if inter_op_threads:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError:
+        raise RuntimeError("TensorFlow thread pools must be configured before TensorFlow is initialized.")
+
+
+def _init_worker(tf_threads: int):
+    # Stop every worker from spawning a thread per core in the native math libraries
+    os.environ['OMP_NUM_THREADS'] = str(tf_threads)
+    configure_tensorflow(tf_threads, tf_threads)
+
+
+def process_pool(n_jobs: int = None, tf_threads: int = None) -> ProcessPoolExecutor:
+    """
+    Creates a pool of worker processes that each import TensorFlow once, with a bounded number of threads.
+
+    Workers are started with the 'spawn' method, since TensorFlow is not fork-safe, so scripts using the pool must guard
+    their entry point with `if __name__ == '__main__':`.
+
+    Args:
+        n_jobs (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        tf_threads (int, optional): Number of TensorFlow threads per worker. Defaults to the number of CPUs divided by `n_jobs`.
+
+    Returns:
+        ProcessPoolExecutor: The worker pool.
+    """
+
+    cpu_count = os.cpu_count() or 1
+    n_jobs = n_jobs or cpu_count
+    if n_jobs < 1:
+        raise ValueError("Invalid number of jobs.")
+
+    tf_threads = tf_threads or max(1, cpu_count // n_jobs)
+    if tf_threads < 1:
+        raise ValueError("Invalid number of TensorFlow threads.")
+
+    return ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker, initargs=(tf_threads,))
@@ -0,0 +1,116 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+PreparedData = namedtuple('PreparedData', ['mask', 'columns', 'minority_data'])
+
+
+def minority_mask(labels: pd.Series, minority_class_label: str) -> np.ndarray:
+    """
+    Returns a boolean mask of the rows whose label, compared as a string, equals `minority_class_label`.
+
+    Only the distinct labels are converted to strings, so no string column the length of the data is allocated.
+    """
+    matches = [value for value in labels.unique() if str(value) == minority_class_label]
+    return labels.isin(matches).to_numpy(dtype=bool)
+
+
+def label_codes(labels: pd.Series):
+    """
+    Encodes the labels once as integer codes.
+
+    Returns:
+        tuple: An int array of codes, one per row, the list of distinct labels as strings, indexed by code, and the
+        original label value of every code (the first one seen, when several values share a string).
+    """
+    codes, uniques = pd.factorize(labels, use_na_sentinel=False)
+    names, remap = np.unique(np.array([str(value) for value in uniques], dtype=object), return_inverse=True)
+    values = [None] * len(names)
+    for code, value in reversed(list(zip(remap, pd.Index(uniques).tolist()))):
+        values[code] = value
+    return remap[codes], [str(name) for name in names], values
+
+
+def noise_scale(std: np.ndarray, mean: np.ndarray, noise: float):
+    """
+    Returns the float32 per-column standard deviation of the input noise, or None without noise.
+
+    The noise is `noise` times each column's standard deviation. Columns without spread, such as constant columns or
+    every column of a single minority row, use `noise * max(|mean|, 1)` instead, so noisy passes still produce new rows.
+    """
+    if noise <= 0:
+        return None
+    std, mean = np.asarray(std, dtype=np.float64), np.asarray(mean, dtype=np.float64)
+    return (noise * np.where(std > 0, std, np.maximum(np.abs(mean), 1))).astype(np.float32)
+
+
+def to_float32(df: pd.DataFrame, columns: list, mask: np.ndarray = None) -> np.ndarray:
+    """
+    Gathers the given columns (and, optionally, only the rows selected by `mask`) into one C-contiguous float32 array.
+
+    `mask` is either a boolean mask or an array of integer row positions. The array is preallocated and filled column by
+    column, so the only transient copy is a single gathered column.
+    """
+    if mask is None:
+        n_rows = len(df)
+    else:
+        n_rows = int(np.count_nonzero(mask)) if mask.dtype == bool else len(mask)
+    data = np.empty((n_rows, len(columns)), dtype=np.float32)
+
+    for j, column in enumerate(columns):
+        values = df[column].to_numpy()
+        try:
+            data[:, j] = values[mask] if mask is not None else values
+        except (TypeError, ValueError):
+            raise ValueError("Column %r is not numeric." % column)
+
+    return data
+
+
+def prepare_data(original_df: pd.DataFrame, minority_class_column: str, minority_class_label: str,
+                 transformer=None) -> PreparedData:
+    """
+    Prepares the minority rows of a dataset for training and generation without modifying it.
+
+    Args:
+        original_df (pd.DataFrame): Original dataset. It is not modified.
+        minority_class_column (str): Name of the column containing the minority class label.
+        minority_class_label (str): Label of the minority class, compared against the labels as strings.
+        transformer (TabularTransformer, optional): Transformer the minority features are scaled and encoded with instead of being used as they are. It is fitted on the minority rows first unless it is already fitted. Defaults to None.
+
+    Returns:
+        PreparedData: The boolean minority mask, the feature columns and the minority features as a single contiguous float32 array, used for both training and generation.
+
+    Use Case:
+        The mask is computed once and the float32 array is the only copy of the minority features, so for float64 features the peak memory of this stage stays below 0.6 times the size of the input.
+    """
+
+    if minority_class_column not in original_df.columns:
+        raise ValueError("Minority class column not found in the dataset.")
+
+    mask = minority_mask(original_df[minority_class_column], minority_class_label)
+    if not mask.any():
+        raise ValueError("Minority class label not found in the dataset.")
+
+    columns = [column for column in original_df.columns if column != minority_class_column]
+    if transformer is None:
+        return PreparedData(mask, columns, to_float32(original_df, columns, mask))
+
+    minority_df = original_df.loc[mask, columns]
+    if not transformer.fitted:
+        transformer.fit(minority_df)
+    elif [str(column) for column in transformer.columns] != [str(column) for column in columns]:
+        raise ValueError("Transformer does not match the dataset.")
+    return PreparedData(mask, columns, transformer.transform(minority_df))
+
+
+def label_value(labels: pd.Series, minority_class_label: str):
+    """
+    Returns the value written to the class column of the generated rows: the original label whose string form equals
+    `minority_class_label`, matched as in minority_mask and label_codes, or `minority_class_label` itself if none does.
+    """
+    for value in pd.Index(labels.unique()).tolist():
+        if str(value) == minority_class_label:
+            return value
+    return minority_class_label
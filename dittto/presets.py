@@ -0,0 +1,25 @@
+# Layer configurations of the ready-to-use models in generate_synthetic_data
+MODEL_PRESETS = {
+    'single_encoder': {'encoder_dense_layers': [20], 'bottle_neck': 16, 'decoder_dense_layers': [18, 20]},
+    'balanced': {'encoder_dense_layers': [22, 20], 'bottle_neck': 16, 'decoder_dense_layers': [20, 22]},
+    'heavy_decoder': {'encoder_dense_layers': [22, 20], 'bottle_neck': 16, 'decoder_dense_layers': [18, 20, 22, 24]},
+}
+
+_ARCHITECTURE_KEYS = ('encoder_dense_layers', 'bottle_neck', 'decoder_dense_layers')
+
+
+def resolve_architecture(model_name) -> dict:
+    """
+    Returns the layer configuration of the preset model `model_name`.
+
+    `model_name` can also be a layer configuration itself, a dict with the keys 'encoder_dense_layers', 'bottle_neck'
+    and 'decoder_dense_layers', e.g. the 'architecture' chosen by select_architecture.
+    """
+    if isinstance(model_name, dict):
+        if set(model_name) != set(_ARCHITECTURE_KEYS):
+            raise ValueError("Invalid model architecture.")
+        return {key: list(model_name[key]) if key != 'bottle_neck' else int(model_name[key])
+                for key in _ARCHITECTURE_KEYS}
+    if model_name not in MODEL_PRESETS:
+        raise ValueError("Invalid model name.")
+    return MODEL_PRESETS[model_name]
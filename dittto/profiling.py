@@ -0,0 +1,70 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+def peak_rss_mb():
+    """Returns the peak resident set size of the current process in MB, or None where it is not available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class Profiler:
+    """
+    Collects a structured report of the phases of a generation run: wall time, rows processed and peak memory delta, plus per-epoch training time and throughput.
+
+    The peak memory delta of a phase is how much the process' peak resident set size grew while the phase ran, so a
+    phase that stays below an earlier peak reports 0.
+
+    Args:
+        hook (callable, optional): Called with the report when a run finishes, e.g. to forward it to a metrics system. Defaults to None.
+
+    Example:
+        a. profiler = Profiler()
+           generate_synthetic_data('balanced', original_df, profiler=profiler)
+           profiler.report()
+        b. generate_synthetic_data('balanced', original_df, profiler=Profiler(hook=lambda report: metrics.send(report)))
+    """
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.phases = []
+        self.epochs = []
+
+    @contextmanager
+    def phase(self, name: str, rows: int = None):
+        """Times the body of a `with` block. The yielded record's 'rows' entry can be updated inside the block."""
+        record = {'name': name, 'rows': rows}
+        peak_before = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            peak_after = peak_rss_mb()
+            record['peak_memory_delta_mb'] = peak_after - peak_before if peak_after is not None else None
+            self.phases.append(record)
+
+    def record_epoch(self, epoch: int, seconds: float, samples: int, logs: dict = None):
+        """Records the wall time and throughput of one training epoch."""
+        record = {'epoch': epoch, 'seconds': seconds, 'samples': samples,
+                  'samples_per_second': samples / seconds if seconds > 0 else None}
+        record.update({key: float(value) for key, value in (logs or {}).items()})
+        self.epochs.append(record)
+
+    def report(self) -> dict:
+        """Returns the phases and epochs recorded so far."""
+        return {'phases': [dict(phase) for phase in self.phases], 'epochs': [dict(epoch) for epoch in self.epochs],
+                'total_seconds': sum(phase['seconds'] for phase in self.phases)}
+
+    def finish(self) -> dict:
+        """Sends the report to the hook, if any, and returns it."""
+        report = self.report()
+        if self.hook is not None:
+            self.hook(report)
+        return report
@@ -0,0 +1,64 @@
+import glob
+import os
+
+import pandas as pd
+
+from .writers import _import_pyarrow, file_format
+
+
+def expand_paths(paths) -> list:
+    """
+    Expands a file path, a glob pattern or a list of them into a sorted list of existing files.
+
+    Example:
+        a. expand_paths('data/*.parquet')
+        b. expand_paths(['january.csv', 'february.csv'])
+    """
+
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    expanded = []
+    for path in paths:
+        matches = sorted(glob.glob(str(path))) if glob.has_magic(str(path)) else [str(path)]
+        for match in matches:
+            if not os.path.isfile(match):
+                raise FileNotFoundError("No such file: %s." % match)
+            expanded.append(match)
+
+    if not expanded:
+        raise FileNotFoundError("No files match %s." % paths)
+    return expanded
+
+
+def read_file(path: str, columns: list = None) -> pd.DataFrame:
+    """Reads a whole CSV or Parquet file into a DataFrame."""
+    if file_format(path) == 'csv':
+        return pd.read_csv(path, usecols=columns)
+    return _import_pyarrow().parquet.read_table(path, columns=columns).to_pandas()
+
+
+def iter_file_chunks(paths, chunk_size: int = 100000, columns: list = None):
+    """
+    Reads CSV and Parquet files as a stream of DataFrame chunks of at most `chunk_size` rows.
+
+    Args:
+        paths (str or list): A file path, a glob pattern or a list of them.
+        chunk_size (int, optional): Maximum number of rows per chunk. Defaults to 100000.
+        columns (list, optional): Only read these columns. Defaults to None (all columns).
+
+    Returns:
+        generator: Yields pd.DataFrame chunks.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+
+    for path in expand_paths(paths):
+        if file_format(path) == 'csv':
+            with pd.read_csv(path, chunksize=chunk_size, usecols=columns) as reader:
+                yield from reader
+        else:
+            parquet_file = _import_pyarrow().parquet.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+                yield batch.to_pandas()
@@ -0,0 +1,122 @@
+import math
+import os
+
+import numpy as np
+
+from .parallel import process_pool
+from .presets import MODEL_PRESETS, resolve_architecture
+
+
+def _candidate_architectures(candidates=None, include_presets: bool = True) -> dict:
+    """Returns the named layer configurations to search: the presets followed by the user-supplied ones."""
+    architectures = dict(MODEL_PRESETS) if include_presets else {}
+    if isinstance(candidates, dict):
+        candidates = candidates.items()
+    else:
+        candidates = (('custom_%d' % i, candidate) for i, candidate in enumerate(candidates or []))
+
+    for name, candidate in candidates:
+        architectures[name] = resolve_architecture(candidate)
+
+    if not architectures:
+        raise ValueError("No candidate architectures.")
+    return architectures
+
+
+def _rung_epochs(epochs: int, n_candidates: int, reduction_factor: int) -> list:
+    """Returns the cumulative number of epochs every rung of successive halving trains its survivors to."""
+    n_rungs = math.ceil(math.log(n_candidates, reduction_factor) - 1e-9) if n_candidates > 1 else 0
+    budgets = [max(1, round(epochs / reduction_factor ** (n_rungs - rung))) for rung in range(n_rungs + 1)]
+    return sorted(set(budgets))
+
+
+def _train_candidate(architecture: dict, minority_data: np.ndarray, decoder_activation: str, state: dict,
+                     initial_epoch: int, epochs: int, fit_kwargs: dict):
+    """Builds a candidate model, restores its state from the previous rung and trains it up to `epochs`."""
+    from .autoencoder import fit_model, generate_model, optimizer_state
+
+    autoencoder, _, _ = generate_model(minority_data.shape[1], decoder_activation=decoder_activation, **architecture)
+    if state is not None:
+        autoencoder.set_weights(state['weights'])
+
+    history = fit_model(autoencoder, minority_data, epochs=epochs, initial_epoch=initial_epoch, patience=None,
+                        optimizer_state=state['optimizer'] if state is not None else None, **fit_kwargs)
+    monitor = 'val_loss' if 'val_loss' in history.history else 'loss'
+    state = {'weights': autoencoder.get_weights(), 'optimizer': optimizer_state(autoencoder)}
+    return state, [float(loss) for loss in history.history[monitor]]
+
+
+def select_architecture(minority_data, candidates=None, include_presets: bool = True,
+                        decoder_activation: str = 'sigmoid', epochs: int = 100, reduction_factor: int = 2,
+                        n_jobs: int = None, tf_threads: int = None, batch_size: int = 16,
+                        validation_split: float = 0.25, learning_rate: float = 0.001) -> dict:
+    """
+    Picks the autoencoder architecture with the lowest validation loss, training the candidates concurrently and pruning weak ones early with successive halving.
+
+    Args:
+        minority_data (np.ndarray or pd.DataFrame): Minority class rows, without the class column.
+        candidates (list or dict, optional): Additional layer configurations, dicts with the keys 'encoder_dense_layers', 'bottle_neck' and 'decoder_dense_layers'. A dict maps candidate names to configurations; a list names them 'custom_0', 'custom_1', .... Defaults to None.
+        include_presets (bool, optional): Whether to search the 'single_encoder', 'balanced' and 'heavy_decoder' presets as well. Defaults to True.
+        decoder_activation (str, optional): Activation function for the decoder layers. Defaults to 'sigmoid'.
+        epochs (int, optional): Number of epochs the best candidate is trained for. Defaults to 100.
+        reduction_factor (int, optional): Every rung keeps the best 1 / `reduction_factor` of the candidates and trains them `reduction_factor` times longer. Defaults to 2.
+        n_jobs (int, optional): Number of worker processes. 1 trains every candidate in the current process. Defaults to the number of CPUs, capped at the number of candidates.
+        tf_threads (int, optional): Number of TensorFlow threads per worker. Defaults to the number of CPUs divided by `n_jobs`.
+        batch_size (int, optional): Number of rows per training step. Defaults to 16.
+        validation_split (float, optional): Fraction of the rows held out to compute the validation loss candidates are ranked by. With no validation rows, the training loss is used. Defaults to 0.25.
+        learning_rate (float, optional): Learning rate of the Adam optimizer. Defaults to 0.001.
+
+    Returns:
+        dict: The chosen 'name', 'architecture' and best 'loss', its per-epoch 'loss_curve', its trained 'weights', the number of 'epochs' it was trained for, and the 'loss_curves' of every candidate, which stop at the rung where a candidate was pruned.
+
+    Use Case:
+        Every candidate is trained for a few epochs, only the best ones keep training, and the survivors resume from their weights and optimizer state instead of starting over, so the search costs a small multiple of a single training run. Store the returned 'architecture' and pass it as `model_name` to generate_synthetic_data to skip the search on later runs. Worker processes are started with the 'spawn' method, so scripts must guard their entry point with `if __name__ == '__main__':`.
+
+    Example:
+        a. selection = select_architecture(minority_df, epochs=100, n_jobs=3)
+           synthetic_df, _, _, _ = generate_synthetic_data(selection['architecture'], original_df)
+        b. selection = select_architecture(X, candidates=[{'encoder_dense_layers': [64, 32], 'bottle_neck': 8, 'decoder_dense_layers': [32, 64]}])
+    """
+
+    if epochs < 1:
+        raise ValueError("Invalid number of epochs.")
+
+    if reduction_factor < 2:
+        raise ValueError("Invalid reduction factor.")
+
+    minority_data = np.ascontiguousarray(minority_data, dtype=np.float32)
+    architectures = _candidate_architectures(candidates, include_presets)
+    fit_kwargs = {'batch_size': batch_size, 'validation_split': validation_split, 'learning_rate': learning_rate}
+
+    curves = {name: [] for name in architectures}
+    states = dict.fromkeys(architectures)
+    alive = list(architectures)
+    n_jobs = n_jobs or min(os.cpu_count() or 1, len(alive))
+    pool = process_pool(n_jobs, tf_threads) if n_jobs > 1 and len(alive) > 1 else None
+
+    try:
+        trained_epochs = 0
+        for budget in _rung_epochs(epochs, len(alive), reduction_factor):
+            tasks = {name: (architectures[name], minority_data, decoder_activation, states[name], trained_epochs,
+                            budget, fit_kwargs) for name in alive}
+            if pool is None or len(tasks) == 1:
+                results = {name: _train_candidate(*task) for name, task in tasks.items()}
+            else:
+                futures = {name: pool.submit(_train_candidate, *task) for name, task in tasks.items()}
+                results = {name: future.result() for name, future in futures.items()}
+
+            for name, (state, curve) in results.items():
+                states[name] = state
+                curves[name].extend(curve)
+            trained_epochs = budget
+
+            # Successive halving: rank by the best loss reached so far and keep the top 1 / reduction_factor
+            alive.sort(key=lambda name: min(curves[name]))
+            alive = alive[:max(1, math.ceil(len(alive) / reduction_factor))]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = alive[0]
+    return {'name': best, 'architecture': architectures[best], 'loss': min(curves[best]), 'loss_curve': curves[best],
+            'weights': states[best]['weights'], 'epochs': trained_epochs, 'loss_curves': curves}
@@ -0,0 +1,449 @@
+"""
+Serves synthetic rows from trained models over HTTP.
+
+Usage:
+    dittto-serve --model fraud=fraud.npz --model churn=churn.npz --port 8000
+    curl 'http://127.0.0.1:8000/generate?model=fraud&rows=1000'
+"""
+import argparse
+import collections
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from .inference import NumpyModel
+from .latent import SAMPLING_MODES, LatentSampler
+from .preparation import noise_scale
+from .transform import TabularTransformer
+
+# Number of recent requests latency percentiles are computed over
+_LATENCY_WINDOW = 1024
+
+
+class ServedModel:
+    """
+    A trained model ready to generate any number of synthetic rows on request, with a pure-NumPy forward pass.
+
+    Args:
+        model (NumpyModel or keras.Model): With sampling='reconstruct', an autoencoder; otherwise a decoder.
+        source (np.ndarray): The minority rows the autoencoder reconstructs, or the bottleneck codes of the encoded minority rows the decoder's latent sampler is fitted to.
+        sampling (str, optional): 'reconstruct' runs randomly drawn minority rows, with Gaussian noise, through the autoencoder. 'gaussian', 'gmm' and 'knn' decode codes sampled as in generate_synthetic_data. Defaults to 'reconstruct'.
+        noise (float, optional): Standard deviation of the noise added to the input rows with sampling='reconstruct', relative to each column's standard deviation. Defaults to 0.05.
+        columns (list, optional): Names of the generated columns. Defaults to the columns of `transformer`, or '0', '1', ....
+        random_state (int, optional): Seed for drawing the inputs. Defaults to None.
+        transformer (TabularTransformer, optional): The fitted transformer the model was trained with. It is saved with the model, and the server maps generated rows back with it before responding. Defaults to None.
+
+    Use Case:
+        Build it once from a trained autoencoder with ServedModel.from_keras, save it, and serve the file with GenerationServer or `dittto-serve`. Unlike the first pass of generate_synthetic_data, every request draws its input rows at random.
+
+    Example:
+        a. ServedModel.from_keras(autoencoder, minority_df, sampling='gmm').save('fraud.npz')
+        b. model = ServedModel.load('fraud.npz')
+           synthetic_rows = model.generate(1000)
+    """
+
+    def __init__(self, model, source: np.ndarray, sampling: str = 'reconstruct', noise: float = 0.05,
+                 columns: list = None, random_state: int = None, transformer: TabularTransformer = None):
+        if sampling not in SAMPLING_MODES:
+            raise ValueError("Invalid sampling mode.")
+        if noise < 0:
+            raise ValueError("Noise must be greater than or equal to 0.")
+
+        self.model = model if isinstance(model, NumpyModel) else NumpyModel.from_keras(model)
+        self.source = np.ascontiguousarray(source, dtype=np.float32).reshape(len(source), -1)
+        if len(self.source) == 0 or self.source.shape[1] != self.model.input_shape:
+            raise ValueError("Invalid source rows.")
+
+        self.sampling = sampling
+        self.noise = noise
+        self.transformer = transformer
+        n_columns = self.model.output_shape
+        if transformer is not None:
+            if transformer.n_features != self.model.output_shape:
+                raise ValueError("Transformer does not match the model.")
+            n_columns = len(transformer.columns)
+            columns = columns if columns is not None else transformer.columns
+        self.columns = [str(column) for column in columns] if columns is not None else [str(i) for i in range(n_columns)]
+        if len(self.columns) != n_columns:
+            raise ValueError("Invalid number of columns.")
+
+        self.rng = np.random.default_rng(random_state)
+        if sampling == 'reconstruct':
+            self.scale = noise_scale(self.source.std(axis=0), self.source.mean(axis=0), noise)
+        else:
+            self.sampler = LatentSampler(sampling, random_state=random_state).fit(self.source)
+
+    @classmethod
+    def from_keras(cls, autoencoder, minority_data, sampling: str = 'reconstruct', noise: float = 0.05,
+                   columns: list = None, random_state: int = None,
+                   transformer: TabularTransformer = None) -> 'ServedModel':
+        """
+        Builds a served model from a trained autoencoder of generate_model and the minority rows it was trained on.
+
+        With a `transformer`, `minority_data` holds the original rows and is transformed with it; an unfitted transformer
+        is fitted to it first.
+        """
+        if columns is None and hasattr(minority_data, 'columns'):
+            columns = list(minority_data.columns)
+        if transformer is not None:
+            if not transformer.fitted:
+                transformer.fit(minority_data)
+            minority_data = transformer.transform(minority_data)
+        minority_data = np.asarray(minority_data, dtype=np.float32)
+
+        if sampling == 'reconstruct':
+            return cls(autoencoder, minority_data, sampling, noise, columns, random_state, transformer)
+
+        # Only the decoder is served; the encoder is run once here to fit the latent sampler
+        codes = NumpyModel.from_keras(autoencoder.get_layer('encoder')).predict(minority_data)
+        return cls(autoencoder.get_layer('decoder'), codes, sampling, noise, columns, random_state, transformer)
+
+    @classmethod
+    def load(cls, path: str, random_state: int = None) -> 'ServedModel':
+        """Loads a model written by ServedModel.save."""
+        with np.load(path, allow_pickle=False) as arrays:
+            transformer = None
+            if 'transformer' in arrays.files:
+                transformer = TabularTransformer.from_config(json.loads(str(arrays['transformer'])))
+            return cls(NumpyModel._from_arrays(arrays), arrays['source'], str(arrays['sampling']),
+                       float(arrays['noise']), [str(column) for column in arrays['columns']], random_state, transformer)
+
+    def save(self, path: str):
+        """Writes the weights, the source rows or codes, the transformer and the settings to a single .npz file."""
+        extra = {'transformer': np.array(json.dumps(self.transformer.to_config()))} if self.transformer is not None else {}
+        np.savez(path, source=self.source, sampling=np.array(self.sampling), noise=np.array(self.noise),
+                 columns=np.array(self.columns), **extra, **self.model._arrays())
+
+    def inputs(self, n_rows: int) -> np.ndarray:
+        """Draws the model inputs for `n_rows` synthetic rows."""
+        if self.sampling != 'reconstruct':
+            return self.sampler.sample(n_rows)
+
+        rows = self.source[self.rng.integers(0, len(self.source), size=n_rows)]
+        if self.scale is not None:
+            rows += self.rng.standard_normal(rows.shape, dtype=np.float32) * self.scale
+        return rows
+
+    def generate(self, n_rows: int) -> np.ndarray:
+        """Returns `n_rows` float32 synthetic rows, before they are mapped back with the transformer."""
+        return self.model.predict(self.inputs(n_rows))
+
+    def to_frame(self, rows: np.ndarray) -> pd.DataFrame:
+        """Maps generated rows back with the transformer, if any, to a DataFrame with the model's columns."""
+        frame = self.transformer.inverse_transform(rows) if self.transformer is not None else pd.DataFrame(rows)
+        frame.columns = self.columns
+        return frame
+
+
+class _Stats:
+    """Thread-safe request, row, batch and latency counters."""
+
+    def __init__(self, names):
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.totals = collections.Counter()
+        self.models = {name: collections.Counter() for name in names}
+        self.latencies = collections.deque(maxlen=_LATENCY_WINDOW)
+
+    def record_request(self, name: str, rows: int, seconds: float, error: bool = False):
+        with self.lock:
+            counters = [self.totals] + ([self.models[name]] if name in self.models else [])
+            for counter in counters:
+                counter['requests'] += 1
+                if error:
+                    counter['errors'] += 1
+                else:
+                    counter['rows'] += rows
+            self.latencies.append(seconds)
+
+    def record_batch(self, name: str, requests: int, rows: int):
+        with self.lock:
+            for counter in (self.totals, self.models[name]):
+                counter['batches'] += 1
+                counter['batched_requests'] += requests
+                counter['batched_rows'] += rows
+
+    def report(self) -> dict:
+        with self.lock:
+            uptime = time.perf_counter() - self.start
+            latencies = np.array(self.latencies) * 1000
+            report = {'uptime_seconds': uptime, 'requests': self.totals['requests'], 'rows': self.totals['rows'],
+                      'errors': self.totals['errors'], 'batches': self.totals['batches'],
+                      'requests_per_batch': self.totals['batched_requests'] / self.totals['batches'] if self.totals['batches'] else None,
+                      'rows_per_second': self.totals['rows'] / uptime if uptime > 0 else None,
+                      'requests_per_second': self.totals['requests'] / uptime if uptime > 0 else None,
+                      'latency_ms': None,
+                      'models': {name: {key: counter[key] for key in ('requests', 'rows', 'errors', 'batches')}
+                                 for name, counter in self.models.items()}}
+            if len(latencies):
+                report['latency_ms'] = {'mean': float(latencies.mean()), 'p50': float(np.percentile(latencies, 50)),
+                                        'p95': float(np.percentile(latencies, 95)),
+                                        'p99': float(np.percentile(latencies, 99)), 'max': float(latencies.max())}
+            return report
+
+
+class _Batcher(threading.Thread):
+    """Combines the queued requests for one model into single predict calls."""
+
+    def __init__(self, name: str, model: ServedModel, stats: _Stats, max_batch_rows: int, max_wait: float):
+        super().__init__(name='dittto-batcher-%s' % name, daemon=True)
+        self.model_name = name
+        self.model = model
+        self.stats = stats
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+
+    def submit(self, n_rows: int) -> Future:
+        future = Future()
+        self.queue.put((n_rows, future))
+        return future
+
+    def stop(self):
+        self.queue.put(None)
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                return
+
+            # Take every request already queued, and wait up to max_wait for more, until the batch is full
+            batch, rows = [item], item[0]
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch_rows:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.perf_counter(), 0)) if self.max_wait else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                rows += item[0]
+
+            self._predict(batch, rows)
+
+    def _predict(self, batch: list, rows: int):
+        try:
+            inputs = np.concatenate([self.model.inputs(n_rows) for n_rows, _ in batch])
+            outputs = self.model.model.predict(inputs)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.stats.record_batch(self.model_name, len(batch), rows)
+        start = 0
+        for n_rows, future in batch:
+            future.set_result(outputs[start:start + n_rows])
+            start += n_rows
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._route(url.path, query)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': 'Invalid JSON body.'})
+        if not isinstance(body, dict):
+            return self._send_json(400, {'error': 'Invalid JSON body.'})
+        self._route(url.path, body)
+
+    def _route(self, path: str, params: dict):
+        server = self.server.generation_server
+        if path == '/generate':
+            self._generate(server, params)
+        elif path == '/stats':
+            self._send_json(200, server.stats.report())
+        elif path == '/models':
+            self._send_json(200, {name: {'columns': model.columns, 'sampling': model.sampling}
+                                  for name, model in server.models.items()})
+        elif path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': 'Not found.'})
+
+    def _generate(self, server: 'GenerationServer', params: dict):
+        start = time.perf_counter()
+        name = params.get('model')
+        if name is None and len(server.models) == 1:
+            name = next(iter(server.models))
+        if name not in server.models:
+            server.stats.record_request(name, 0, time.perf_counter() - start, error=True)
+            return self._send_json(404, {'error': 'Unknown model: %s.' % name})
+
+        try:
+            n_rows = int(params.get('rows', 1))
+            if not 1 <= n_rows <= server.max_request_rows:
+                raise ValueError
+        except (TypeError, ValueError):
+            server.stats.record_request(name, 0, time.perf_counter() - start, error=True)
+            return self._send_json(400, {'error': 'Invalid number of rows.'})
+
+        try:
+            rows = server.batchers[name].submit(n_rows).result()
+        except Exception as e:
+            server.stats.record_request(name, 0, time.perf_counter() - start, error=True)
+            return self._send_json(500, {'error': str(e)})
+
+        model = server.models[name]
+        if model.transformer is not None:
+            # Mixed column types: let pandas format the rows mapped back to the original columns
+            frame = model.to_frame(rows)
+            if params.get('format') == 'csv':
+                self._send(200, frame.to_csv(index=False).encode(), 'text/csv')
+            else:
+                self._send_json(200, {'model': name, 'columns': model.columns,
+                                      'rows': frame.to_dict('split')['data']})
+        elif params.get('format') == 'csv':
+            lines = [','.join(model.columns)] + [','.join(map(repr, row)) for row in rows.tolist()]
+            self._send(200, ('\n'.join(lines) + '\n').encode(), 'text/csv')
+        else:
+            self._send_json(200, {'model': name, 'columns': model.columns, 'rows': rows.tolist()})
+        server.stats.record_request(name, n_rows, time.perf_counter() - start)
+
+    def _send_json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload).encode(), 'application/json')
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class GenerationServer:
+    """
+    A local HTTP server that keeps trained models in memory and serves synthetic rows on request.
+
+    Args:
+        models (dict): Maps model names to ServedModel instances or to paths of files written by ServedModel.save.
+        host (str, optional): Address to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): Port to listen on. 0 picks a free port. Defaults to 0.
+        max_batch_rows (int, optional): Maximum number of rows combined into one predict call. Defaults to 65536.
+        max_wait (float, optional): Seconds a batch waits for more requests before running. With 0, a batch takes the requests that queued up while the previous batch ran, adding no latency. Defaults to 0.
+        max_request_rows (int, optional): Maximum number of rows per request. Defaults to 1000000.
+
+    Use Case:
+        Endpoints: GET or POST /generate with 'model', 'rows' and optionally format=csv; GET /models; GET /stats with request, row and batch counters, throughput and latency percentiles; GET /health. Concurrent requests for the same model are combined into a single predict call.
+
+    Example:
+        with GenerationServer({'fraud': 'fraud.npz'}) as server:
+            response = urllib.request.urlopen(server.url + '/generate?model=fraud&rows=1000')
+    """
+
+    def __init__(self, models: dict, host: str = '127.0.0.1', port: int = 0, max_batch_rows: int = 65536,
+                 max_wait: float = 0.0, max_request_rows: int = 1000000):
+        if not models:
+            raise ValueError("No models to serve.")
+        if max_batch_rows < 1:
+            raise ValueError("Invalid maximum batch size.")
+        if max_wait < 0:
+            raise ValueError("Invalid maximum wait.")
+
+        self.models = {name: model if isinstance(model, ServedModel) else ServedModel.load(model)
+                       for name, model in models.items()}
+        self.max_request_rows = max_request_rows
+        self.stats = _Stats(self.models)
+        self.batchers = {name: _Batcher(name, model, self.stats, max_batch_rows, max_wait)
+                         for name, model in self.models.items()}
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.generation_server = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def _start_batchers(self):
+        for batcher in self.batchers.values():
+            if not batcher.is_alive():
+                batcher.start()
+
+    def start(self) -> 'GenerationServer':
+        """Serves requests on a background thread."""
+        self._start_batchers()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='dittto-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serves requests on the current thread until interrupted."""
+        self._start_batchers()
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stops serving and releases the port."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+        for batcher in self.batchers.values():
+            batcher.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None) -> int:
+    """Entry point of the `dittto-serve` console script."""
+    parser = argparse.ArgumentParser(prog='dittto-serve', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', action='append', required=True, metavar='NAME=PATH',
+                        help='A model file written by ServedModel.save. Can be given several times.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on.')
+    parser.add_argument('--max-batch-rows', type=int, default=65536, help='Maximum rows per predict call.')
+    parser.add_argument('--max-wait-ms', type=float, default=0.0, help='Milliseconds a batch waits for more requests.')
+    args = parser.parse_args(argv)
+
+    models = {}
+    for spec in args.model:
+        name, separator, path = spec.partition('=')
+        if not separator:
+            parser.error('--model must be NAME=PATH')
+        models[name] = path
+
+    server = GenerationServer(models, args.host, args.port, args.max_batch_rows, args.max_wait_ms / 1000)
+    print('Serving %s on %s' % (', '.join(server.models), server.url), flush=True)
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
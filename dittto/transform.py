@@ -0,0 +1,212 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+SCALINGS = ('minmax', 'standard')
+ENCODINGS = ('onehot', 'ordinal')
+
+
+class TabularTransformer:
+    """
+    Scales numeric columns and encodes categorical columns into a float32 array for training, and maps generated rows back.
+
+    Args:
+        scaling (str, optional): 'minmax' scales every numeric column to [0, 1], matching the default sigmoid decoder; 'standard' scales it to zero mean and unit variance. Defaults to 'minmax'.
+        encoding (str, optional): 'onehot' encodes every categorical column as one 0/1 feature per category, decoded by taking the largest one; 'ordinal' encodes it as a single scaled category code, decoded by rounding. Defaults to 'onehot'.
+        categorical_columns (list, optional): Numeric columns to encode as categories, such as integer codes. Columns that are not numeric, and boolean columns, are always categorical. Defaults to None.
+
+    Use Case:
+        Fit it once per dataset; afterwards transform and inverse_transform are a few vectorized NumPy passes per column. The fitted state is a small JSON-serializable config (see to_config and save), so generate_synthetic_data stores it with the model in the cache key, in checkpoints and in ServedModel files, and generated rows always come back with the original columns, categories and integer dtypes.
+
+    Example:
+        a. transformer = TabularTransformer('standard', 'onehot').fit(minority_df)
+           minority_data = transformer.transform(minority_df)
+           generated_df = transformer.inverse_transform(autoencoder.predict(minority_data))
+        b. synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data('balanced', original_df, transformer='minmax')
+    """
+
+    def __init__(self, scaling: str = 'minmax', encoding: str = 'onehot', categorical_columns: list = None):
+        if scaling not in SCALINGS:
+            raise ValueError("Invalid scaling.")
+        if encoding not in ENCODINGS:
+            raise ValueError("Invalid encoding.")
+
+        self.scaling = scaling
+        self.encoding = encoding
+        self.categorical_columns = list(categorical_columns) if categorical_columns is not None else []
+        self.columns = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.columns is not None
+
+    @property
+    def n_features(self) -> int:
+        """Number of columns of the transformed array."""
+        self._check_fitted()
+        return int(self._positions[-1])
+
+    def fit(self, df: pd.DataFrame) -> 'TabularTransformer':
+        """Learns the scaling of every numeric column and the categories of every categorical column of `df`."""
+        df = _as_frame(df)
+        if df.empty:
+            raise ValueError("Empty dataframe.")
+        missing = [column for column in self.categorical_columns if column not in df.columns]
+        if missing:
+            raise ValueError("Categorical columns not found in the dataset: %s." % ', '.join(map(str, missing)))
+
+        columns, dtypes, categories, offsets, scales = list(df.columns), [], [], [], []
+        for column in columns:
+            series = df[column]
+            dtypes.append(str(series.dtype))
+            if _is_categorical(series) or column in self.categorical_columns:
+                uniques = pd.factorize(series, use_na_sentinel=False)[1]
+                categories.append(pd.Index(uniques).tolist())
+                values = np.arange(len(uniques), dtype=np.float64)
+                if self.encoding == 'onehot':
+                    offsets.append(0.0)
+                    scales.append(1.0)
+                    continue
+            else:
+                categories.append(None)
+                values = series.to_numpy(dtype=np.float64)
+
+            if self.scaling == 'minmax':
+                offset, scale = np.nanmin(values), np.nanmax(values) - np.nanmin(values)
+            else:
+                offset, scale = np.nanmean(values), np.nanstd(values)
+            offsets.append(float(offset))
+            scales.append(float(scale) if scale > 0 else 1.0)
+
+        self._set_state(columns, dtypes, categories, offsets, scales)
+        return self
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Returns the rows of `df` as a C-contiguous float32 array with n_features columns."""
+        self._check_fitted()
+        df = _as_frame(df, self.columns)
+        missing = [column for column in self.columns if column not in df.columns]
+        if missing:
+            raise ValueError("Columns not found in the dataset: %s." % ', '.join(map(str, missing)))
+
+        data = np.empty((len(df), self.n_features), dtype=np.float32)
+        for j, column in enumerate(self.columns):
+            start, stop = self._positions[j], self._positions[j + 1]
+            if self._categories[j] is None:
+                try:
+                    data[:, start] = (df[column].to_numpy(dtype=np.float64) - self._offsets[j]) / self._scales[j]
+                except (TypeError, ValueError):
+                    raise ValueError("Column %r is not numeric." % column)
+                continue
+
+            codes = self._categories[j].get_indexer(df[column])
+            if (codes < 0).any():
+                raise ValueError("Column %r has categories the transformer was not fitted on." % column)
+            if self.encoding == 'onehot':
+                block = data[:, start:stop]
+                block[:] = 0
+                block[np.arange(len(codes)), codes] = 1
+            else:
+                data[:, start] = (codes - self._offsets[j]) / self._scales[j]
+
+        return data
+
+    def fit_transform(self, df: pd.DataFrame) -> np.ndarray:
+        return self.fit(df).transform(df)
+
+    def inverse_transform(self, data: np.ndarray) -> pd.DataFrame:
+        """Maps transformed (or generated) float rows back to a DataFrame with the original columns and dtypes."""
+        self._check_fitted()
+        data = np.asarray(data, dtype=np.float32).reshape(len(data), -1)
+        if data.shape[1] != self.n_features:
+            raise ValueError("Invalid number of features.")
+
+        columns = {}
+        for j, column in enumerate(self.columns):
+            start, stop = self._positions[j], self._positions[j + 1]
+            if self._categories[j] is None:
+                values = data[:, start] * np.float64(self._scales[j]) + self._offsets[j]
+                dtype = np.dtype(self._dtypes[j])
+                if dtype.kind in 'iu':
+                    info = np.iinfo(dtype)
+                    values = np.clip(np.rint(values), info.min, info.max)
+                columns[column] = values.astype(dtype)
+                continue
+
+            if self.encoding == 'onehot':
+                codes = data[:, start:stop].argmax(axis=1)
+            else:
+                codes = np.rint(data[:, start] * self._scales[j] + self._offsets[j])
+                codes = np.clip(codes, 0, len(self._categories[j]) - 1).astype(np.int64)
+            values = pd.Series(self._categories[j].to_numpy().take(codes), copy=False)
+            columns[column] = values.astype(self._dtypes[j]) if self._dtypes[j] != 'object' else values
+
+        return pd.DataFrame(columns, columns=self.columns)
+
+    def to_config(self) -> dict:
+        """Returns the settings and the fitted state as a JSON-serializable dict."""
+        self._check_fitted()
+        return {'scaling': self.scaling, 'encoding': self.encoding,
+                'categorical_columns': _json_values(self.categorical_columns), 'columns': _json_values(self.columns),
+                'dtypes': self._dtypes,
+                'categories': [_json_values(categories.tolist()) if categories is not None else None
+                               for categories in self._categories],
+                'offsets': self._offsets, 'scales': self._scales}
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'TabularTransformer':
+        """Rebuilds a fitted transformer from the dict returned by to_config."""
+        return cls(config['scaling'], config['encoding'])._load_config(config)
+
+    def save(self, path: str):
+        """Writes the fitted transformer to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_config(), f)
+
+    @classmethod
+    def load(cls, path: str) -> 'TabularTransformer':
+        """Loads a transformer written by TabularTransformer.save."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_config(json.load(f))
+
+    def _load_config(self, config: dict) -> 'TabularTransformer':
+        """Takes the settings and the fitted state from a dict returned by to_config."""
+        self.scaling, self.encoding = config['scaling'], config['encoding']
+        self.categorical_columns = list(config['categorical_columns'])
+        self._set_state(config['columns'], config['dtypes'], config['categories'], config['offsets'], config['scales'])
+        return self
+
+    def _set_state(self, columns: list, dtypes: list, categories: list, offsets: list, scales: list):
+        self.columns = list(columns)
+        self._dtypes = list(dtypes)
+        self._categories = [pd.Index(values, dtype=object) if values is not None else None for values in categories]
+        self._offsets = [float(offset) for offset in offsets]
+        self._scales = [float(scale) for scale in scales]
+        widths = [len(values) if values is not None and self.encoding == 'onehot' else 1
+                  for values in self._categories]
+        self._positions = np.concatenate([[0], np.cumsum(widths)]).astype(np.int64)
+
+    def _check_fitted(self):
+        if not self.fitted:
+            raise ValueError("Transformer is not fitted.")
+
+    def __repr__(self):
+        return 'TabularTransformer(scaling=%r, encoding=%r)' % (self.scaling, self.encoding)
+
+
+def _as_frame(df, columns: list = None) -> pd.DataFrame:
+    """Wraps a 2D array in a DataFrame, with the fitted column names when given."""
+    if isinstance(df, pd.DataFrame):
+        return df
+    data = np.asarray(df)
+    return pd.DataFrame(data.reshape(len(data), -1), columns=columns)
+
+
+def _is_categorical(series: pd.Series) -> bool:
+    return not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)
+
+
+def _json_values(values: list) -> list:
+    """Converts NumPy scalars to Python values so the list can be written as JSON."""
+    return [value.item() if isinstance(value, np.generic) else value for value in values]
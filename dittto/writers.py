@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+
+
+def file_format(path: str) -> str:
+    """Returns 'csv' or 'parquet' based on the extension of `path`."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    raise ValueError("Unsupported file format: %s." % path)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Reading and writing Parquet files requires pyarrow. Install it with `pip install pyarrow`.")
+    return pyarrow
+
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to a single CSV or Parquet file, so the full table is never held in memory.
+
+    Args:
+        path (str): A .csv or .parquet file. An existing file is overwritten. Parquet chunks are cast to the schema of the first chunk.
+
+    Example:
+        with ChunkWriter('synthetic.parquet') as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = file_format(path)
+        self.rows = 0
+        self._parquet_writer = None
+        self._pyarrow = _import_pyarrow() if self.format == 'parquet' else None
+
+    def write(self, chunk: pd.DataFrame):
+        """Appends `chunk` to the file."""
+        if self.format == 'csv':
+            chunk.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        else:
+            table = self._pyarrow.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = self._pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            elif not table.schema.equals(self._parquet_writer.schema):
+                # e.g. float32 synthetic rows appended to float64 original rows
+                table = table.cast(self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+        self.rows += len(chunk)
+
+    def close(self):
+        """Flushes and closes the file."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -17,6 +17,8 @@ setup(
     long_description=LONG_DESCRIPTION,
     packages=find_packages(),
     install_requires=['pandas', 'numpy', 'tensorflow'],
+    extras_require={'parquet': ['pyarrow']},
+    entry_points={'console_scripts': ['dittto = dittto.cli:main', 'dittto-serve = dittto.server:main']},
     keywords=['python', 'synthetic data', 'synthetic data generation', 'tabular data', ' csv',],
     classifiers=[
         "Development Status :: 4 - Beta",
@@ -1,6 +1,12 @@
+import json
+import os
+import subprocess
+import sys
 import unittest
 from autoencoder import generate_model, generate_synthetic_data 
+from dittto.autoencoder import _iter_generated_batches, fit_model
 from tensorflow import keras
+import numpy as np
 import pandas as pd
 
 class TestAutoencoder(unittest.TestCase):
@@ -137,6 +143,101 @@ class TestAutoencoder(unittest.TestCase):
                                     minority_class_column='class', minority_class_label='0',
                                     decoder_activation='sigmoid')        
 
+    def test_autoencoder_synthetic_data_generator_exact_rows(self):
+        test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,1,1,1,0,1,1,1,1]})
+        synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data('single_encoder', test_df,
+                                minority_class_column='class', minority_class_label='0',
+                                decoder_activation='sigmoid', epochs=1, random_state=0)
+
+        self.assertEqual(len(generated_data), len(majority_df))
+        self.assertEqual(len(synthetic_df), len(minority_df) + len(generated_data) + len(majority_df))
+        self.assertEqual(generated_data.drop(columns=['class']).drop_duplicates().shape[0], len(generated_data))
+
+    def test_generated_batches_passes(self):
+        source = np.arange(12, dtype=np.float32).reshape(4, 3)
+        identity = lambda batch: batch
+
+        batches = list(_iter_generated_batches(identity, source, 10, batch_size=3, noise=0))
+        generated = np.concatenate(batches)
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 3, 1])
+        self.assertTrue(np.array_equal(generated, source[np.arange(10) % 4]))
+
+        generated = np.concatenate(list(_iter_generated_batches(identity, source, 10, noise=0.1, random_state=0)))
+        self.assertEqual(generated.dtype, np.float32)
+        self.assertTrue(np.array_equal(generated[:4], source))
+        self.assertFalse(np.isclose(generated[4:8], source).all(axis=1).any())
+
+        generated = np.concatenate(list(_iter_generated_batches(identity, source, 50, noise=0, resample=True, random_state=0)))
+        self.assertTrue(np.array_equal(generated[:4], source))
+        self.assertFalse(np.array_equal(generated[4:8], source))
+
+    def test_generated_batches_without_spread(self):
+        source = np.array([[0.5, 0.0, 3.0]], dtype=np.float32)
+        generated = np.concatenate(list(_iter_generated_batches(lambda batch: batch, source, 5, noise=0.1,
+                                                                random_state=0)))
+        self.assertTrue(np.array_equal(generated[:1], source))
+        self.assertEqual(len(np.unique(generated, axis=0)), 5)
+        self.assertTrue((generated[1:] != source).all())
+
+    def test_synthetic_data_generator_single_minority_row(self):
+        test_df = pd.DataFrame({'a': np.linspace(0, 1, 10), 'b': np.linspace(1, 0, 10), 'class': [0] + [1] * 9})
+        _, generated_data, _, _ = generate_synthetic_data('single_encoder', test_df, epochs=1, random_state=0)
+
+        self.assertEqual(len(generated_data), 9)
+        self.assertEqual(generated_data.drop(columns=['class']).drop_duplicates().shape[0], 9)
+
+    def test_fit_model_early_stopping(self):
+        data = np.random.default_rng(0).random((40, 4), dtype=np.float32)
+        autoencoder, _, _ = generate_model(4)
+        history = fit_model(autoencoder, data, epochs=50, batch_size=8, patience=2, min_delta=1.0)
+
+        self.assertEqual(len(history.history['loss']), 3)
+        self.assertIn('val_loss', history.history)
+
+    def test_fit_model_without_validation(self):
+        data = pd.DataFrame(np.random.default_rng(0).random((5, 4)))
+        autoencoder, _, _ = generate_model(4)
+        history = fit_model(autoencoder, data, epochs=4, batch_size=2, validation_split=0, patience=None)
+
+        self.assertEqual(len(history.history['loss']), 4)
+        self.assertNotIn('val_loss', history.history)
+
+    def test_fit_model_invalid_arguments(self):
+        autoencoder, _, _ = generate_model(4)
+        data = np.zeros((8, 4), dtype=np.float32)
+        self.assertRaises(ValueError, fit_model, autoencoder, data, batch_size=0)
+        self.assertRaises(ValueError, fit_model, autoencoder, data, validation_split=1)
+        self.assertRaises(ValueError, fit_model, autoencoder, data, steps_per_execution=0)
+
+    def test_fit_model_compiled(self):
+        data = np.random.default_rng(0).random((64, 4), dtype=np.float32)
+        autoencoder, _, _ = generate_model(4)
+        history = fit_model(autoencoder, data, epochs=3, batch_size=8, patience=None, jit_compile=True,
+                            steps_per_execution=4)
+
+        self.assertEqual(len(history.history['loss']), 3)
+        self.assertTrue(autoencoder.jit_compile)
+        self.assertEqual(autoencoder.predict(data, verbose=0).shape, (64, 4))
+
+    def test_synthetic_data_generator_compiled(self):
+        test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+        for sampling in ('reconstruct', 'gaussian'):
+            _, generated_data, _, _ = generate_synthetic_data('single_encoder', test_df, epochs=2, jit_compile=True,
+                                                              steps_per_execution=2, sampling=sampling)
+            self.assertEqual(generated_data.shape, (6, 3))
+        self.assertRaises(ValueError, generate_synthetic_data, 'single_encoder', test_df, steps_per_execution=0)
+
+    def test_synthetic_data_generator_threads(self):
+        code = ("import json, pandas as pd, tensorflow as tf\n"
+                "from dittto.autoencoder import generate_synthetic_data\n"
+                "df = pd.DataFrame({'a': range(10), 'b': range(10), 'class': [0, 1] * 5})\n"
+                "generate_synthetic_data('single_encoder', df, epochs=1, intra_op_threads=2, inter_op_threads=1)\n"
+                "print(json.dumps([tf.config.threading.get_intra_op_parallelism_threads(),"
+                " tf.config.threading.get_inter_op_parallelism_threads()]))")
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.join(os.path.dirname(__file__), '..'),
+                                         stderr=subprocess.DEVNULL)
+        self.assertEqual(json.loads(output.decode().strip().splitlines()[-1]), [2, 1])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
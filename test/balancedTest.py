@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+import context
+from dittto.cache import ModelCache
+from dittto.balanced import BalancedView
+from dittto.transform import TabularTransformer
+from autoencoder import generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+class TestBalancedView(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.minority_df = pd.DataFrame(rng.random((20, 3)), columns=list('abc'))
+        self.generated_data = pd.DataFrame(rng.random((40, 3), dtype=np.float32), columns=list('abc'))
+        self.generated_data['class'] = 0
+        self.majority_df = pd.DataFrame(rng.random((60, 3)), columns=list('abc'))
+        self.majority_df['class'] = rng.integers(1, 3, 60)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def expected_frame(self, random_state):
+        frame = pd.concat([self.minority_df.assign(**{'class': 0}), self.generated_data, self.majority_df],
+                          ignore_index=True)
+        return frame.sample(frac=1, random_state=random_state).reset_index(drop=True)
+
+    def test_batches(self):
+        view = BalancedView(self.minority_df, self.generated_data, self.majority_df, 'class', 0, random_state=3,
+                            batch_size=32)
+        self.assertEqual(len(view), 120)
+        self.assertEqual(view.permutation.dtype, np.int32)
+
+        batches = list(view)
+        self.assertEqual([len(features) for features, _ in batches], [32, 32, 32, 24])
+        features = np.concatenate([features for features, _ in batches])
+        labels = np.concatenate([labels for _, labels in batches])
+
+        expected = self.expected_frame(3)
+        np.testing.assert_allclose(features, expected[list('abc')].to_numpy(dtype=np.float32))
+        np.testing.assert_array_equal(labels, expected['class'].to_numpy())
+        self.assertEqual(features.dtype, np.float32)
+
+    def test_to_frame(self):
+        view = BalancedView(self.minority_df, self.generated_data, self.majority_df, 'class', 0, random_state=5)
+        expected = self.expected_frame(5)
+        pd.testing.assert_frame_equal(view.to_frame(), expected, check_dtype=False)
+        pd.testing.assert_frame_equal(view.to_frame(10, 25), expected[10:25].reset_index(drop=True),
+                                      check_dtype=False)
+        self.assertEqual(len(view.to_frame(200)), 0)
+
+    def test_string_labels_and_transformer(self):
+        self.majority_df['city'] = 'oslo'
+        self.minority_df['city'] = 'paris'
+        self.generated_data.insert(3, 'city', 'paris')
+        self.majority_df['class'] = 'common'
+        transformer = TabularTransformer().fit(pd.concat([self.minority_df, self.majority_df[list('abc') + ['city']]]))
+
+        view = BalancedView(self.minority_df, self.generated_data, self.majority_df, 'class', 'rare',
+                            transformer=transformer)
+        features, labels = view.batch(0, 120)
+        self.assertEqual(features.shape, (120, 5))
+        self.assertEqual(labels.dtype, object)
+        self.assertEqual(sorted(pd.Series(labels).value_counts().to_dict().items()), [('common', 60), ('rare', 60)])
+        with self.assertRaises(ValueError):
+            view.as_dataset()
+
+    def test_keras_and_tf_data(self):
+        view = BalancedView(self.minority_df, self.generated_data, self.majority_df, 'class', 0, random_state=0)
+        sequence = view.as_sequence(batch_size=50)
+        self.assertEqual(len(sequence), 3)
+        features, labels = sequence[2]
+        self.assertEqual((features.shape, labels.shape), ((20, 3), (20,)))
+
+        batches = list(view.as_dataset(batch_size=50).as_numpy_iterator())
+        self.assertEqual([len(labels) for _, labels in batches], [50, 50, 20])
+        np.testing.assert_array_equal(batches[0][0], view.batch(0, 50)[0])
+
+    def test_synthetic_data_generator_lazy(self):
+        test_df = self.majority_df.copy()
+        test_df.loc[:19, 'class'] = 0
+        cache = ModelCache(self.tmp_dir.name)
+        view, generated_data, minority_df, majority_df = generate_synthetic_data('single_encoder', test_df, epochs=2,
+                                                                                 lazy=True, random_state=0, cache=cache)
+        self.assertIsInstance(view, BalancedView)
+        self.assertEqual(len(view), len(minority_df) + len(generated_data) + len(majority_df))
+
+        frame = view.to_frame()
+        expected = pd.concat([minority_df.assign(**{'class': 0}), generated_data, majority_df], ignore_index=True)
+        expected = expected.sample(frac=1, random_state=0).reset_index(drop=True)
+        pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+
+        # The eager run loads the lazy run's model from the cache, so both generate the same rows
+        synthetic_df, _, _, _ = generate_synthetic_data('single_encoder', test_df, epochs=2, random_state=0, cache=cache)
+        self.assertFalse(synthetic_df['class'].isna().any())
+        pd.testing.assert_frame_equal(frame, synthetic_df, check_dtype=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+import context
+from dittto.cache import ModelCache, fingerprint_data
+from autoencoder import generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+def _save_bytes(size):
+    def save(path):
+        with open(path, 'wb') as f:
+            f.write(b'0' * size)
+    return save
+
+class TestModelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_fingerprint_content(self):
+        data = np.arange(20, dtype=np.float32).reshape(10, 2)
+        changed = data.copy()
+        changed[5, 1] += 1
+
+        self.assertEqual(fingerprint_data(data), fingerprint_data(data.copy()))
+        self.assertNotEqual(fingerprint_data(data), fingerprint_data(changed))
+        self.assertNotEqual(fingerprint_data(data), fingerprint_data(data.reshape(5, 4)))
+
+    def test_fingerprint_sampled(self):
+        data = np.arange(2000, dtype=np.float32).reshape(1000, 2)
+        changed = data.copy()
+        changed[-1, 0] += 1
+
+        self.assertEqual(fingerprint_data(data, sample_rows=10), fingerprint_data(data.copy(), sample_rows=10))
+        self.assertNotEqual(fingerprint_data(data, sample_rows=10), fingerprint_data(changed, sample_rows=10))
+
+    def test_key_depends_on_parameters(self):
+        cache = ModelCache(self.cache_dir)
+        data = np.ones((4, 2), dtype=np.float32)
+
+        self.assertEqual(cache.key(data, epochs=10, layers=[20]), cache.key(data, layers=[20], epochs=10))
+        self.assertNotEqual(cache.key(data, epochs=10, layers=[20]), cache.key(data, epochs=11, layers=[20]))
+
+    def test_hit_and_miss_statistics(self):
+        cache = ModelCache(self.cache_dir)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', _save_bytes(10))
+        self.assertEqual(cache.get('a'), cache.path('a'))
+        self.assertEqual(cache.stats, {'hits': 1, 'misses': 1, 'evictions': 0})
+
+    def test_lru_eviction_by_entries(self):
+        cache = ModelCache(self.cache_dir, max_entries=2)
+        cache.put('a', _save_bytes(10))
+        cache.put('b', _save_bytes(10))
+        cache.get('a')
+        cache.put('c', _save_bytes(10))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertFalse(os.path.exists(cache.path('b')))
+        self.assertEqual(cache.stats['evictions'], 1)
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ModelCache(self.cache_dir, max_entries=None, max_bytes=25)
+        cache.put('a', _save_bytes(10))
+        cache.put('b', _save_bytes(10))
+        cache.put('c', _save_bytes(10))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('a'))
+
+        # An entry larger than the limit is kept, and evicted by the next one
+        path = cache.put('d', _save_bytes(30))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(cache.get('d'), path)
+        self.assertEqual(len(cache), 1)
+        cache.put('e', _save_bytes(10))
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(len(cache), 1)
+
+    def test_concurrent_puts_keep_every_entry(self):
+        def put_entries(worker):
+            cache = ModelCache(self.cache_dir, max_entries=None)
+            for i in range(10):
+                cache.put('%d-%d' % (worker, i), _save_bytes(10))
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(put_entries, range(8)))
+
+        self.assertEqual(len(ModelCache(self.cache_dir)), 80)
+
+    def test_invalid_limits(self):
+        self.assertRaises(ValueError, ModelCache, self.cache_dir, max_entries=0)
+        self.assertRaises(ValueError, ModelCache, self.cache_dir, max_bytes=0)
+
+    def test_synthetic_data_generator_cache(self):
+        test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+        cache = ModelCache(self.cache_dir)
+
+        for _ in range(2):
+            _, generated_data, _, majority_df = generate_synthetic_data('single_encoder', test_df.copy(),
+                                    minority_class_column='class', minority_class_label='0', epochs=2, cache=cache)
+            self.assertEqual(len(generated_data), len(majority_df))
+
+        self.assertEqual(cache.stats['misses'], 1)
+        self.assertEqual(cache.stats['hits'], 1)
+
+        generate_synthetic_data('balanced', test_df.copy(), minority_class_column='class', minority_class_label='0',
+                                epochs=2, cache=cache)
+        self.assertEqual(cache.stats['misses'], 2)
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
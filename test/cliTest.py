@@ -0,0 +1,99 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import context
+from dittto.cli import _WARM_MODELS, main, output_path_for, rebalance_file
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.test_df = pd.DataFrame({'a': range(30), 'b': range(30, 60), 'class': [0, 1, 1] * 10})
+        self.test_df[:15].to_csv(os.path.join(self.tmp_dir.name, 'part-1.csv'), index=False)
+        self.test_df[15:].to_csv(os.path.join(self.tmp_dir.name, 'part-2.csv'), index=False)
+        self.pattern = os.path.join(self.tmp_dir.name, 'part-*.csv')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_output_path_for(self):
+        self.assertEqual(output_path_for(os.path.join('data', 'a.csv')), os.path.join('data', 'a_synthetic.csv'))
+        self.assertEqual(output_path_for('a.csv', 'out', 'parquet'), os.path.join('out', 'a_synthetic.parquet'))
+
+    def test_rebalance_file(self):
+        input_path = os.path.join(self.tmp_dir.name, 'part-1.csv')
+        output_path = os.path.join(self.tmp_dir.name, 'out.csv')
+        summary = rebalance_file(input_path, output_path, epochs=1, chunk_size=4)
+        written = pd.read_csv(output_path)
+
+        self.assertEqual((summary['minority_rows'], summary['majority_rows'], summary['generated_rows']), (5, 10, 5))
+        self.assertEqual(written.shape, (20, 3))
+        self.assertEqual(written['class'].value_counts().to_dict(), {0: 10, 1: 10})
+        pd.testing.assert_frame_equal(written[:15], self.test_df[:15], check_dtype=False)
+
+        # The warm model of the first file is reused, and a ratio the file already meets generates nothing
+        n_models = len(_WARM_MODELS)
+        summary = rebalance_file(input_path, output_path, epochs=1, ratio=0.5, synthetic_only=True)
+        self.assertEqual(summary['generated_rows'], 0)
+        summary = rebalance_file(input_path, output_path, epochs=1, ratio=2, synthetic_only=True)
+        self.assertEqual(summary['generated_rows'], 15)
+        self.assertEqual(len(_WARM_MODELS), n_models)
+        self.assertRaises(ValueError, rebalance_file, input_path, output_path, ratio=0)
+
+    def test_main(self):
+        summary_path = os.path.join(self.tmp_dir.name, 'summary.json')
+        output_dir = os.path.join(self.tmp_dir.name, 'out')
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = main([self.pattern, '--epochs', '1', '--jobs', '1', '--output-dir', output_dir,
+                           '--summary', summary_path])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(os.listdir(output_dir)), ['part-1_synthetic.csv', 'part-2_synthetic.csv'])
+        with open(summary_path) as f:
+            summaries = json.load(f)
+        self.assertEqual([summary['generated_rows'] for summary in summaries], [5, 5])
+        self.assertIn('2 files, 10 rows generated', stdout.getvalue())
+
+    def test_main_failure(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            status = main([self.pattern, '--epochs', '1', '--jobs', '1', '--label', 'missing'])
+        self.assertEqual(status, 1)
+        self.assertIn('Minority class label not found', stderr.getvalue())
+
+    def test_in_process_threads(self):
+        code = ("import tensorflow as tf\n"
+                "from dittto.cli import main\n"
+                "main([%r, '--epochs', '1', '--jobs', '1', '--tf-threads', '2', '--output-dir', %r])\n"
+                "print(tf.config.threading.get_intra_op_parallelism_threads())"
+                % (self.pattern, os.path.join(self.tmp_dir.name, 'out')))
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
+        self.assertEqual(output.decode().strip().splitlines()[-1], '2')
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_worker_pool(self):
+        output_dir = os.path.join(self.tmp_dir.name, 'out')
+        output = subprocess.check_output([sys.executable, '-m', 'dittto', self.pattern, '--epochs', '1', '--jobs', '2',
+                                          '--tf-threads', '1', '--output-dir', output_dir, '--output-format', 'parquet'],
+                                         cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
+
+        self.assertIn('2 files, 10 rows generated', output.decode())
+        written = pd.read_parquet(os.path.join(output_dir, 'part-2_synthetic.parquet'))
+        self.assertEqual(written.shape, (20, 3))
+
+if __name__ == '__main__':
+    unittest.main()
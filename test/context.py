@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the in-tree package importable when the tests are run from this directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
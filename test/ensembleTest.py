@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+import context
+from dittto.autoencoder import fit_model
+from dittto.cache import ModelCache
+from dittto.ensemble import ensemble_members, generate_ensemble_model, member_selector
+from autoencoder import generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+class TestEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(0).random((60, 6), dtype=np.float32)
+        self.test_df = pd.DataFrame(self.data, columns=list('abcdef'))
+        self.test_df['class'] = [0, 1, 1] * 20
+
+    def test_generate_ensemble_model(self):
+        autoencoder, encoder, decoder = generate_ensemble_model(6, n_members=3, encoder_dense_layers=[8],
+                                                                bottle_neck=4, decoder_dense_layers=[8])
+        self.assertEqual(encoder.predict(self.data, verbose=0).shape, (60, 3, 4))
+        self.assertEqual(autoencoder.predict(self.data, verbose=0).shape, (60, 3, 6))
+
+        members = ensemble_members(autoencoder)
+        self.assertEqual(len(members), 3)
+        self.assertFalse(np.allclose(members[0].kernels[0], members[1].kernels[0]))
+
+        expected = autoencoder.predict(self.data, verbose=0)
+        for member, model in enumerate(members):
+            np.testing.assert_allclose(model.predict(self.data), expected[:, member], rtol=1e-5, atol=1e-5)
+        for member, model in enumerate(ensemble_members(decoder)):
+            codes = encoder.predict(self.data, verbose=0)[:, member]
+            np.testing.assert_allclose(model.predict(codes), expected[:, member], rtol=1e-5, atol=1e-5)
+
+        with self.assertRaises(ValueError):
+            generate_ensemble_model(6, n_members=0)
+
+    def test_fit_ensemble(self):
+        autoencoder, _, _ = generate_ensemble_model(6, n_members=4, bottle_neck=4)
+        history = fit_model(autoencoder, self.data, epochs=5, batch_size=8, patience=None)
+        self.assertLess(history.history['loss'][-1], history.history['loss'][0])
+
+    def test_member_selector(self):
+        select = member_selector(3)
+        np.testing.assert_array_equal(select(4), [0, 1, 2, 0])
+        np.testing.assert_array_equal(select(4), [1, 2, 0, 1])
+
+        members = member_selector(3, 'random', random_state=0)(1000)
+        self.assertEqual(set(members), {0, 1, 2})
+
+        with self.assertRaises(ValueError):
+            member_selector(3, 'unknown')
+
+    def test_synthetic_data_generator_ensemble(self):
+        for sampling in ('reconstruct', 'gmm'):
+            for member_selection in ('round_robin', 'random'):
+                synthetic_df, generated_data, _, _ = generate_synthetic_data(
+                    'single_encoder', self.test_df, epochs=2, n_members=3, member_selection=member_selection,
+                    sampling=sampling, random_state=0)
+                self.assertEqual(len(generated_data), 40)
+                self.assertEqual(len(synthetic_df), 100)
+                self.assertFalse(generated_data[list('abcdef')].isna().any().any())
+
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('single_encoder', self.test_df, n_members=0)
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('single_encoder', self.test_df, n_members=2, member_selection='unknown')
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('auto', self.test_df, n_members=2)
+
+    def test_members_generate_different_rows(self):
+        _, generated_data, _, _ = generate_synthetic_data('single_encoder', self.test_df, epochs=2,
+                                                          n_members=3, noise=0, random_state=0)
+        # Round robin: the first pass reconstructs minority row i with member i % 3, the second with member (i + 2) % 3
+        first, second = generated_data.iloc[:20, :6].to_numpy(), generated_data.iloc[20:, :6].to_numpy()
+        self.assertFalse(np.allclose(first, second))
+
+    def test_ensemble_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ModelCache(cache_dir)
+            _, first, _, _ = generate_synthetic_data('single_encoder', self.test_df, epochs=2, n_members=2,
+                                                     cache=cache, random_state=0)
+            _, second, _, _ = generate_synthetic_data('single_encoder', self.test_df, epochs=2, n_members=2,
+                                                      cache=cache, random_state=0)
+            generate_synthetic_data('single_encoder', self.test_df, epochs=2, cache=cache)
+
+        self.assertEqual(cache.stats['hits'], 1)
+        self.assertEqual(cache.stats['misses'], 2)
+        pd.testing.assert_frame_equal(first, second)
+
+if __name__ == '__main__':
+    unittest.main()
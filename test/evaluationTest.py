@@ -0,0 +1,97 @@
+import unittest
+import context
+from dittto.evaluation import (column_distances, correlation_matrix, distance_to_closest_record, mmd,
+                               nearest_distances, quality_report)
+import numpy as np
+import pandas as pd
+
+def brute_force_distances(a, b):
+    values = np.sort(np.concatenate([a, b]))
+    cdf_a = np.searchsorted(np.sort(a), values, side='right') / len(a)
+    cdf_b = np.searchsorted(np.sort(b), values, side='right') / len(b)
+    difference = np.abs(cdf_a - cdf_b)
+    return difference.max(), np.sum(difference[:-1] * np.diff(values))
+
+class TestEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.real = rng.normal(size=(3000, 4)).astype(np.float32)
+        self.real[:, 1] += self.real[:, 0]
+        self.synthetic = rng.normal(size=(2000, 4)).astype(np.float32)
+        self.synthetic[:, 1] += self.synthetic[:, 0]
+
+    def test_column_distances(self):
+        rng = np.random.default_rng(1)
+        real = np.round(rng.normal(size=(300, 3)), 1).astype(np.float32)
+        synthetic = np.round(rng.normal(0.2, 1.0, size=(200, 3)), 1).astype(np.float32)
+
+        ks, wasserstein = column_distances(real, synthetic)
+        for j in range(3):
+            expected_ks, expected_wasserstein = brute_force_distances(real[:, j], synthetic[:, j])
+            self.assertAlmostEqual(ks[j], expected_ks)
+            self.assertAlmostEqual(wasserstein[j], expected_wasserstein, places=5)
+
+        ks, wasserstein = column_distances(real, real)
+        np.testing.assert_allclose(ks, 0, atol=1e-12)
+        np.testing.assert_allclose(wasserstein, 0, atol=1e-12)
+
+    def test_correlation_matrix(self):
+        np.testing.assert_allclose(correlation_matrix(self.real, chunk_size=128),
+                                   np.corrcoef(self.real, rowvar=False), atol=1e-6)
+
+        constant = np.concatenate([self.real[:, :2], np.ones((len(self.real), 1), dtype=np.float32)], axis=1)
+        self.assertEqual(correlation_matrix(constant)[0, 2], 0)
+
+    def test_mmd(self):
+        same = mmd(self.real[:1000], self.synthetic[:1000], chunk_size=256)
+        shifted = mmd(self.real[:1000], self.synthetic[:1000] + 1, chunk_size=256)
+        self.assertLess(abs(same['mmd2']), 0.01)
+        self.assertGreater(shifted['mmd2'], 10 * abs(same['mmd2']))
+        self.assertGreater(same['bandwidth'], 0)
+
+    def test_nearest_distances(self):
+        queries, references = self.synthetic[:300], self.real[:500]
+        expected = np.sqrt(((queries[:, None] - references[None]) ** 2).sum(axis=2)).min(axis=1)
+        np.testing.assert_allclose(nearest_distances(queries, references, chunk_size=64), expected,
+                                   rtol=1e-4, atol=1e-3)
+
+    def test_distance_to_closest_record(self):
+        rng = np.random.default_rng(0)
+        fresh = distance_to_closest_record(self.real, self.synthetic, n_rows=1000, rng=rng)
+        copies = distance_to_closest_record(self.real, self.real[:1000] + 1e-3, n_rows=500, rng=rng)
+        self.assertGreater(fresh['ratio'], 0.7)
+        self.assertLess(copies['ratio'], 0.5)
+
+    def test_quality_report(self):
+        columns = list('abcd')
+        real = pd.DataFrame(self.real, columns=columns)
+        synthetic = pd.DataFrame(self.synthetic, columns=columns)
+        synthetic['class'] = 1
+
+        report = quality_report(real, synthetic, sample_rows=1000, mmd_rows=500, dcr_rows=500, random_state=0)
+        self.assertEqual(report['rows'], {'real': 3000, 'synthetic': 2000})
+        self.assertEqual(list(report['columns']), columns)
+        self.assertLess(report['ks_max'], 0.1)
+        self.assertLess(report['correlation']['max_abs_diff'], 0.1)
+        self.assertEqual(report['exact_copies'], 0)
+        self.assertGreater(report['dcr']['ratio'], 0.7)
+        self.assertEqual(report, dict(quality_report(real, synthetic, sample_rows=1000, mmd_rows=500, dcr_rows=500,
+                                                     random_state=0), seconds=report['seconds']))
+
+        shifted = quality_report(self.real, self.synthetic * 2 + 1, mmd_rows=500, dcr_rows=500, random_state=0)
+        self.assertGreater(shifted['ks_mean'], 0.3)
+        self.assertGreater(shifted['wasserstein_scaled_mean'], 0.5)
+        self.assertGreater(shifted['mmd']['mmd2'], report['mmd']['mmd2'])
+
+        copied = quality_report(self.real, self.real[::2], mmd_rows=500, dcr_rows=500, random_state=0)
+        self.assertEqual(copied['exact_copies'], 1)
+        self.assertLess(copied['dcr']['ratio'], 0.5)
+
+        with self.assertRaises(ValueError):
+            quality_report(self.real, self.synthetic[:, :3])
+        with self.assertRaises(ValueError):
+            quality_report(real, synthetic.drop(columns='a'))
+
+if __name__ == '__main__':
+    unittest.main()
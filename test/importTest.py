@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+import context
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def _run(code):
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=REPO_ROOT)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+class TestImport(unittest.TestCase):
+
+    def test_import_does_not_load_tensorflow(self):
+        result = _run("import json, sys, time\n"
+                      "start = time.perf_counter()\n"
+                      "import dittto\n"
+                      "seconds = time.perf_counter() - start\n"
+                      "print(json.dumps({'seconds': seconds, 'tensorflow': 'tensorflow' in sys.modules}))")
+
+        self.assertFalse(result['tensorflow'])
+        self.assertLess(result['seconds'], 0.5)
+
+    def test_tensorflow_free_modules(self):
+        for statement in ('from dittto import NumpyModel', 'from dittto.cli import main',
+                          'from dittto import GenerationServer, ServedModel', 'from dittto import quality_report',
+                          'from dittto import BalancedView, TabularTransformer'):
+            with self.subTest(statement=statement):
+                result = _run("import json, sys\n"
+                              "%s\n"
+                              "print(json.dumps({'tensorflow': 'tensorflow' in sys.modules}))" % statement)
+                self.assertFalse(result['tensorflow'])
+
+    def test_lazy_attributes(self):
+        result = _run("import json, sys\n"
+                      "import dittto\n"
+                      "cache = dittto.ModelCache\n"
+                      "before = 'tensorflow' in sys.modules\n"
+                      "generate_model = dittto.generate_model\n"
+                      "print(json.dumps({'before': before, 'after': 'tensorflow' in sys.modules,"
+                      " 'name': generate_model.__name__}))")
+
+        self.assertFalse(result['before'])
+        self.assertTrue(result['after'])
+        self.assertEqual(result['name'], 'generate_model')
+
+    def test_unknown_attribute(self):
+        import dittto
+        with self.assertRaises(AttributeError):
+            dittto.not_an_attribute
+
+
+if __name__ == '__main__':
+    unittest.main()
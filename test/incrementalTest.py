@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+import context
+from dittto.autoencoder import _fit_autoencoder
+from dittto.cache import row_hashes
+from dittto.incremental import Checkpoint
+from autoencoder import generate_synthetic_data
+from tensorflow import keras
+import numpy as np
+import pandas as pd
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'model.ckpt.npz')
+        rng = np.random.default_rng(0)
+        self.data = rng.random((200, 5), dtype=np.float32) * np.linspace(0.2, 1, 5, dtype=np.float32)
+        self.new_data = rng.random((40, 5), dtype=np.float32) * np.linspace(0.2, 1, 5, dtype=np.float32)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_row_hashes(self):
+        hashes = row_hashes(self.data)
+        self.assertEqual(hashes.dtype, np.uint64)
+        self.assertEqual(len(np.unique(hashes)), len(self.data))
+        np.testing.assert_array_equal(row_hashes(self.data[::-1]), hashes[::-1])
+
+        changed = self.data.copy()
+        changed[3, 4] += 1
+        self.assertEqual(np.count_nonzero(row_hashes(changed) != hashes), 1)
+
+    def test_save_and_load(self):
+        checkpoint = Checkpoint.train(pd.DataFrame(self.data, columns=list('abcde')), epochs=3, batch_size=32)
+        checkpoint.save(self.path)
+        loaded = Checkpoint.load(self.path)
+
+        self.assertEqual((loaded.epochs, loaded.columns, loaded.architecture),
+                         (checkpoint.epochs, list('abcde'), checkpoint.architecture))
+        np.testing.assert_array_equal(loaded.hashes, checkpoint.hashes)
+        for expected, actual in zip(checkpoint.autoencoder.get_weights(), loaded.autoencoder.get_weights()):
+            np.testing.assert_array_equal(actual, expected)
+        self.assertEqual(len(loaded.optimizer_state), len(checkpoint.optimizer_state))
+        for expected, actual in zip(checkpoint.optimizer_state, loaded.optimizer_state):
+            np.testing.assert_array_equal(actual, expected)
+
+    def test_fine_tune_trains_only_new_rows(self):
+        checkpoint = Checkpoint.train(self.data, epochs=3, batch_size=32)
+        self.assertFalse(checkpoint.changed_rows(self.data).any())
+
+        updated = np.concatenate([self.data[10:], self.new_data])
+        self.assertEqual(np.count_nonzero(checkpoint.changed_rows(updated)), len(self.new_data))
+
+        summary = checkpoint.fine_tune(updated, epochs=2, random_state=0)
+        self.assertEqual((summary['new_rows'], summary['removed_rows'], summary['trained_rows'], summary['epochs']),
+                         (40, 10, 80, 2))
+        self.assertEqual(checkpoint.epochs, 5)
+        self.assertEqual(int(checkpoint.optimizer_state[0]), 3 * 5 + 2 * 5)
+
+        summary = checkpoint.fine_tune(updated, epochs=2)
+        self.assertEqual((summary['new_rows'], summary['trained_rows'], summary['epochs']), (0, 0, 0))
+
+        with self.assertRaises(ValueError):
+            checkpoint.fine_tune(updated[:, :3])
+
+    def test_fine_tune_matches_retrain(self):
+        keras.utils.set_random_seed(0)
+        checkpoint = Checkpoint.train(self.data, epochs=60, batch_size=16, patience=None)
+        updated = np.concatenate([self.data, self.new_data])
+        checkpoint.fine_tune(updated, epochs=10, random_state=0)
+
+        comparison = checkpoint.compare_with_retrain(updated, batch_size=16, patience=None)
+        self.assertGreater(comparison['retrained'], 0)
+        self.assertTrue(comparison['within_tolerance'], comparison)
+
+    def test_synthetic_data_generator_checkpoint(self):
+        df = pd.DataFrame(np.concatenate([self.data, self.new_data]), columns=list('abcde'))
+        df['class'] = [0] * 100 + [1] * 140
+
+        generate_synthetic_data('single_encoder', df[40:], epochs=2, checkpoint=self.path)
+        self.assertEqual(Checkpoint.load(self.path).epochs, 2)
+
+        _, generated_data, _, _ = generate_synthetic_data('single_encoder', df, epochs=2, checkpoint=self.path,
+                                                          fine_tune_epochs=3)
+        checkpoint = Checkpoint.load(self.path)
+        self.assertEqual(checkpoint.epochs, 5)
+        self.assertEqual(len(checkpoint.hashes), 100)
+        self.assertEqual(len(generated_data), 140)
+
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('balanced', df, epochs=2, checkpoint=self.path)
+
+    def test_checkpoint_records_trained_epochs(self):
+        # No epoch improves the validation loss by min_delta, so EarlyStopping ends training after the second one
+        _fit_autoencoder('single_encoder', self.data, list('abcde'), 'sigmoid', 50, checkpoint=self.path,
+                         patience=1, min_delta=1.0)
+        self.assertEqual(Checkpoint.load(self.path).epochs, 2)
+
+if __name__ == '__main__':
+    unittest.main()
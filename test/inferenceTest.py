@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+import context
+from dittto.inference import NumpyModel, export_weights
+from autoencoder import generate_model, generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+TOLERANCE = 1e-5
+
+class TestNumpyModel(unittest.TestCase):
+
+    def assert_matches_keras(self, model, data):
+        expected = model.predict(data, verbose=0)
+        actual = NumpyModel.from_keras(model).predict(data, batch_size=7)
+        self.assertEqual(actual.dtype, np.float32)
+        np.testing.assert_allclose(actual, expected, rtol=TOLERANCE, atol=TOLERANCE)
+
+    def test_autoencoder_matches_keras(self):
+        data = np.random.default_rng(0).random((50, 12), dtype=np.float32)
+        autoencoder, encoder, decoder = generate_model(12, encoder_dense_layers=[20, 18], bottle_neck=6,
+                                                       decoder_dense_layers=[18, 20])
+        self.assert_matches_keras(autoencoder, data)
+        self.assert_matches_keras(encoder, data)
+        self.assert_matches_keras(decoder, encoder.predict(data, verbose=0))
+
+    def test_output_activations_match_keras(self):
+        data = np.random.default_rng(1).normal(size=(30, 8)).astype(np.float32)
+        for decoder_activation in ('sigmoid', 'tanh', 'softmax', 'linear'):
+            autoencoder, _, _ = generate_model(8, decoder_activation=decoder_activation)
+            self.assert_matches_keras(autoencoder, data)
+
+    def test_export_and_load(self):
+        data = np.random.default_rng(2).random((20, 10), dtype=np.float32)
+        _, _, decoder = generate_model(10, bottle_neck=4)
+        latent = data[:, :4]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'decoder.npz')
+            export_weights(decoder, path)
+            model = NumpyModel.load(path)
+
+        self.assertEqual((model.input_shape, model.output_shape), (4, 10))
+        np.testing.assert_allclose(model.predict(latent), decoder.predict(latent, verbose=0), rtol=TOLERANCE, atol=TOLERANCE)
+
+    def test_invalid_input(self):
+        autoencoder, _, _ = generate_model(10)
+        model = NumpyModel.from_keras(autoencoder)
+        self.assertRaises(ValueError, model.predict, np.zeros((3, 9)))
+        self.assertRaises(ValueError, NumpyModel, model.kernels, model.biases, ['relu'] * (len(model.kernels) - 1) + ['selu'])
+
+    def test_synthetic_data_generator_numpy_engine(self):
+        test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+        _, generated_data, _, majority_df = generate_synthetic_data('single_encoder', test_df, minority_class_column='class',
+                                                                    minority_class_label='0', epochs=1, engine='numpy')
+        self.assertEqual(len(generated_data), len(majority_df))
+
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('single_encoder', test_df, epochs=1, engine='onnx')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import context
+from dittto.latent import LatentSampler, nearest_neighbors
+from autoencoder import generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+class TestLatentSampler(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.codes = np.concatenate([rng.normal(2, 0.1, (500, 3)), rng.normal(8, 0.1, (500, 3))]).astype(np.float32)
+
+    def test_nearest_neighbors(self):
+        data = np.random.default_rng(1).random((60, 4), dtype=np.float32)
+        distances = ((data[:, None] - data[None]) ** 2).sum(axis=-1)
+        np.fill_diagonal(distances, np.inf)
+        expected = np.sort(np.argsort(distances, axis=1)[:, :3], axis=1)
+
+        actual = np.sort(nearest_neighbors(data, 3, chunk_size=7), axis=1)
+        self.assertTrue(np.array_equal(actual, expected))
+
+    def test_gaussian(self):
+        codes = np.random.default_rng(2).normal(5, 0.5, (1000, 3)).astype(np.float32)
+        samples = LatentSampler('gaussian', random_state=0).fit(codes).sample(20000)
+
+        self.assertEqual((samples.shape, samples.dtype), ((20000, 3), np.float32))
+        np.testing.assert_allclose(samples.mean(axis=0), codes.mean(axis=0), atol=0.05)
+        np.testing.assert_allclose(samples.std(axis=0), codes.std(axis=0), atol=0.05)
+
+        samples = LatentSampler('gaussian', random_state=0).fit(self.codes).sample(20000)
+        self.assertTrue((samples >= self.codes.min(axis=0)).all())
+
+    def test_gmm(self):
+        samples = LatentSampler('gmm', n_components=2, random_state=0).fit(self.codes).sample(10000)
+
+        self.assertEqual(samples.shape, (10000, 3))
+        near_cluster = (np.abs(samples - 2) < 1).all(axis=1) | (np.abs(samples - 8) < 1).all(axis=1)
+        self.assertGreater(near_cluster.mean(), 0.99)
+
+    def test_knn(self):
+        samples = LatentSampler('knn', n_neighbors=3, random_state=0).fit(self.codes).sample(5000)
+
+        self.assertEqual(samples.shape, (5000, 3))
+        self.assertTrue((samples >= self.codes.min(axis=0) - 1e-6).all())
+        self.assertTrue((samples <= self.codes.max(axis=0) + 1e-6).all())
+        self.assertFalse(np.isin(samples[:, 0], self.codes[:, 0]).all())
+
+    def test_single_code(self):
+        for method in ('gaussian', 'gmm', 'knn'):
+            samples = LatentSampler(method, random_state=0).fit(self.codes[:1]).sample(4)
+            self.assertEqual(samples.shape, (4, 3))
+
+    def test_invalid_method(self):
+        self.assertRaises(ValueError, LatentSampler, 'reconstruct')
+        self.assertRaises(ValueError, LatentSampler, 'gmm', n_components=0)
+
+    def test_synthetic_data_generator_latent_sampling(self):
+        test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+        for sampling, engine in (('gaussian', 'keras'), ('gmm', 'numpy'), ('knn', 'numpy')):
+            _, generated_data, _, majority_df = generate_synthetic_data('balanced', test_df.copy(), epochs=1, sampling=sampling,
+                                                                        engine=engine, random_state=0)
+            self.assertEqual(generated_data.shape, (len(majority_df), 3))
+
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('balanced', test_df, epochs=1, sampling='vae')
+
+
+if __name__ == '__main__':
+    unittest.main()
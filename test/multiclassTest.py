@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import unittest
+import context
+from dittto.multiclass import generate_multiclass_synthetic_data
+import pandas as pd
+
+class TestMulticlass(unittest.TestCase):
+
+    def setUp(self):
+        self.test_df = pd.DataFrame({'a': range(20), 'b': range(20, 40),
+                                     'class': ['big'] * 10 + ['mid'] * 6 + ['small'] * 4})
+
+    def test_match_largest_class(self):
+        synthetic_df, generated_data = generate_multiclass_synthetic_data('single_encoder', self.test_df, epochs=1,
+                                                                          n_jobs=1, random_state=0)
+
+        self.assertEqual(synthetic_df['class'].value_counts().to_dict(), {'big': 10, 'mid': 10, 'small': 10})
+        self.assertEqual(generated_data['class'].value_counts().to_dict(), {'small': 6, 'mid': 4})
+        self.assertEqual(list(self.test_df['class'][:1]), ['big'])
+
+    def test_explicit_targets(self):
+        _, generated_data = generate_multiclass_synthetic_data('single_encoder', self.test_df, epochs=1, n_jobs=1,
+                                                               targets={'small': 7, 'mid': 3})
+        self.assertEqual(generated_data['class'].value_counts().to_dict(), {'small': 3})
+
+        _, generated_data = generate_multiclass_synthetic_data('single_encoder', self.test_df, epochs=1, n_jobs=1,
+                                                               targets=12)
+        self.assertEqual(len(generated_data), 2 + 6 + 8)
+
+    def test_process_pool(self):
+        synthetic_df, generated_data = generate_multiclass_synthetic_data('balanced', self.test_df, epochs=1,
+                                                                          n_jobs=2, tf_threads=1, engine='numpy')
+
+        self.assertEqual(synthetic_df['class'].value_counts().to_dict(), {'big': 10, 'mid': 10, 'small': 10})
+        self.assertEqual(list(generated_data.columns), ['a', 'b', 'class'])
+
+    def test_numeric_labels(self):
+        df = pd.DataFrame({'a': range(20), 'b': range(20, 40), 'class': [0.0] * 10 + [-1.0] * 6 + [2.0] * 4})
+        synthetic_df, generated_data = generate_multiclass_synthetic_data('single_encoder', df, epochs=1, n_jobs=1,
+                                                                          random_state=0)
+
+        self.assertEqual(synthetic_df['class'].value_counts().to_dict(), {0.0: 10, -1.0: 10, 2.0: 10})
+        self.assertEqual(synthetic_df['class'].dtype, float)
+
+        df['class'] = [1] * 10 + [-1] * 6 + [2] * 4
+        synthetic_df, _ = generate_multiclass_synthetic_data('single_encoder', df, epochs=1, n_jobs=1, random_state=0)
+        self.assertEqual(synthetic_df['class'].value_counts().to_dict(), {1: 10, -1: 10, 2: 10})
+
+    def test_in_process_threads(self):
+        code = ("import pandas as pd, tensorflow as tf\n"
+                "from dittto.multiclass import generate_multiclass_synthetic_data\n"
+                "df = pd.DataFrame({'a': range(20), 'class': ['big'] * 15 + ['small'] * 5})\n"
+                "generate_multiclass_synthetic_data('single_encoder', df, epochs=1, n_jobs=1, tf_threads=1)\n"
+                "print(tf.config.threading.get_intra_op_parallelism_threads())")
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.join(os.path.dirname(__file__), '..'))
+        self.assertEqual(output.decode().strip().splitlines()[-1], '1')
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            generate_multiclass_synthetic_data('single_encoder', self.test_df, targets={'missing': 10})
+        with self.assertRaises(ValueError):
+            generate_multiclass_synthetic_data('single_encoder', self.test_df, targets='min')
+        with self.assertRaises(ValueError):
+            generate_multiclass_synthetic_data('single_encoder_', self.test_df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+import context
+from dittto.outofcore import rebalance_files
+from dittto.readers import expand_paths, iter_file_chunks
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+class TestOutOfCore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.test_df = pd.DataFrame({'a': range(30), 'b': range(30, 60), 'class': [0, 1, 1] * 10})
+        self.test_df[:15].to_csv(os.path.join(self.tmp_dir.name, 'part-1.csv'), index=False)
+        self.test_df[15:].to_csv(os.path.join(self.tmp_dir.name, 'part-2.csv'), index=False)
+        self.pattern = os.path.join(self.tmp_dir.name, 'part-*.csv')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_iter_file_chunks(self):
+        chunks = list(iter_file_chunks(self.pattern, chunk_size=4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 4, 3, 4, 4, 4, 3])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), self.test_df)
+
+    def test_expand_paths(self):
+        self.assertEqual(len(expand_paths(self.pattern)), 2)
+        self.assertRaises(FileNotFoundError, expand_paths, os.path.join(self.tmp_dir.name, 'missing.csv'))
+        self.assertRaises(FileNotFoundError, expand_paths, os.path.join(self.tmp_dir.name, '*.parquet'))
+
+    def test_rebalance_files(self):
+        output_path = os.path.join(self.tmp_dir.name, 'synthetic.csv')
+        summary = rebalance_files(self.pattern, output_path, minority_class_column='class', minority_class_label='0',
+                                  epochs=2, chunk_size=4, batch_size=4, synthetic_only=True)
+        written = pd.read_csv(output_path)
+
+        self.assertEqual(summary['files'], 2)
+        self.assertEqual((summary['minority_rows'], summary['majority_rows']), (10, 20))
+        self.assertEqual(summary['generated_rows'], 20)
+        self.assertEqual(summary['output_rows'], 20)
+        self.assertEqual(summary['epochs'], 2)
+        self.assertEqual(written.shape, (20, 3))
+        self.assertTrue((written['class'] == 0).all())
+
+    def test_rebalance_files_with_original_rows(self):
+        output_path = os.path.join(self.tmp_dir.name, 'synthetic.csv')
+        summary = rebalance_files(self.pattern, output_path, epochs=1, chunk_size=4)
+        written = pd.read_csv(output_path)
+
+        self.assertEqual(summary['output_rows'], 50)
+        self.assertEqual(written['class'].value_counts().to_dict(), {0: 30, 1: 20})
+        pd.testing.assert_frame_equal(written[:30], self.test_df.astype({'a': float, 'b': float}))
+
+    def test_rebalance_files_fit_options(self):
+        output_path = os.path.join(self.tmp_dir.name, 'synthetic.csv')
+        summary = rebalance_files(self.pattern, output_path, epochs=3, batch_size=2, learning_rate=0.01,
+                                  reduce_lr_patience=1, steps_per_execution=2, n_rows=0, synthetic_only=True)
+
+        self.assertEqual(summary['generated_rows'], 0)
+        self.assertEqual(summary['epochs'], 3)
+        self.assertEqual(list(pd.read_csv(output_path).columns), ['a', 'b', 'class'])
+        with self.assertRaises(ValueError):
+            rebalance_files(self.pattern, output_path, steps_per_execution=0)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_rebalance_parquet_files(self):
+        input_path = os.path.join(self.tmp_dir.name, 'input.parquet')
+        output_path = os.path.join(self.tmp_dir.name, 'synthetic.parquet')
+        self.test_df.to_parquet(input_path)
+        summary = rebalance_files(input_path, output_path, epochs=1, n_rows=25, chunk_size=7, engine='numpy',
+                                  synthetic_only=True)
+
+        self.assertEqual(summary['generated_rows'], 25)
+        self.assertEqual(len(pd.read_parquet(output_path)), 25)
+
+        summary = rebalance_files(input_path, output_path, epochs=1, n_rows=25, chunk_size=7, engine='numpy')
+        self.assertEqual(len(pd.read_parquet(output_path)), summary['output_rows'])
+        self.assertEqual(summary['output_rows'], 55)
+
+        rebalance_files(input_path, output_path, epochs=1, n_rows=0, engine='numpy', synthetic_only=True)
+        written = pd.read_parquet(output_path)
+        self.assertEqual(written.shape, (0, 3))
+        self.assertEqual(written['a'].dtype, 'float32')
+
+    def test_rebalance_files_invalid_label(self):
+        output_path = os.path.join(self.tmp_dir.name, 'synthetic.csv')
+        with self.assertRaises(ValueError):
+            rebalance_files(self.pattern, output_path, minority_class_label='2')
+        with self.assertRaises(ValueError):
+            rebalance_files(self.pattern, output_path, minority_class_column='label')
+
+
+if __name__ == '__main__':
+    unittest.main()
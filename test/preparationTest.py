@@ -0,0 +1,84 @@
+import tracemalloc
+import unittest
+import context
+from dittto.preparation import label_codes, label_value, minority_mask, prepare_data, to_float32
+from autoencoder import generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+class TestPreparation(unittest.TestCase):
+
+    def setUp(self):
+        self.test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+
+    def test_minority_mask(self):
+        labels = pd.Series([0, '0', 1, 'a', None])
+        self.assertEqual(minority_mask(labels, '0').tolist(), [True, True, False, False, False])
+        self.assertEqual(minority_mask(labels, 'None').tolist(), [False, False, False, False, True])
+
+    def test_label_codes(self):
+        codes, labels, values = label_codes(pd.Series(['b', 'a', 1, '1', 'b']))
+        self.assertEqual(labels, ['1', 'a', 'b'])
+        self.assertEqual(values, [1, 'a', 'b'])
+        self.assertEqual([labels[code] for code in codes], ['b', 'a', '1', '1', 'b'])
+
+        codes, labels, values = label_codes(pd.Series([2.0, -1.0, 0.0, 2.0]))
+        self.assertEqual(labels, ['-1.0', '0.0', '2.0'])
+        self.assertEqual(values, [-1.0, 0.0, 2.0])
+
+    def test_label_value(self):
+        self.assertEqual(label_value(pd.Series([0, 1, 0]), '1'), 1)
+        self.assertEqual(label_value(pd.Series([0.0, 1.5]), '1.5'), 1.5)
+        self.assertEqual(label_value(pd.Series([-1, 1]), '-1'), -1)
+        self.assertEqual(label_value(pd.Series(['b', 'a']), 'a'), 'a')
+        self.assertEqual(label_value(pd.Series(['1', 'a']), '1'), '1')
+
+    def test_synthetic_data_generator_numeric_labels(self):
+        for labels, label in (([-1, 1] * 5, '-1'), ([1.5, 0.0] * 5, '1.5')):
+            test_df = self.test_df.assign(**{'class': labels})
+            _, generated_data, _, majority_df = generate_synthetic_data('single_encoder', test_df, epochs=1,
+                                                                        minority_class_label=label)
+            self.assertEqual(generated_data['class'].dtype, test_df['class'].dtype)
+            self.assertTrue((generated_data['class'] == test_df['class'][0]).all())
+            self.assertEqual(len(generated_data), len(majority_df))
+
+    def test_prepare_data(self):
+        original = self.test_df.copy()
+        mask, columns, minority_data = prepare_data(self.test_df, 'class', '0')
+
+        pd.testing.assert_frame_equal(self.test_df, original)
+        self.assertEqual(columns, ['a', 'b'])
+        self.assertEqual(mask.tolist(), (original['class'] == 0).tolist())
+        self.assertEqual(minority_data.dtype, np.float32)
+        self.assertTrue(minority_data.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(minority_data, original.loc[mask, ['a', 'b']].to_numpy())
+
+    def test_invalid_data(self):
+        self.assertRaises(ValueError, prepare_data, self.test_df, 'label', '0')
+        self.assertRaises(ValueError, prepare_data, self.test_df, 'class', '2')
+        self.assertRaises(ValueError, to_float32, pd.DataFrame({'a': ['x', 'y']}), ['a'])
+
+    def test_peak_memory(self):
+        rng = np.random.default_rng(0)
+        test_df = pd.DataFrame(rng.random((200000, 20)), columns=['c%d' % i for i in range(20)])
+        test_df['class'] = rng.integers(0, 2, len(test_df))
+        input_bytes = int(test_df.memory_usage(index=False).sum())
+
+        tracemalloc.start()
+        prepare_data(test_df, 'class', '0')
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertLess(peak, 0.6 * input_bytes)
+
+    def test_synthetic_data_generator_input_untouched(self):
+        original = self.test_df.copy()
+        synthetic_df, _, minority_df, majority_df = generate_synthetic_data('single_encoder', self.test_df, epochs=1)
+
+        pd.testing.assert_frame_equal(self.test_df, original)
+        self.assertEqual(list(minority_df.columns), ['a', 'b'])
+        self.assertEqual(len(majority_df), 6)
+        self.assertEqual(len(synthetic_df), 16)
+
+if __name__ == '__main__':
+    unittest.main()
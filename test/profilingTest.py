@@ -0,0 +1,45 @@
+import unittest
+import context
+from dittto.profiling import Profiler
+from autoencoder import generate_synthetic_data
+import pandas as pd
+
+class TestProfiler(unittest.TestCase):
+
+    def test_phase(self):
+        profiler = Profiler()
+        with profiler.phase('work', rows=10) as record:
+            record['rows'] = 12
+        report = profiler.report()
+
+        self.assertEqual(report['phases'][0]['name'], 'work')
+        self.assertEqual(report['phases'][0]['rows'], 12)
+        self.assertGreaterEqual(report['phases'][0]['seconds'], 0)
+        self.assertGreaterEqual(report['phases'][0]['peak_memory_delta_mb'], 0)
+        self.assertEqual(report['total_seconds'], report['phases'][0]['seconds'])
+
+    def test_record_epoch(self):
+        profiler = Profiler()
+        profiler.record_epoch(0, 2.0, 100, {'loss': 0.5})
+        self.assertEqual(profiler.report()['epochs'], [{'epoch': 0, 'seconds': 2.0, 'samples': 100,
+                                                        'samples_per_second': 50.0, 'loss': 0.5}])
+
+    def test_synthetic_data_generator_report(self):
+        test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+        reports = []
+        profiler = Profiler(hook=reports.append)
+        generate_synthetic_data('single_encoder', test_df, epochs=3, patience=None, profiler=profiler)
+
+        self.assertEqual(len(reports), 1)
+        phases = {phase['name']: phase for phase in reports[0]['phases']}
+        self.assertEqual(list(phases), ['prepare', 'filter', 'fit', 'generate', 'assemble', 'shuffle'])
+        self.assertEqual(phases['prepare']['rows'], 10)
+        self.assertEqual(phases['fit']['rows'], 4)
+        self.assertEqual(phases['generate']['rows'], 6)
+        self.assertEqual(len(reports[0]['epochs']), 3)
+        self.assertEqual(reports[0]['epochs'][0]['samples'], 3)
+        self.assertIn('val_loss', reports[0]['epochs'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import context
+from dittto.selection import _rung_epochs, select_architecture
+from dittto.presets import resolve_architecture
+from autoencoder import generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+class TestSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(0).random((40, 4), dtype=np.float32)
+        self.custom = {'encoder_dense_layers': [8], 'bottle_neck': 2, 'decoder_dense_layers': [8]}
+
+    def test_rung_epochs(self):
+        self.assertEqual(_rung_epochs(100, 3, 2), [25, 50, 100])
+        self.assertEqual(_rung_epochs(100, 4, 2), [25, 50, 100])
+        self.assertEqual(_rung_epochs(9, 3, 3), [3, 9])
+        self.assertEqual(_rung_epochs(2, 8, 2), [1, 2])
+        self.assertEqual(_rung_epochs(10, 1, 2), [10])
+
+    def test_successive_halving(self):
+        selection = select_architecture(self.data, candidates=[self.custom], epochs=4, n_jobs=1, batch_size=8)
+        curves = selection['loss_curves']
+
+        self.assertEqual(sorted(curves), ['balanced', 'custom_0', 'heavy_decoder', 'single_encoder'])
+        # Four candidates train for 1 epoch, two survive to 2 epochs and the best is trained for all 4
+        self.assertEqual(sorted(len(curve) for curve in curves.values()), [1, 1, 2, 4])
+        self.assertEqual(selection['epochs'], 4)
+        self.assertEqual(selection['loss_curve'], curves[selection['name']])
+        self.assertEqual(selection['loss'], min(selection['loss_curve']))
+        self.assertEqual(resolve_architecture(selection['architecture']), selection['architecture'])
+
+    def test_parallel_search(self):
+        selection = select_architecture(self.data, candidates={'small': self.custom}, include_presets=False, epochs=2,
+                                        n_jobs=2)
+        self.assertEqual(selection['name'], 'small')
+        self.assertEqual(len(selection['loss_curve']), 2)
+
+        selection = select_architecture(self.data, epochs=2, n_jobs=2, tf_threads=1)
+        self.assertIn(selection['name'], ['single_encoder', 'balanced', 'heavy_decoder'])
+
+    def test_invalid_candidates(self):
+        self.assertRaises(ValueError, select_architecture, self.data, include_presets=False)
+        self.assertRaises(ValueError, select_architecture, self.data, candidates=[{'bottle_neck': 2}])
+        self.assertRaises(ValueError, select_architecture, self.data, reduction_factor=1)
+
+    def test_synthetic_data_generator_auto(self):
+        test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+        synthetic_df, generated_data, _, _ = generate_synthetic_data('auto', test_df, epochs=2, n_jobs=1)
+        self.assertEqual(len(generated_data), 6)
+
+        synthetic_df, generated_data, _, _ = generate_synthetic_data(self.custom, test_df, epochs=1)
+        self.assertEqual(len(generated_data), 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+import context
+from dittto.server import GenerationServer, ServedModel
+from autoencoder import generate_model
+import numpy as np
+import pandas as pd
+
+class TestServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.minority_df = pd.DataFrame(np.random.default_rng(0).random((40, 6)), columns=list('abcdef'))
+        cls.autoencoder, _, _ = generate_model(6, bottle_neck=3)
+
+    def get(self, server, path):
+        with urllib.request.urlopen(server.url + path, timeout=30) as response:
+            return json.loads(response.read())
+
+    def test_served_model(self):
+        for sampling in ('reconstruct', 'gaussian', 'gmm', 'knn'):
+            model = ServedModel.from_keras(self.autoencoder, self.minority_df, sampling=sampling, random_state=0)
+            rows = model.generate(25)
+            self.assertEqual(rows.shape, (25, 6))
+            self.assertEqual(rows.dtype, np.float32)
+            self.assertEqual(model.columns, list('abcdef'))
+
+        with self.assertRaises(ValueError):
+            ServedModel(self.autoencoder, self.minority_df, sampling='unknown')
+        with self.assertRaises(ValueError):
+            ServedModel(self.autoencoder, self.minority_df.iloc[:, :3])
+
+    def test_save_and_load(self):
+        model = ServedModel.from_keras(self.autoencoder, self.minority_df, sampling='gmm', random_state=0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.npz')
+            model.save(path)
+            loaded = ServedModel.load(path, random_state=1)
+
+        self.assertEqual((loaded.sampling, loaded.noise, loaded.columns), ('gmm', model.noise, model.columns))
+        codes = model.inputs(10)
+        np.testing.assert_allclose(loaded.model.predict(codes), model.model.predict(codes), rtol=1e-6)
+
+    def test_generate(self):
+        model = ServedModel.from_keras(self.autoencoder, self.minority_df, random_state=0)
+        with GenerationServer({'fraud': model}) as server:
+            self.assertEqual(self.get(server, '/health'), {'status': 'ok'})
+            self.assertEqual(self.get(server, '/models')['fraud']['columns'], list('abcdef'))
+
+            response = self.get(server, '/generate?model=fraud&rows=7')
+            self.assertEqual(response['columns'], list('abcdef'))
+            self.assertEqual(np.array(response['rows']).shape, (7, 6))
+
+            request = urllib.request.Request(server.url + '/generate', data=json.dumps({'rows': 3}).encode(),
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=30) as response:
+                self.assertEqual(len(json.loads(response.read())['rows']), 3)
+
+            with urllib.request.urlopen(server.url + '/generate?model=fraud&rows=4&format=csv', timeout=30) as response:
+                lines = response.read().decode().splitlines()
+            self.assertEqual(lines[0], 'a,b,c,d,e,f')
+            self.assertEqual(len(lines), 5)
+
+            stats = self.get(server, '/stats')
+            self.assertEqual((stats['requests'], stats['rows'], stats['errors']), (3, 14, 0))
+            self.assertEqual(stats['models']['fraud']['rows'], 14)
+            self.assertGreater(stats['latency_ms']['p99'], 0)
+
+    def test_errors(self):
+        model = ServedModel.from_keras(self.autoencoder, self.minority_df)
+        with GenerationServer({'fraud': model, 'churn': model}, max_request_rows=100) as server:
+            for path, status in (('/generate?model=unknown&rows=1', 404), ('/generate?model=fraud&rows=0', 400),
+                                 ('/generate?model=fraud&rows=101', 400), ('/generate?model=fraud&rows=x', 400),
+                                 ('/generate?rows=1', 404), ('/unknown', 404)):
+                with self.assertRaises(urllib.error.HTTPError) as error:
+                    urllib.request.urlopen(server.url + path, timeout=30)
+                self.assertEqual(error.exception.code, status)
+            self.assertEqual(self.get(server, '/stats')['errors'], 5)
+
+        with self.assertRaises(ValueError):
+            GenerationServer({})
+
+    def test_concurrent_requests_are_batched(self):
+        model = ServedModel.from_keras(self.autoencoder, self.minority_df, random_state=0)
+        n_requests = 16
+        with GenerationServer({'fraud': model}, max_wait=0.2) as server:
+            results = [None] * n_requests
+
+            def request(i):
+                results[i] = self.get(server, '/generate?model=fraud&rows=%d' % (i + 1))['rows']
+
+            threads = [threading.Thread(target=request, args=(i,)) for i in range(n_requests)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            stats = self.get(server, '/stats')
+
+        self.assertEqual([len(rows) for rows in results], list(range(1, n_requests + 1)))
+        self.assertEqual(stats['requests'], n_requests)
+        self.assertLess(stats['batches'], n_requests)
+        self.assertGreater(stats['requests_per_batch'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import context
+from dittto.autoencoder import iter_synthetic_data
+from dittto.writers import ChunkWriter
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.test_df = pd.DataFrame({'a': [1,2,3,4,5,6,7,8,9,10], 'b': [1,2,3,4,5,6,7,8,9,10], 'class': [0,1,0,1,1,0,1,1,1,0]})
+
+    def test_chunk_sizes(self):
+        chunks = list(iter_synthetic_data('single_encoder', self.test_df, minority_class_column='class',
+                                          minority_class_label='0', epochs=1, n_rows=25, chunk_size=10))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(list(chunks[0].columns), ['a', 'b', 'class'])
+        self.assertTrue((chunks[-1]['class'] == 0).all())
+
+    def test_default_rows_and_input_untouched(self):
+        original = self.test_df.copy()
+        chunks = list(iter_synthetic_data('balanced', self.test_df, minority_class_column='class',
+                                          minority_class_label='0', epochs=1, chunk_size=4, engine='numpy'))
+
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 6)
+        pd.testing.assert_frame_equal(self.test_df, original)
+
+    def test_write_csv(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'synthetic.csv')
+            for _ in iter_synthetic_data('single_encoder', self.test_df, epochs=1, n_rows=23, chunk_size=5, output_path=path):
+                pass
+            written = pd.read_csv(path)
+
+        self.assertEqual(written.shape, (23, 3))
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_write_parquet(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'synthetic.parquet')
+            with ChunkWriter(path) as writer:
+                writer.write(self.test_df)
+                writer.write(self.test_df)
+            written = pd.read_parquet(path)
+
+        self.assertEqual(len(written), 20)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            iter_synthetic_data('single_encoder', self.test_df, chunk_size=0)
+        with self.assertRaises(ValueError):
+            iter_synthetic_data('single_encoder', self.test_df, minority_class_label='2')
+        with self.assertRaises(ValueError):
+            ChunkWriter('synthetic.json')
+
+
+if __name__ == '__main__':
+    unittest.main()
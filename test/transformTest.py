@@ -0,0 +1,169 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+import context
+from dittto.cache import ModelCache
+from dittto.incremental import Checkpoint
+from dittto.server import GenerationServer, ServedModel
+from dittto.transform import TabularTransformer
+from dittto.autoencoder import iter_synthetic_data
+from autoencoder import generate_model, generate_synthetic_data
+import numpy as np
+import pandas as pd
+
+class TestTabularTransformer(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'amount': rng.normal(500, 200, 90), 'count': rng.integers(0, 40, 90),
+                                'city': rng.choice(['paris', 'oslo', None], 90), 'flag': rng.random(90) > 0.5,
+                                'code': rng.integers(0, 3, 90)})
+        self.test_df = self.df.copy()
+        self.test_df['class'] = [0, 1, 1] * 30
+
+    def assert_round_trip(self, transformer, df):
+        restored = transformer.inverse_transform(transformer.transform(df))
+        self.assertEqual(list(restored.columns), list(df.columns))
+        for column in df.columns:
+            if column == 'amount':
+                np.testing.assert_allclose(restored[column], df[column], rtol=1e-5)
+            else:
+                self.assertTrue(restored[column].equals(df[column]), column)
+
+    def test_transform(self):
+        for scaling in ('minmax', 'standard'):
+            for encoding in ('onehot', 'ordinal'):
+                transformer = TabularTransformer(scaling, encoding, categorical_columns=['code']).fit(self.df)
+                data = transformer.transform(self.df)
+                self.assertEqual(data.dtype, np.float32)
+                self.assertEqual(data.shape, (90, 1 + 1 + 3 + 2 + 3 if encoding == 'onehot' else 5))
+                self.assert_round_trip(transformer, self.df)
+
+        data = TabularTransformer('minmax', 'ordinal').fit_transform(self.df)
+        np.testing.assert_allclose(data.min(axis=0), 0)
+        np.testing.assert_allclose(data.max(axis=0), 1)
+        data = TabularTransformer('standard').fit_transform(self.df[['amount', 'count']])
+        np.testing.assert_allclose(data.mean(axis=0), 0, atol=1e-5)
+        np.testing.assert_allclose(data.std(axis=0), 1, atol=1e-5)
+
+    def test_inverse_transform_generated_rows(self):
+        transformer = TabularTransformer().fit(self.df)
+        generated = np.random.default_rng(1).random((50, transformer.n_features), dtype=np.float32)
+        restored = transformer.inverse_transform(generated)
+
+        self.assertEqual(restored['count'].dtype, self.df['count'].dtype)
+        self.assertTrue(restored['count'].between(self.df['count'].min(), self.df['count'].max()).all())
+        self.assertTrue(restored['city'].isin(self.df['city']).all())
+        self.assertEqual(restored['flag'].dtype, bool)
+
+    def test_save_and_load(self):
+        transformer = TabularTransformer('standard', 'ordinal', categorical_columns=['code']).fit(self.df)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'transformer.json')
+            transformer.save(path)
+            loaded = TabularTransformer.load(path)
+
+        self.assertEqual((loaded.scaling, loaded.encoding, loaded.categorical_columns), ('standard', 'ordinal', ['code']))
+        np.testing.assert_array_equal(loaded.transform(self.df), transformer.transform(self.df))
+        self.assert_round_trip(loaded, self.df)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            TabularTransformer(scaling='unknown')
+        with self.assertRaises(ValueError):
+            TabularTransformer(encoding='unknown')
+        with self.assertRaises(ValueError):
+            TabularTransformer().transform(self.df)
+        with self.assertRaises(ValueError):
+            TabularTransformer(categorical_columns=['missing']).fit(self.df)
+
+        transformer = TabularTransformer().fit(self.df)
+        with self.assertRaises(ValueError):
+            transformer.transform(self.df.assign(city='rome'))
+        with self.assertRaises(ValueError):
+            transformer.transform(self.df.drop(columns='city'))
+        with self.assertRaises(ValueError):
+            transformer.inverse_transform(np.zeros((2, 3)))
+
+    def test_synthetic_data_generator_transformer(self):
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('single_encoder', self.test_df, epochs=2)
+
+        transformer = TabularTransformer()
+        synthetic_df, generated_data, minority_df, majority_df = generate_synthetic_data(
+            'single_encoder', self.test_df, epochs=2, transformer=transformer, random_state=0)
+        self.assertTrue(transformer.fitted)
+        self.assertEqual(len(generated_data), 60)
+        self.assertEqual(len(synthetic_df), 150)
+        self.assertEqual(list(generated_data.columns), list(self.test_df.columns))
+        self.assertEqual(generated_data['count'].dtype, self.test_df['count'].dtype)
+        self.assertTrue(generated_data['city'].isin(minority_df['city']).all())
+        self.assertTrue(generated_data['amount'].between(minority_df['amount'].min(), minority_df['amount'].max()).all())
+
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('single_encoder', self.test_df, epochs=2, transformer='unknown')
+        with self.assertRaises(ValueError):
+            generate_synthetic_data('single_encoder', self.test_df, epochs=2, transformer=object())
+
+    def test_transformer_cache_and_streaming(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ModelCache(cache_dir)
+            generate_synthetic_data('single_encoder', self.test_df, epochs=2, transformer='minmax', cache=cache)
+            chunks = list(iter_synthetic_data('single_encoder', self.test_df, epochs=2, transformer='minmax',
+                                              cache=cache, n_rows=25, chunk_size=10))
+            generate_synthetic_data('single_encoder', self.test_df, epochs=2, transformer='standard', cache=cache)
+
+        self.assertEqual(cache.stats['hits'], 1)
+        self.assertEqual(cache.stats['misses'], 2)
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(list(chunks[0].columns), list(self.test_df.columns))
+        self.assertTrue(chunks[0]['city'].isin(self.df['city']).all())
+
+    def test_transformer_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.ckpt.npz')
+            generate_synthetic_data('single_encoder', self.test_df, epochs=2, transformer='standard', checkpoint=path)
+            saved = Checkpoint.load_transformer(path)
+            self.assertEqual(saved.scaling, 'standard')
+
+            # A new transformer takes the checkpoint's fitted state instead of being fitted to the updated rows
+            transformer = TabularTransformer()
+            updated_df = pd.concat([self.test_df, self.test_df.assign(amount=self.test_df['amount'] * 3)])
+            _, generated_data, _, _ = generate_synthetic_data('single_encoder', updated_df, epochs=2,
+                                                              transformer=transformer, checkpoint=path)
+            self.assertEqual(json.dumps(transformer.to_config()), json.dumps(saved.to_config()))
+            self.assertEqual(len(generated_data), 120)
+            self.assertEqual(Checkpoint.load(path).epochs, 7)
+
+            with self.assertRaises(ValueError):
+                generate_synthetic_data('single_encoder', self.test_df, epochs=2, checkpoint=path)
+
+    def test_served_model_transformer(self):
+        minority_df = self.df[self.test_df['class'] == 0]
+        transformer = TabularTransformer().fit(minority_df)
+        autoencoder, _, _ = generate_model(transformer.n_features, bottle_neck=3)
+        model = ServedModel.from_keras(autoencoder, minority_df, sampling='gmm', transformer=transformer, random_state=0)
+        self.assertEqual(model.columns, list(self.df.columns))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.npz')
+            model.save(path)
+            loaded = ServedModel.load(path)
+        self.assertEqual(json.dumps(loaded.transformer.to_config()), json.dumps(transformer.to_config()))
+
+        with GenerationServer({'fraud': loaded}) as server:
+            with urllib.request.urlopen(server.url + '/generate?rows=4', timeout=30) as response:
+                payload = json.loads(response.read())
+            with urllib.request.urlopen(server.url + '/generate?rows=4&format=csv', timeout=30) as response:
+                lines = response.read().decode().splitlines()
+
+        self.assertEqual(payload['columns'], list(self.df.columns))
+        self.assertEqual(len(payload['rows']), 4)
+        self.assertTrue(all(row[2] in ('paris', 'oslo', None) or row[2] != row[2] for row in payload['rows']))
+        self.assertEqual(lines[0], 'amount,count,city,flag,code')
+        self.assertEqual(len(lines), 5)
+
+if __name__ == '__main__':
+    unittest.main()